@@ -1,45 +1,55 @@
+import multiprocessing
+import os
+import queue
 import sqlite3
+import sys
+import traceback
 from detoxify import Detoxify
 from tqdm import tqdm
 
+# Lancé depuis son dossier (python check_hate_bdd.py) : la racine du dépôt remplace le dossier du
+# script dans sys.path pour que le paquet db_manager soit importable
+if __name__ == "__main__" and not __package__:
+    sys.path[0] = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+from db_manager.migrations import migrate, migrate_database
+
 # Configuration
 DB_PATH = "votre_base_de_donnees.db"  # Remplacez par le chemin de votre BDD
 
 # Seuil de toxicité pour la classification binaire
 TOXICITY_THRESHOLD = 0.5  # Score >= 0.5 = haine (1), sinon non haine (0)
 
-
-def add_columns_if_not_exist(cursor):
-    """Ajoute les colonnes Detoxify si elles n'existent pas"""
-
-    columns = [
-        ('com_detox_is_haine', 'REAL'),  # Score 0-1 (identique à toxicity)
-        ('com_detox_toxicity', 'REAL'),  # Score 0-1
-        ('com_detox_severe_toxicity', 'REAL'),  # Score 0-1
-        ('com_detox_obscene', 'REAL'),  # Score 0-1
-        ('com_detox_threat', 'REAL'),  # Score 0-1
-        ('com_detox_insult', 'REAL'),  # Score 0-1
-        ('com_detox_identity_attack', 'REAL')  # Score 0-1
-    ]
-
-    added = []
-    already_exist = []
-
-    for col_name, col_type in columns:
-        try:
-            cursor.execute(f"""
-                ALTER TABLE UNIL_Commentaire 
-                ADD COLUMN {col_name} {col_type}
-            """)
-            added.append(col_name)
-        except sqlite3.OperationalError:
-            already_exist.append(col_name)
-
-    if added:
-        print(f"✅ Colonnes créées: {', '.join(added)}")
-    if already_exist:
-        print(f"ℹ️  Colonnes existantes: {', '.join(already_exist)}")
-    print()
+# ✅ INFÉRENCE PAR BATCHS : predict() reçoit des listes de commentaires de longueur voisine
+# (triés par nombre de tokens) au lieu d'un texte à la fois ; le coût fixe du tokenizer et
+# de la passe avant est partagé et le padding reste minimal.
+DETOX_BATCH_SIZE = 32           # Commentaires max par appel à predict
+DETOX_TOKEN_BUDGET = 16_384     # Tokens max par batch (longueur max × taille) : borne la mémoire
+SCORING_WINDOW = 4096           # Commentaires lus (puis triés par longueur) à la fois
+
+# ✅ SCORING MULTI-PROCESSUS (--processus N) : les commentaires non analysés sont répartis
+# en N plages de com_id de taille égale ; chaque processus charge son modèle, limite torch à
+# sa part des cœurs et renvoie ses scores au processus principal, seul à écrire en base.
+DETOX_WORKERS = max(1, min(4, (os.cpu_count() or 2) // 2))
+DETOX_QUEUE_SIZE = 4            # Fenêtres en attente d'écriture par processus (borne la mémoire)
+DETOX_POLL_S = 5                # Sans message pendant N s : vérifie que les processus sont vivants
+
+SCORE_KEYS = ('toxicity', 'severe_toxicity', 'obscene', 'threat', 'insult', 'identity_attack')
+
+# com_detox_date est posée à l'écriture (pas au début du scoring de la fenêtre) : les dates
+# suivent l'ordre des commits, condition du filigrane des exports incrémentaux (export_parquet)
+UPDATE_SCORES_SQL = """
+                    UPDATE UNIL_Commentaire
+                    SET com_detox_is_haine        = ?,
+                        com_detox_toxicity        = ?,
+                        com_detox_severe_toxicity = ?,
+                        com_detox_obscene         = ?,
+                        com_detox_threat          = ?,
+                        com_detox_insult          = ?,
+                        com_detox_identity_attack = ?,
+                        com_detox_date            = datetime('now', 'localtime')
+                    WHERE com_id = ?
+                    """
 
 
 def analyze_comment(model, text):
@@ -75,6 +85,95 @@ def analyze_comment(model, text):
         return None
 
 
+def token_lengths(model, texts):
+    """Longueur en tokens de chaque texte (tokenizer du modèle, tronqué comme dans predict)"""
+    tokenizer = getattr(model, "tokenizer", None)
+    if tokenizer is None:
+        return [len(text) for text in texts]
+    return [len(ids) for ids in tokenizer(texts, truncation=True)["input_ids"]]
+
+
+def length_batches(comments, lengths, batch_size=DETOX_BATCH_SIZE, token_budget=DETOX_TOKEN_BUDGET):
+    """
+    Regroupe les commentaires par longueur croissante : chaque batch réunit des textes de
+    longueur voisine (peu de padding) et reste sous token_budget (longueur max × taille).
+
+    Returns:
+        Générateur de listes de (com_id, com_contenu)
+    """
+    batch = []
+    for i in sorted(range(len(comments)), key=lengths.__getitem__):
+        # Tri croissant : le commentaire courant est le plus long du batch
+        if batch and (len(batch) >= batch_size or lengths[i] * (len(batch) + 1) > token_budget):
+            yield batch
+            batch = []
+        batch.append(comments[i])
+    if batch:
+        yield batch
+
+
+def score_rows(model, comments):
+    """
+    Analyse une liste de commentaires par batchs (un appel à predict par batch).
+
+    Args:
+        model: Modèle Detoxify
+        comments: Liste de (com_id, com_contenu)
+
+    Returns:
+        tuple: (lignes pour UPDATE_SCORES_SQL, nombre d'erreurs)
+    """
+    rows = []
+    # Textes vides (espaces seulement) : non analysables, comptés en erreur comme avant
+    valid = [(com_id, text) for com_id, text in comments if text and text.strip()]
+    errors = len(comments) - len(valid)
+    comments = valid
+    lengths = token_lengths(model, [text for _, text in comments])
+    for batch in length_batches(comments, lengths):
+        try:
+            results = model.predict([text for _, text in batch])
+            batch_scores = [{key: float(results[key][i]) for key in SCORE_KEYS} for i in range(len(batch))]
+        except Exception as e:
+            # Batch en échec : analyse commentaire par commentaire pour isoler le fautif
+            print(f"\n⚠️ Batch de {len(batch)} en échec ({e}), analyse individuelle")
+            batch_scores = [analyze_comment(model, text) for _, text in batch]
+
+        for (com_id, _), scores in zip(batch, batch_scores):
+            if scores is None:
+                errors += 1
+                continue
+            # com_detox_is_haine = même valeur que toxicity (pas de conversion binaire)
+            rows.append((scores['toxicity'], *(scores[key] for key in SCORE_KEYS), com_id))
+    return rows, errors
+
+
+def fetch_unscored(conn, after=None, until=None, limit=SCORING_WINDOW):
+    """
+    Lit une fenêtre de commentaires non analysés, par com_id croissant (index idx_commentaire_a_scorer).
+
+    Args:
+        after: Dernier com_id de la fenêtre précédente (exclu)
+        until: Borne supérieure de com_id (incluse), None pour aller jusqu'au bout
+    """
+    # Bornes ajoutées seulement si fournies : la recherche par plage reste possible dans l'index
+    bounds, params = "", []
+    if after is not None:
+        bounds += " AND com_id > ?"
+        params.append(after)
+    if until is not None:
+        bounds += " AND com_id <= ?"
+        params.append(until)
+    return conn.execute(f"""
+                        SELECT com_id, com_contenu
+                        FROM UNIL_Commentaire
+                        WHERE com_detox_is_haine IS NULL
+                          AND com_contenu IS NOT NULL
+                          AND com_contenu != ''{bounds}
+                        ORDER BY com_id
+                        LIMIT ?
+                        """, (*params, limit)).fetchall()
+
+
 def process_comments(db_path, batch_size=100):
     """
     Traite tous les commentaires non encore analysés de la base de données
@@ -92,9 +191,8 @@ def process_comments(db_path, batch_size=100):
     conn = sqlite3.connect(db_path)
     cursor = conn.cursor()
 
-    # Ajouter les colonnes si nécessaire
-    add_columns_if_not_exist(cursor)
-    conn.commit()
+    # Colonnes com_detox_* : migration 0004
+    migrate(conn)
 
     # Compter le nombre total de commentaires à traiter
     # On considère qu'un commentaire est "non analysé" si com_detox_is_haine est NULL
@@ -112,7 +210,7 @@ def process_comments(db_path, batch_size=100):
     print(f"{'=' * 70}")
     print(f"Commentaires à analyser: {total_comments}")
     print(f"Seuil de toxicité: {TOXICITY_THRESHOLD}")
-    print(f"Taille des batchs: {batch_size}")
+    print(f"Taille des batchs: {DETOX_BATCH_SIZE} (inférence), {batch_size} (commit)")
     print(f"{'=' * 70}\n")
 
     if total_comments == 0:
@@ -121,69 +219,43 @@ def process_comments(db_path, batch_size=100):
         conn.close()
         return
 
-    # Récupérer les commentaires non analysés
-    cursor.execute("""
-                   SELECT com_id, com_contenu
-                   FROM UNIL_Commentaire
-                   WHERE com_detox_is_haine IS NULL
-                     AND com_contenu IS NOT NULL
-                     AND com_contenu != ''
-                   """)
-
-    comments = cursor.fetchall()
-
     # Compteurs
     processed = 0
     errors = 0
     total_toxicity = 0.0
+    uncommitted = 0
 
     # Traiter avec une barre de progression
     print("🚀 Démarrage de l'analyse...\n")
 
     with tqdm(total=total_comments, desc="Progression", unit="comment") as pbar:
-        for i, (com_id, com_contenu) in enumerate(comments):
-
-            # Analyser le commentaire
-            scores = analyze_comment(model, com_contenu)
-
-            if scores is not None:
-                # Mettre à jour la base de données avec tous les scores
-                cursor.execute("""
-                               UPDATE UNIL_Commentaire
-                               SET com_detox_is_haine        = ?,
-                                   com_detox_toxicity        = ?,
-                                   com_detox_severe_toxicity = ?,
-                                   com_detox_obscene         = ?,
-                                   com_detox_threat          = ?,
-                                   com_detox_insult          = ?,
-                                   com_detox_identity_attack = ?
-                               WHERE com_id = ?
-                               """, (
-                                   scores['is_haine'],
-                                   scores['toxicity'],
-                                   scores['severe_toxicity'],
-                                   scores['obscene'],
-                                   scores['threat'],
-                                   scores['insult'],
-                                   scores['identity_attack'],
-                                   com_id
-                               ))
-
-                processed += 1
-                total_toxicity += scores['toxicity']
-            else:
-                errors += 1
-
-            # Commit par batch pour optimiser les performances
-            if (i + 1) % batch_size == 0:
-                conn.commit()
-                avg_tox = total_toxicity / processed if processed > 0 else 0
-                pbar.set_postfix({
-                    'Moy. toxicité': f'{avg_tox:.3f}',
-                    'Erreurs': errors
-                })
-
-            pbar.update(1)
+        # Fenêtres de SCORING_WINDOW commentaires, triées par longueur avant l'inférence
+        last_id = None
+        while True:
+            comments = fetch_unscored(conn, after=last_id)
+            if not comments:
+                break
+            last_id = comments[-1][0]
+
+            rows, window_errors = score_rows(model, comments)
+            # Mettre à jour la base de données avec tous les scores
+            for start in range(0, len(rows), batch_size):
+                cursor.executemany(UPDATE_SCORES_SQL, rows[start:start + batch_size])
+                uncommitted += len(rows[start:start + batch_size])
+                # Commit par batch pour optimiser les performances
+                if uncommitted >= batch_size:
+                    conn.commit()
+                    uncommitted = 0
+
+            processed += len(rows)
+            errors += window_errors
+            total_toxicity += sum(row[1] for row in rows)
+            avg_tox = total_toxicity / processed if processed > 0 else 0
+            pbar.set_postfix({
+                'Moy. toxicité': f'{avg_tox:.3f}',
+                'Erreurs': errors
+            })
+            pbar.update(len(comments))
 
     # Commit final
     conn.commit()
@@ -202,6 +274,166 @@ def process_comments(db_path, batch_size=100):
     print(f"{'=' * 70}\n")
 
 
+def count_unscored(conn):
+    """Nombre de commentaires non analysés (index partiel idx_commentaire_a_scorer)"""
+    return conn.execute("""
+                        SELECT COUNT(*)
+                        FROM UNIL_Commentaire
+                        WHERE com_detox_is_haine IS NULL
+                          AND com_contenu IS NOT NULL
+                          AND com_contenu != ''
+                        """).fetchone()[0]
+
+
+def shard_bounds(conn, nb_shards):
+    """
+    Découpe les commentaires non analysés en plages de com_id de tailles égales.
+
+    Returns:
+        Liste de (after, until) pour fetch_unscored (None = pas de borne)
+    """
+    total = count_unscored(conn)
+    bounds = []
+    for k in range(1, nb_shards):
+        row = conn.execute("""
+                           SELECT com_id
+                           FROM UNIL_Commentaire
+                           WHERE com_detox_is_haine IS NULL
+                             AND com_contenu IS NOT NULL
+                             AND com_contenu != ''
+                           ORDER BY com_id
+                           LIMIT 1 OFFSET ?
+                           """, (k * total // nb_shards,)).fetchone()
+        if row and (not bounds or row[0] != bounds[-1]):
+            bounds.append(row[0])
+    edges = [None] + bounds + [None]
+    return list(zip(edges[:-1], edges[1:]))
+
+
+def _score_shard(db_path, shard, after, until, num_threads, results):
+    """Processus de scoring : une plage de com_id, son propre modèle, lecture seule"""
+    try:
+        import torch
+        torch.set_num_threads(num_threads)
+        model = Detoxify('multilingual')
+        conn = sqlite3.connect(f"file:{os.path.abspath(db_path)}?mode=ro", uri=True, timeout=30)
+        last_id = after
+        while True:
+            comments = fetch_unscored(conn, after=last_id, until=until)
+            if not comments:
+                break
+            last_id = comments[-1][0]
+            rows, errors = score_rows(model, comments)
+            results.put(("scores", shard, rows, len(comments), errors))
+        conn.close()
+        results.put(("fin", shard, None, 0, 0))
+    except Exception:
+        results.put(("erreur", shard, traceback.format_exc(), 0, 0))
+
+
+def process_comments_parallel(db_path, workers=DETOX_WORKERS, batch_size=100):
+    """
+    Traite les commentaires non analysés avec plusieurs processus (un modèle par processus)
+
+    Args:
+        db_path: Chemin vers la base de données SQLite
+        workers: Nombre de processus de scoring
+        batch_size: Nombre de commentaires écrits par commit
+    """
+    conn = sqlite3.connect(db_path, timeout=30)
+    migrate(conn)
+    # WAL : les processus lisent pendant que le processus principal écrit
+    conn.execute("PRAGMA journal_mode = WAL")
+    shards = shard_bounds(conn, workers)
+    total_comments = count_unscored(conn)
+    if total_comments == 0:
+        print("✅ Tous les commentaires ont déjà été analysés !")
+        conn.close()
+        return
+
+    num_threads = max(1, (os.cpu_count() or 1) // len(shards))
+    print(f"{'=' * 70}")
+    print(f"📊 Scoring parallèle : {total_comments} commentaires, {len(shards)} processus "
+          f"× {num_threads} thread(s) torch")
+    print(f"{'=' * 70}\n")
+
+    # spawn : pas de fork d'un processus ayant déjà initialisé torch
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue(maxsize=DETOX_QUEUE_SIZE * len(shards))
+    processes = [context.Process(target=_score_shard, args=(db_path, shard, after, until, num_threads, results),
+                                 daemon=True)
+                 for shard, (after, until) in enumerate(shards)]
+    for process in processes:
+        process.start()
+
+    processed = 0
+    errors = 0
+    total_toxicity = 0.0
+    finished = set()
+    failed_shards = []
+    try:
+        with tqdm(total=total_comments, desc="Progression", unit="comment") as pbar:
+            # Processus principal : seul écrivain
+            while len(finished) < len(processes):
+                try:
+                    message = results.get(timeout=DETOX_POLL_S)
+                except queue.Empty:
+                    dead = [shard for shard, process in enumerate(processes)
+                            if shard not in finished and not process.is_alive()]
+                    if not dead:
+                        continue
+                    try:
+                        # Messages envoyés juste avant l'arrêt (scores, "fin") : traités avant de conclure
+                        message = results.get_nowait()
+                    except queue.Empty:
+                        # Processus tué par le système (mémoire, segfault) : il n'enverra jamais "fin"
+                        for shard in dead:
+                            finished.add(shard)
+                            failed_shards.append(shard)
+                            tqdm.write(f"❌ Processus {shard} arrêté sans terminer (code {processes[shard].exitcode})")
+                        continue
+                kind, shard, rows, nb_comments, nb_errors = message
+                if kind == "fin":
+                    finished.add(shard)
+                    continue
+                if kind == "erreur":
+                    if shard not in finished:
+                        finished.add(shard)
+                        failed_shards.append(shard)
+                    tqdm.write(f"❌ Processus {shard} en échec :\n{rows}")
+                    continue
+                for start in range(0, len(rows), batch_size):
+                    conn.executemany(UPDATE_SCORES_SQL, rows[start:start + batch_size])
+                    conn.commit()
+                processed += len(rows)
+                errors += nb_errors
+                total_toxicity += sum(row[1] for row in rows)
+                pbar.set_postfix({
+                    'Moy. toxicité': f'{total_toxicity / processed if processed else 0:.3f}',
+                    'Erreurs': errors
+                })
+                pbar.update(nb_comments)
+    finally:
+        conn.commit()
+        conn.close()
+        for process in processes:
+            process.join(timeout=10)
+            if process.is_alive():
+                process.terminate()
+
+    print(f"\n{'=' * 70}")
+    print(f"✅ TRAITEMENT TERMINÉ")
+    print(f"{'=' * 70}")
+    print(f"📊 Résultats:")
+    print(f"   • Commentaires traités: {processed}")
+    print(f"   • Score toxicité moyen: {total_toxicity / processed if processed else 0:.3f}")
+    print(f"   • ❌ Erreurs: {errors}")
+    if failed_shards:
+        print(f"   • ⚠️ Plages en échec : {[shards[shard] for shard in sorted(failed_shards)]} "
+              f"(relancer : seuls les commentaires non analysés sont repris)")
+    print(f"{'=' * 70}\n")
+
+
 def analyze_global_statistics(db_path):
     """
     Affiche des statistiques globales sur tous les commentaires analysés
@@ -407,8 +639,17 @@ if __name__ == "__main__":
     # Remplacez par le chemin réel de votre base de données
     db_path = "UNIL_IVI_GR4_LLM.db"
 
-    if len(sys.argv) > 1:
-        db_path = sys.argv[1]
+    # Usage : python -m check_hate.check_hate_bdd [base.db] [--scorer] [--processus N]
+    args = sys.argv[1:]
+    workers = None
+    if "--processus" in args:
+        i = args.index("--processus")
+        has_value = i + 1 < len(args) and args[i + 1].isdigit()
+        workers = int(args[i + 1]) if has_value else DETOX_WORKERS
+        del args[i:i + 2 if has_value else i + 1]
+    positional = [arg for arg in args if not arg.startswith("--")]
+    if positional:
+        db_path = positional[0]
 
     print(f"\n{'#' * 70}")
     print(f"# 🚀 ANALYSE DE TOXICITÉ DES COMMENTAIRES - DETOXIFY")
@@ -416,8 +657,14 @@ if __name__ == "__main__":
     print(f"📁 Base de données: {db_path}\n")
 
     try:
-        # 1. Traiter tous les commentaires non analysés
-        # process_comments(db_path)
+        # 0. Mettre le schéma à jour (colonnes Detoxify, index)
+        migrate_database(db_path)
+
+        # 1. Traiter tous les commentaires non analysés (--scorer, ou --processus N en parallèle)
+        if workers:
+            process_comments_parallel(db_path, workers)
+        elif "--scorer" in sys.argv:
+            process_comments(db_path)
 
         # 2. Afficher les statistiques globales
         analyze_global_statistics(db_path)
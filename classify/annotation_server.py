@@ -0,0 +1,403 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Serveur d'annotation partagé : une seule base pour tous les annotateurs
+Usage : python -m classify.annotation_server UNIL_IVI_GR4.db [--hote 0.0.0.0] [--port 8765]
+"""
+
+import argparse
+import json
+import queue
+import sqlite3
+import sys
+import threading
+import time
+import urllib.parse
+import urllib.request
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from db_manager.migrations import migrate
+from scraper import dbConfig
+
+# ✅ SERVEUR D'ANNOTATION : les interfaces (classify.py, classify_gui.py avec --serveur)
+# deviennent de simples clients HTTP/JSON. Toutes les annotations sont écrites dans la même
+# base par un unique thread écrivain (connexion d'écriture WAL de scraper.dbConfig) qui
+# regroupe les envois simultanés en une transaction (commit groupé) ; les lectures passent
+# par une connexion de lecture par requête. Plus de copie par annotateur ni de fusion.
+#
+#   GET  /articles?cible=2                           articles assignés (répartition en 4 parts)
+#   GET  /suivant?cible=2&annotateur=luca&apres=ID   prochain article avec des commentaires à annoter
+#   GET  /commentaires?article=ID&annotateur=luca    commentaires d'un article (+ annotation)
+#   GET  /progression?cible=2&annotateur=luca        {total, annotes}
+#   POST /annotations                                {annotateur, tour, annotations: [{com_id, score}]}
+#   GET  /evenements                                 flux SSE des compteurs par annotateur
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_URL = f"http://{DEFAULT_HOST}:{DEFAULT_PORT}"
+ANNOTATORS = ("augustin", "luca", "matthieu", "severin")
+ROUND = 1
+
+ANNOTATION_BATCH_SIZE = 500     # Annotations max par transaction
+ANNOTATION_FLUSH_S = 0.05       # Attente max pour regrouper les envois simultanés
+SUBMIT_TIMEOUT_S = 2 * dbConfig.BUSY_TIMEOUT_S  # Attente max d'un envoi (au-delà : erreur 500, renvoi sans risque)
+SSE_KEEPALIVE_S = 15
+
+UPSERT_SQL = """
+    INSERT INTO UNIL_Annotation (ann_com_id, ann_tour, ann_annotateur, ann_score, ann_date)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT(ann_com_id, ann_tour, ann_annotateur) DO UPDATE SET
+        ann_score = excluded.ann_score,
+        ann_date  = excluded.ann_date
+"""
+
+
+def distribute_articles(articles, user_num, nb_users=len(ANNOTATORS)):
+    """Part des articles (triés par ID) assignée à l'utilisateur user_num (1-4)"""
+    total = len(articles)
+    base_count = total // nb_users
+    remainder = total % nb_users
+
+    if user_num <= remainder:
+        user_article_count = base_count + 1
+        start_idx = (user_num - 1) * (base_count + 1)
+    else:
+        user_article_count = base_count
+        start_idx = remainder * (base_count + 1) + (user_num - remainder - 1) * base_count
+
+    return articles[start_idx:start_idx + user_article_count]
+
+
+class AnnotationWriter(threading.Thread):
+    """Thread écrivain unique : regroupe les annotations reçues et publie les compteurs"""
+
+    def __init__(self):
+        super().__init__(daemon=True, name="annotation-writer")
+        self.pending = queue.Queue()
+        self.progress = {}
+        self.version = 0
+        self.changed = threading.Condition()
+
+    def submit(self, rows):
+        """Met des annotations en file et attend leur commit (lève l'erreur d'écriture éventuelle)"""
+        item = {"rows": rows, "done": threading.Event(), "error": None}
+        self.pending.put(item)
+        if not item["done"].wait(SUBMIT_TIMEOUT_S):
+            # L'envoi peut encore être écrit plus tard : l'upsert rend le renvoi idempotent
+            raise TimeoutError(f"Annotations non enregistrées après {SUBMIT_TIMEOUT_S} s")
+        if item["error"]:
+            raise item["error"]
+        return len(rows)
+
+    def run(self):
+        self.publish_progress()
+        while True:
+            batch = [self.pending.get()]
+            try:
+                size = len(batch[0]["rows"])
+                deadline = time.monotonic() + ANNOTATION_FLUSH_S
+                while size < ANNOTATION_BATCH_SIZE:
+                    try:
+                        batch.append(self.pending.get(timeout=max(deadline - time.monotonic(), 0)))
+                    except queue.Empty:
+                        break
+                    size += len(batch[-1]["rows"])
+
+                try:
+                    self.write(batch)
+                except Exception:
+                    # Un envoi invalide (commentaire inconnu...) ne doit pas faire échouer les autres
+                    for item in batch:
+                        try:
+                            self.write([item])
+                        except Exception as e:
+                            print(f"❌ Erreur d'écriture des annotations : {e}")
+                            item["error"] = e
+            except Exception as e:
+                # Le thread écrivain ne doit jamais s'arrêter : les envois en attente resteraient bloqués
+                print(f"❌ Erreur du thread écrivain : {e}")
+                for item in batch:
+                    item["error"] = item["error"] or e
+            finally:
+                for item in batch:
+                    item["done"].set()
+            self.publish_progress()
+
+    @staticmethod
+    def write(items):
+        """Une transaction pour toutes les annotations des envois regroupés"""
+        with dbConfig.write_transaction() as conn:
+            conn.executemany(UPSERT_SQL, [row for item in items for row in item["rows"]])
+
+    def publish_progress(self):
+        """Recalcule les compteurs par annotateur (index couvrant) et réveille les flux SSE"""
+        try:
+            rows = dbConfig.get_read_connection().execute("""
+                SELECT ann_annotateur, COUNT(*)
+                FROM UNIL_Annotation
+                WHERE ann_tour = ?
+                GROUP BY ann_annotateur
+            """, (ROUND,)).fetchall()
+        except sqlite3.Error as e:
+            # Compteurs non rafraîchis (base occupée...) : ils le seront au prochain envoi
+            print(f"⚠️ Compteurs de progression non mis à jour : {e}")
+            return
+        with self.changed:
+            self.progress = {"tour": ROUND, "annotations": dict(rows),
+                             "date": datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
+            self.version += 1
+            self.changed.notify_all()
+
+
+class AnnotationHandler(BaseHTTPRequestHandler):
+    """Requêtes de l'API JSON (self.server porte les articles assignés et l'écrivain)"""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def finish(self):
+        try:
+            super().finish()
+        finally:
+            dbConfig.release_read_connection()
+
+    def send_json(self, data, status=200):
+        body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = urllib.parse.urlparse(self.path)
+        params = {key: values[0] for key, values in urllib.parse.parse_qs(url.query).items()}
+        routes = {
+            "/articles": self.get_articles,
+            "/suivant": self.get_next_item,
+            "/commentaires": self.get_comments,
+            "/progression": self.get_progress,
+            "/evenements": self.stream_events,
+        }
+        if url.path not in routes:
+            return self.send_json({"erreur": f"route inconnue : {url.path}"}, 404)
+        try:
+            routes[url.path](params)
+        except (KeyError, ValueError) as e:
+            self.send_json({"erreur": f"paramètre invalide : {e}"}, 400)
+
+    def do_POST(self):
+        if urllib.parse.urlparse(self.path).path != "/annotations":
+            return self.send_json({"erreur": f"route inconnue : {self.path}"}, 404)
+        try:
+            data = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            annotator = self.annotator(data)
+            tour = int(data.get("tour", ROUND))
+            date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            rows = [(a["com_id"], tour, annotator, int(a["score"]), date) for a in data["annotations"]]
+        except (KeyError, ValueError, TypeError) as e:
+            return self.send_json({"erreur": f"requête invalide : {e}"}, 400)
+        try:
+            self.send_json({"enregistrees": self.server.writer.submit(rows)})
+        except sqlite3.IntegrityError as e:
+            # Commentaire inconnu (clé étrangère), score hors bornes... : erreur du client
+            self.send_json({"erreur": f"annotation refusée : {e}"}, 400)
+        except Exception as e:
+            self.send_json({"erreur": str(e)}, 500)
+
+    @staticmethod
+    def annotator(params):
+        annotator = params["annotateur"].lower()
+        if annotator not in ANNOTATORS:
+            raise ValueError(f"annotateur inconnu : {annotator}")
+        return annotator
+
+    def assigned(self, params):
+        return self.server.assignments[int(params["cible"])]
+
+    def get_articles(self, params):
+        self.send_json(self.assigned(params))
+
+    def comments(self, art_id, annotator):
+        conn = dbConfig.get_read_connection()
+        rows = conn.execute("""
+            SELECT c.com_id, c.com_auteur, c.com_contenu, c.com_art_id, c.com_commentaire_parent,
+                   an.ann_score AS annotation
+            FROM UNIL_Commentaire c
+                     LEFT JOIN UNIL_Annotation an
+                               ON an.ann_com_id = c.com_id
+                                   AND an.ann_tour = ?
+                                   AND an.ann_annotateur = ?
+            WHERE c.com_art_id = ?
+            ORDER BY c.com_id
+        """, (ROUND, annotator, art_id))
+        keys = ("com_id", "com_auteur", "com_contenu", "com_art_id", "com_commentaire_parent", "annotation")
+        return [dict(zip(keys, row)) for row in rows]
+
+    def get_comments(self, params):
+        self.send_json(self.comments(params["article"], self.annotator(params)))
+
+    def get_next_item(self, params):
+        """Premier article assigné après `apres` ayant encore des commentaires non annotés"""
+        articles = self.assigned(params)
+        annotator = self.annotator(params)
+        ids = [article["art_id"] for article in articles]
+        if params.get("apres") in ids:
+            ids = ids[ids.index(params["apres"]) + 1:]
+        row = dbConfig.get_read_connection().execute("""
+            SELECT j.value
+            FROM json_each(?) j
+            WHERE EXISTS (SELECT 1
+                          FROM UNIL_Commentaire c
+                          WHERE c.com_art_id = j.value
+                            AND NOT EXISTS (SELECT 1
+                                            FROM UNIL_Annotation an
+                                            WHERE an.ann_com_id = c.com_id
+                                              AND an.ann_tour = ?
+                                              AND an.ann_annotateur = ?))
+            ORDER BY j.key
+            LIMIT 1
+        """, (json.dumps(ids), ROUND, annotator)).fetchone()
+        if row is None:
+            return self.send_json({"article": None, "commentaires": []})
+        article = next(article for article in articles if article["art_id"] == row[0])
+        self.send_json({"article": article, "commentaires": self.comments(row[0], annotator)})
+
+    def get_progress(self, params):
+        art_ids = json.dumps([article["art_id"] for article in self.assigned(params)])
+        total, annotated = dbConfig.get_read_connection().execute("""
+            SELECT COUNT(*), COUNT(an.ann_score)
+            FROM UNIL_Commentaire c
+            LEFT JOIN UNIL_Annotation an
+                   ON an.ann_com_id = c.com_id
+                  AND an.ann_tour = ?
+                  AND an.ann_annotateur = ?
+            WHERE c.com_art_id IN (SELECT value FROM json_each(?))
+        """, (ROUND, self.annotator(params), art_ids)).fetchone()
+        self.send_json({"total": total, "annotes": annotated})
+
+    def stream_events(self, params):
+        """Server-Sent Events : compteurs publiés après chaque commit"""
+        writer = self.server.writer
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream; charset=utf-8")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        version = -1
+        try:
+            while True:
+                with writer.changed:
+                    if writer.version == version:
+                        writer.changed.wait(SSE_KEEPALIVE_S)
+                    current, progress = writer.version, writer.progress
+                if current == version:
+                    self.wfile.write(b": keepalive\n\n")
+                else:
+                    version = current
+                    self.wfile.write(f"data: {json.dumps(progress, ensure_ascii=False)}\n\n".encode("utf-8"))
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+
+def load_assignments():
+    """Articles avec commentaires répartis entre les annotateurs (figés au démarrage du serveur)"""
+    rows = dbConfig.get_read_connection().execute("""
+        SELECT a.art_id, a.art_titre, a.art_url, a.art_categorie, a.art_date, a.art_description
+        FROM UNIL_Article a
+        WHERE a.art_commentaires_actifs = 1
+          AND EXISTS (SELECT 1 FROM UNIL_Commentaire c WHERE c.com_art_id = a.art_id)
+        ORDER BY a.art_id ASC
+    """).fetchall()
+    keys = ("art_id", "art_titre", "art_url", "art_categorie", "art_date", "art_description")
+    articles = [dict(zip(keys, row)) for row in rows]
+    return {num: distribute_articles(articles, num) for num in range(1, len(ANNOTATORS) + 1)}
+
+
+def serve(db_path, host=DEFAULT_HOST, port=DEFAULT_PORT):
+    """Démarre le serveur d'annotation (bloquant)"""
+    dbConfig.DB_PATH = db_path
+    with dbConfig.db_lock:
+        migrate(dbConfig.get_connection())
+
+    server = ThreadingHTTPServer((host, port), AnnotationHandler)
+    server.daemon_threads = True
+    server.assignments = load_assignments()
+    server.writer = AnnotationWriter()
+    server.writer.start()
+
+    print(f"📝 Serveur d'annotation sur http://{host}:{port} ({db_path})")
+    for num, articles in server.assignments.items():
+        print(f"  • {ANNOTATORS[num - 1]} : {len(articles)} article(s)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n⚠️ Arrêt du serveur")
+    finally:
+        server.server_close()
+        dbConfig.close_connection()
+
+
+class AnnotationClient:
+    """Client de l'API (interfaces d'annotation en mode --serveur)"""
+
+    def __init__(self, base_url, timeout=30):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+
+    def _request(self, path, params=None, data=None):
+        url = self.base_url + path
+        if params:
+            url += "?" + urllib.parse.urlencode({k: v for k, v in params.items() if v is not None})
+        body = json.dumps(data).encode("utf-8") if data is not None else None
+        request = urllib.request.Request(url, data=body, headers={"Content-Type": "application/json"})
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            return json.loads(response.read())
+
+    def assigned_articles(self, cible):
+        return self._request("/articles", {"cible": cible})
+
+    def next_item(self, cible, annotateur, apres=None):
+        """Returns: (article, commentaires) ou (None, []) quand tout est annoté"""
+        data = self._request("/suivant", {"cible": cible, "annotateur": annotateur, "apres": apres})
+        return data["article"], data["commentaires"]
+
+    def comments(self, art_id, annotateur):
+        return self._request("/commentaires", {"article": art_id, "annotateur": annotateur})
+
+    def progress(self, cible, annotateur):
+        data = self._request("/progression", {"cible": cible, "annotateur": annotateur})
+        return data["total"], data["annotes"]
+
+    def save_annotations(self, annotateur, annotations, tour=ROUND):
+        """annotations : liste de (com_id, score) ; retourne le nombre enregistré"""
+        data = self._request("/annotations", data={
+            "annotateur": annotateur, "tour": tour,
+            "annotations": [{"com_id": com_id, "score": score} for com_id, score in annotations]})
+        return data["enregistrees"]
+
+    def events(self):
+        """Générateur des compteurs poussés par le serveur (bloquant)"""
+        request = urllib.request.Request(self.base_url + "/evenements")
+        with urllib.request.urlopen(request) as response:
+            for line in response:
+                line = line.decode("utf-8").strip()
+                if line.startswith("data: "):
+                    yield json.loads(line[len("data: "):])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serveur d'annotation partagé")
+    parser.add_argument("db_path", help="Base SQLite")
+    parser.add_argument("--hote", default=DEFAULT_HOST, help="Adresse d'écoute (0.0.0.0 pour le réseau local)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="Port d'écoute")
+    args = parser.parse_args(argv)
+    serve(args.db_path, args.hote, args.port)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -5,23 +5,37 @@ Application d'annotation de commentaires pour l'analyse du discours de haine
 Base de données: articles_20min.db
 """
 
+import json
+import os
 import sqlite3
 import sys
+from datetime import datetime
 from pathlib import Path
 import textwrap
 
+# Lancé depuis son dossier (python classify.py) : la racine du dépôt remplace le dossier du
+# script dans sys.path pour que les paquets classify et db_manager soient importables
+if __name__ == "__main__" and not __package__:
+    sys.path[0] = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+from classify.annotation_server import DEFAULT_URL, AnnotationClient
+from db_manager.migrations import migrate
+
 
 class CommentAnnotator:
     """Classe pour gérer l'annotation des commentaires"""
 
-    # Mapping des utilisateurs vers leurs colonnes dans la BDD
-    USER_COLUMNS = {
-        1: "com_verif_haine_augustin",
-        2: "com_verif_haine_luca",
-        3: "com_verif_haine_matthieu",
-        4: "com_verif_haine_severin"
+    # Mapping des utilisateurs vers leur identifiant dans UNIL_Annotation
+    USER_ANNOTATORS = {
+        1: "augustin",
+        2: "luca",
+        3: "matthieu",
+        4: "severin"
     }
 
+    # Tour d'annotation courant (ann_tour)
+    ROUND = 1
+
     USER_NAMES = {
         1: "Augustin",
         2: "Luca",
@@ -75,13 +89,22 @@ class CommentAnnotator:
 ╚═══════════════════════════════════════════════════════════════════════════╝
 """
 
-    def __init__(self, db_path):
+    def __init__(self, db_path=None, client=None):
         """
         Initialise l'annotateur avec le chemin de la base de données
 
         Args:
             db_path: Chemin vers le fichier SQLite
+            client: AnnotationClient (serveur d'annotation partagé) à la place d'une base locale
         """
+        self.client = client
+        self.conn = None
+        # Annotations de l'utilisateur reçues du serveur avec les commentaires de l'article
+        self.remote_annotations = {}
+        if client is not None:
+            self.db_path = Path(client.base_url)
+            return
+
         self.db_path = Path(db_path)
         if not self.db_path.exists():
             raise FileNotFoundError(f"Base de données non trouvée: {db_path}")
@@ -89,25 +112,32 @@ class CommentAnnotator:
         self.conn = sqlite3.connect(str(self.db_path))
         self.conn.row_factory = sqlite3.Row
         self.cursor = self.conn.cursor()
+        migrate(self.conn)
 
     def save_annotation(self, com_id, user_id, score):
         """
-        Sauvegarde une annotation dans la colonne appropriée du commentaire
+        Sauvegarde (ou remplace) l'annotation de l'utilisateur pour un commentaire
 
         Args:
             com_id: ID du commentaire
             user_id: ID de l'utilisateur (1-4)
             score: Score de 1 à 6
         """
-        column = self.USER_COLUMNS[user_id]
-
         try:
-            query = f"""
-                UPDATE UNIL_Commentaire 
-                SET {column} = ?
-                WHERE com_id = ?
+            if self.client:
+                self.client.save_annotations(self.USER_ANNOTATORS[user_id], [(com_id, score)], self.ROUND)
+                # Cache de get_annotation : l'annotation enregistrée s'affiche sans recharger l'article
+                self.remote_annotations[com_id] = score
+                return
+            query = """
+                INSERT INTO UNIL_Annotation (ann_com_id, ann_tour, ann_annotateur, ann_score, ann_date)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(ann_com_id, ann_tour, ann_annotateur) DO UPDATE SET
+                    ann_score = excluded.ann_score,
+                    ann_date  = excluded.ann_date
             """
-            self.cursor.execute(query, (score, com_id))
+            self.cursor.execute(query, (com_id, self.ROUND, self.USER_ANNOTATORS[user_id], score,
+                                        datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
             self.conn.commit()
         except Exception as e:
             print(f"⚠️  Erreur lors de la sauvegarde: {e}")
@@ -123,14 +153,16 @@ class CommentAnnotator:
         Returns:
             Score de l'annotation ou None
         """
-        column = self.USER_COLUMNS[user_id]
-
-        query = f"""
-            SELECT {column}
-            FROM UNIL_Commentaire
-            WHERE com_id = ?
+        if self.client:
+            return self.remote_annotations.get(com_id)
+        query = """
+            SELECT ann_score
+            FROM UNIL_Annotation
+            WHERE ann_com_id = ?
+              AND ann_tour = ?
+              AND ann_annotateur = ?
         """
-        self.cursor.execute(query, (com_id,))
+        self.cursor.execute(query, (com_id, self.ROUND, self.USER_ANNOTATORS[user_id]))
         result = self.cursor.fetchone()
 
         if result and result[0] is not None:
@@ -145,33 +177,39 @@ class CommentAnnotator:
             Liste de dictionnaires contenant les informations des articles
         """
         query = """
-                SELECT DISTINCT a.*
+                SELECT a.*
                 FROM UNIL_Article a
-                         INNER JOIN UNIL_Commentaire c ON a.art_id = c.com_art_id
                 WHERE a.art_commentaires_actifs = 1
+                  AND EXISTS (SELECT 1 FROM UNIL_Commentaire c WHERE c.com_art_id = a.art_id)
                 ORDER BY a.art_id ASC \
                 """
         self.cursor.execute(query)
         return [dict(row) for row in self.cursor.fetchall()]
 
-    def get_comments_for_article(self, art_id):
+    def get_comments_for_article(self, art_id, user_id=None):
         """
         Récupère tous les commentaires pour un article donné, organisés hiérarchiquement
 
         Args:
             art_id: ID de l'article
+            user_id: ID de l'utilisateur (mode serveur : ses annotations sont reçues avec les commentaires)
 
         Returns:
             Liste de commentaires (parents seulement)
         """
-        query = """
-                SELECT *
-                FROM UNIL_Commentaire
-                WHERE com_art_id = ?
-                ORDER BY com_id \
-                """
-        self.cursor.execute(query, (art_id,))
-        all_comments = [dict(row) for row in self.cursor.fetchall()]
+        if self.client:
+            all_comments = self.client.comments(art_id, self.USER_ANNOTATORS[user_id])
+            self.remote_annotations = {c['com_id']: c['annotation'] for c in all_comments
+                                       if c['annotation'] is not None}
+        else:
+            query = """
+                    SELECT *
+                    FROM UNIL_Commentaire
+                    WHERE com_art_id = ?
+                    ORDER BY com_id \
+                    """
+            self.cursor.execute(query, (art_id,))
+            all_comments = [dict(row) for row in self.cursor.fetchall()]
 
         comments_dict = {c['com_id']: c for c in all_comments}
 
@@ -356,7 +394,7 @@ class CommentAnnotator:
                 return 'own', user_num
             elif response == '2':
                 print(f"\n✓ Mode: Vérification croisée des articles de {target_name}")
-                print(f"💡 Vous annotez dans VOTRE colonne ({self.USER_COLUMNS[user_num]})")
+                print(f"💡 Vos annotations sont enregistrées à VOTRE nom ({self.USER_ANNOTATORS[user_num]})")
                 return 'verify', target_user_id
             else:
                 print("❌ Entrée invalide. Veuillez choisir 1 ou 2.")
@@ -418,34 +456,36 @@ class CommentAnnotator:
 
         return user_articles
 
-    def get_annotation_stats(self, user_id, articles):
+    def get_annotation_stats(self, user_id, articles, target_user_id=None):
         """
         Calcule les statistiques d'annotation pour un utilisateur sur ses articles
 
         Args:
             user_id: ID de l'utilisateur
             articles: Liste des articles à vérifier
+            target_user_id: Propriétaire des articles (mode serveur, qui connaît la répartition)
 
         Returns:
             tuple: (total_comments, annotated_comments)
         """
-        column = self.USER_COLUMNS[user_id]
-        total = 0
-        annotated = 0
-
-        for article in articles:
-            query = f"""
-                SELECT COUNT(*) as total,
-                       SUM(CASE WHEN {column} IS NOT NULL THEN 1 ELSE 0 END) as annotated
-                FROM UNIL_Commentaire
-                WHERE com_art_id = ?
-            """
-            self.cursor.execute(query, (article['art_id'],))
-            result = self.cursor.fetchone()
-            total += result['total']
-            annotated += result['annotated']
+        if self.client:
+            return self.client.progress(target_user_id, self.USER_ANNOTATORS[user_id])
 
-        return total, annotated
+        # Une seule requête pour tous les articles (liste passée en JSON)
+        query = """
+            SELECT COUNT(*) as total,
+                   COUNT(an.ann_score) as annotated
+            FROM UNIL_Commentaire c
+            LEFT JOIN UNIL_Annotation an
+                   ON an.ann_com_id = c.com_id
+                  AND an.ann_tour = ?
+                  AND an.ann_annotateur = ?
+            WHERE c.com_art_id IN (SELECT value FROM json_each(?))
+        """
+        art_ids = json.dumps([article['art_id'] for article in articles])
+        self.cursor.execute(query, (self.ROUND, self.USER_ANNOTATORS[user_id], art_ids))
+        result = self.cursor.fetchone()
+        return result['total'], result['annotated']
 
     def run(self):
         """
@@ -458,7 +498,7 @@ class CommentAnnotator:
             # On récupère l'ID depuis le nom du fichier
             user_num = None
             for uid, dbfile in self.USER_DB_FILES.items():
-                if str(self.db_path).endswith(dbfile):
+                if not self.client and str(self.db_path).endswith(dbfile):
                     user_num = uid
                     break
 
@@ -469,22 +509,26 @@ class CommentAnnotator:
             # Sélection du mode
             mode, target_user_id = self.select_mode(user_num)
 
-            # Récupérer tous les articles
-            all_articles = self.get_articles_with_comments()
+            if self.client:
+                # Le serveur répartit les articles entre les annotateurs
+                articles = self.client.assigned_articles(target_user_id)
+            else:
+                # Récupérer tous les articles
+                all_articles = self.get_articles_with_comments()
 
-            if not all_articles:
-                print("\n❌ Aucun article avec commentaires trouvé.")
-                return
+                if not all_articles:
+                    print("\n❌ Aucun article avec commentaires trouvé.")
+                    return
 
-            # Distribuer les articles selon le mode
-            articles = self.distribute_articles(all_articles, target_user_id)
+                # Distribuer les articles selon le mode
+                articles = self.distribute_articles(all_articles, target_user_id)
 
             if not articles:
                 print("❌ Aucun article assigné.")
                 return
 
             # Afficher les statistiques
-            total_comments, annotated_comments = self.get_annotation_stats(user_num, articles)
+            total_comments, annotated_comments = self.get_annotation_stats(user_num, articles, target_user_id)
             print(f"\n📊 Progression: {annotated_comments}/{total_comments} commentaires annotés "
                   f"({100 * annotated_comments // total_comments if total_comments > 0 else 0}%)")
 
@@ -505,7 +549,7 @@ class CommentAnnotator:
                 if article['art_description']:
                     print(f"📝 Description: {article['art_description'][:200]}...")
 
-                comments = self.get_comments_for_article(article['art_id'])
+                comments = self.get_comments_for_article(article['art_id'], user_num)
                 print(f"\n💬 Nombre de commentaires principaux: {len(comments)}")
 
                 input("\n▶️  Appuyez sur Entrée pour commencer l'annotation de cet article...")
@@ -527,14 +571,15 @@ class CommentAnnotator:
             print("=" * 80)
 
             # Statistiques finales
-            total_comments, annotated_comments = self.get_annotation_stats(user_num, articles)
+            total_comments, annotated_comments = self.get_annotation_stats(user_num, articles, target_user_id)
             print(f"\n📊 Progression finale: {annotated_comments}/{total_comments} commentaires annotés")
 
         except KeyboardInterrupt:
             print("\n\n⚠️  Interruption par l'utilisateur (Ctrl+C)")
         finally:
-            self.conn.close()
-            print("\n🔒 Connexion à la base de données fermée.")
+            if self.conn:
+                self.conn.close()
+                print("\n🔒 Connexion à la base de données fermée.")
 
 
 def main():
@@ -542,6 +587,19 @@ def main():
     print("=" * 80)
     print(" APPLICATION D'ANNOTATION DE COMMENTAIRES ".center(80, "="))
     print("=" * 80)
+
+    # Mode serveur : python -m classify.classify --serveur http://127.0.0.1:8765
+    if "--serveur" in sys.argv:
+        args = sys.argv[sys.argv.index("--serveur") + 1:]
+        server_url = args[0] if args else DEFAULT_URL
+        print(f"🌐 Serveur d'annotation : {server_url}")
+        try:
+            CommentAnnotator(client=AnnotationClient(server_url)).run()
+        except OSError as e:
+            print(f"❌ Serveur injoignable: {e}")
+            sys.exit(1)
+        return
+
     print("\nVeuillez vous identifier:\n")
 
     user_names = {
@@ -5,23 +5,39 @@ Interface graphique d'annotation de commentaires
 Base de données: articles_20min.db
 """
 
+import os
+import queue
 import sqlite3
+import sys
+import threading
 import tkinter as tk
+from datetime import datetime
 from tkinter import ttk, messagebox, scrolledtext
 from pathlib import Path
 
+# Lancé depuis son dossier (python classify_gui.py) : la racine du dépôt remplace le dossier du
+# script dans sys.path pour que les paquets classify et db_manager soient importables
+if __name__ == "__main__" and not __package__:
+    sys.path[0] = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+from classify.annotation_server import DEFAULT_URL, AnnotationClient
+from db_manager.migrations import migrate
+
 
 class CommentAnnotatorGUI:
     """Interface graphique pour l'annotation des commentaires"""
 
-    # Mapping des utilisateurs vers leurs colonnes dans la BDD
-    USER_COLUMNS = {
-        1: "com_verif_haine_augustin",
-        2: "com_verif_haine_luca",
-        3: "com_verif_haine_matthieu",
-        4: "com_verif_haine_severin"
+    # Mapping des utilisateurs vers leur identifiant dans UNIL_Annotation
+    USER_ANNOTATORS = {
+        1: "augustin",
+        2: "luca",
+        3: "matthieu",
+        4: "severin"
     }
 
+    # Tour d'annotation courant (ann_tour)
+    ROUND = 1
+
     USER_NAMES = {
         1: "Augustin",
         2: "Luca",
@@ -55,11 +71,19 @@ class CommentAnnotatorGUI:
         6: ("Death", "Élimination littérale du groupe", "#000000")
     }
 
-    def __init__(self):
-        """Initialise l'application GUI"""
+    def __init__(self, server_url=None):
+        """
+        Initialise l'application GUI
+
+        Args:
+            server_url: URL du serveur d'annotation partagé (sinon base personnelle locale)
+        """
         self.db_path = None
         self.conn = None
         self.cursor = None
+        self.client = AnnotationClient(server_url) if server_url else None
+        # Compteurs poussés par le serveur (thread SSE → boucle Tk)
+        self.events = queue.Queue()
 
         self.user_id = None
         self.mode = None
@@ -96,6 +120,16 @@ class CommentAnnotatorGUI:
         """Sélectionne l'utilisateur et connecte à sa base de données"""
         self.user_id = user_num
 
+        if self.client:
+            # Mode serveur : pas de base locale
+            messagebox.showinfo("Connexion",
+                                f"Connecté en tant que: {self.USER_NAMES[user_num]}\n"
+                                f"Serveur d'annotation: {self.client.base_url}")
+            for widget in self.root.winfo_children():
+                widget.destroy()
+            self.show_mode_selection()
+            return
+
         # Déterminer le fichier de base de données
         db_file = self.USER_DB_FILES[user_num]
         self.db_path = Path(db_file)
@@ -113,6 +147,7 @@ class CommentAnnotatorGUI:
             self.conn = sqlite3.connect(str(self.db_path))
             self.conn.row_factory = sqlite3.Row
             self.cursor = self.conn.cursor()
+            migrate(self.conn)
         except Exception as e:
             messagebox.showerror("Erreur", f"Impossible de se connecter à la base de données: {e}")
             self.root.quit()
@@ -161,8 +196,17 @@ class CommentAnnotatorGUI:
             self.target_user_id = self.CROSS_CHECK_PAIRS[self.user_id]
 
         # Charger les articles
-        all_articles = self.get_articles_with_comments()
-        self.articles = self.distribute_articles(all_articles, self.target_user_id)
+        try:
+            if self.client:
+                # Le serveur répartit les articles entre les annotateurs
+                self.articles = self.client.assigned_articles(self.target_user_id)
+            else:
+                all_articles = self.get_articles_with_comments()
+                self.articles = self.distribute_articles(all_articles, self.target_user_id)
+        except OSError as e:
+            messagebox.showerror("Erreur", f"Serveur d'annotation injoignable: {e}")
+            self.root.quit()
+            return
 
         if not self.articles:
             messagebox.showinfo("Info", "Aucun article assigné.")
@@ -178,10 +222,10 @@ class CommentAnnotatorGUI:
     def get_articles_with_comments(self):
         """Récupère tous les articles avec commentaires"""
         query = """
-                SELECT DISTINCT a.*
+                SELECT a.*
                 FROM UNIL_Article a
-                         INNER JOIN UNIL_Commentaire c ON a.art_id = c.com_art_id
                 WHERE a.art_commentaires_actifs = 1
+                  AND EXISTS (SELECT 1 FROM UNIL_Commentaire c WHERE c.com_art_id = a.art_id)
                 ORDER BY a.art_id ASC \
                 """
         self.cursor.execute(query)
@@ -205,21 +249,29 @@ class CommentAnnotatorGUI:
 
     def get_comments_for_article(self, art_id):
         """Récupère tous les commentaires d'un article de manière plate"""
+        if self.client:
+            return self.unannotated_comments(self.client.comments(art_id, self.USER_ANNOTATORS[self.user_id]))
+
         query = """
-                SELECT *
-                FROM UNIL_Commentaire
-                WHERE com_art_id = ?
-                ORDER BY com_id \
+                SELECT c.*, an.ann_score AS annotation
+                FROM UNIL_Commentaire c
+                         LEFT JOIN UNIL_Annotation an
+                                   ON an.ann_com_id = c.com_id
+                                       AND an.ann_tour = ?
+                                       AND an.ann_annotateur = ?
+                WHERE c.com_art_id = ?
+                ORDER BY c.com_id \
                 """
-        self.cursor.execute(query, (art_id,))
-        all_comments = [dict(row) for row in self.cursor.fetchall()]
+        self.cursor.execute(query, (self.ROUND, self.USER_ANNOTATORS[self.user_id], art_id))
+        return self.unannotated_comments([dict(row) for row in self.cursor.fetchall()])
 
+    def unannotated_comments(self, all_comments):
+        """Commentaires non annotés (champ annotation vide), avec leur parent pour le contexte"""
         # Filtrer pour ne garder que les commentaires non annotés
-        column = self.USER_COLUMNS[self.user_id]
         unannotated = []
 
         for comment in all_comments:
-            if comment[column] is None:
+            if comment['annotation'] is None:
                 # Ajouter le commentaire parent si c'est une réponse
                 if comment['com_commentaire_parent']:
                     # Trouver le parent
@@ -234,15 +286,19 @@ class CommentAnnotatorGUI:
 
     def save_annotation(self, com_id, score):
         """Sauvegarde une annotation"""
-        column = self.USER_COLUMNS[self.user_id]
-
         try:
-            query = f"""
-                UPDATE UNIL_Commentaire 
-                SET {column} = ?
-                WHERE com_id = ?
+            if self.client:
+                self.client.save_annotations(self.USER_ANNOTATORS[self.user_id], [(com_id, score)], self.ROUND)
+                return
+            query = """
+                INSERT INTO UNIL_Annotation (ann_com_id, ann_tour, ann_annotateur, ann_score, ann_date)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(ann_com_id, ann_tour, ann_annotateur) DO UPDATE SET
+                    ann_score = excluded.ann_score,
+                    ann_date  = excluded.ann_date
             """
-            self.cursor.execute(query, (score, com_id))
+            self.cursor.execute(query, (com_id, self.ROUND, self.USER_ANNOTATORS[self.user_id], score,
+                                        datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
             self.conn.commit()
         except Exception as e:
             messagebox.showerror("Erreur", f"Erreur lors de la sauvegarde: {e}")
@@ -334,11 +390,50 @@ class CommentAnnotatorGUI:
         tk.Button(control_frame, text="❌ Quitter", font=("Arial", 10),
                   command=self.quit_app).pack(side=tk.RIGHT, padx=5)
 
+        if self.client:
+            # Progression de tous les annotateurs, poussée par le serveur après chaque écriture
+            threading.Thread(target=self.listen_events, daemon=True).start()
+            self.poll_events()
+
         # Charger le premier article
         self.load_next_article()
 
+    def listen_events(self):
+        """Thread de fond : lit le flux d'événements du serveur"""
+        try:
+            for progress in self.client.events():
+                self.events.put(progress)
+        except OSError:
+            pass
+
+    def poll_events(self):
+        """Affiche les derniers compteurs reçus (dans la boucle Tk)"""
+        progress = None
+        while not self.events.empty():
+            progress = self.events.get_nowait()
+        if progress:
+            counts = " | ".join(f"{self.USER_NAMES[num]}: {progress['annotations'].get(name, 0)}"
+                                for num, name in self.USER_ANNOTATORS.items())
+            self.global_stats_label.config(text=f"👥 Annotations (tour {progress['tour']}) — {counts}")
+        self.root.after(1000, self.poll_events)
+
     def load_next_article(self):
         """Charge le prochain article avec des commentaires non annotés"""
+        if self.client:
+            # Le serveur trouve directement le prochain article à traiter
+            previous = self.articles[self.current_article_idx - 1]['art_id'] if self.current_article_idx > 0 else None
+            article, comments = self.client.next_item(self.target_user_id, self.USER_ANNOTATORS[self.user_id],
+                                                      previous)
+            if article is not None:
+                self.current_article_idx = next(i for i, a in enumerate(self.articles)
+                                                if a['art_id'] == article['art_id'])
+                self.current_comments = self.unannotated_comments(comments)
+                self.current_comment_idx = 0
+                self.update_article_info(article)
+                self.show_current_comment()
+                return
+            self.current_article_idx = len(self.articles)
+
         while self.current_article_idx < len(self.articles):
             article = self.articles[self.current_article_idx]
             self.current_comments = self.get_comments_for_article(article['art_id'])
@@ -464,7 +559,12 @@ class CommentAnnotatorGUI:
 
 def main():
     """Point d'entrée principal"""
-    app = CommentAnnotatorGUI()
+    # Mode serveur : python -m classify.classify_gui --serveur http://127.0.0.1:8765
+    server_url = None
+    if "--serveur" in sys.argv:
+        args = sys.argv[sys.argv.index("--serveur") + 1:]
+        server_url = args[0] if args else DEFAULT_URL
+    app = CommentAnnotatorGUI(server_url)
     app.run()
 
 
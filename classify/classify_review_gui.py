@@ -5,12 +5,21 @@ Application de révision des désaccords d'annotation
 Revue finale des commentaires où les annotateurs ne sont pas d'accord
 """
 
+import os
 import sqlite3
+import sys
 import tkinter as tk
 from tkinter import messagebox, scrolledtext
 from pathlib import Path
 import random
 
+# Lancé depuis son dossier (python classify_review_gui.py) : la racine du dépôt remplace le dossier du
+# script dans sys.path pour que le paquet db_manager soit importable
+if __name__ == "__main__" and not __package__:
+    sys.path[0] = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+from db_manager.migrations import migrate
+
 
 class DisagreementReviewGUI:
     """Interface graphique pour la révision des désaccords"""
@@ -18,6 +27,9 @@ class DisagreementReviewGUI:
     # Colonne unique pour toutes les révisions finales
     FINAL_COLUMN = 'com_haine_final'
 
+    # Tour d'annotation comparé (ann_tour)
+    ROUND = 1
+
     SCALE_INFO = {
         0: ("No hate", "Pas de haine dans ce message", "#FFFFFF"),
         1: ("Disagreement", "Désaccord au niveau des idées/croyances", "#90EE90"),
@@ -38,8 +50,8 @@ class DisagreementReviewGUI:
         self.conn.row_factory = sqlite3.Row
         self.cursor = self.conn.cursor()
 
-        # Ajouter la colonne de révision finale si elle n'existe pas
-        self.ensure_final_column()
+        # Révision finale (com_haine_final, com_haine_final_date) : migrations 0005 et 0012
+        migrate(self.conn)
 
         self.disagreements = []
         self.current_idx = 0
@@ -51,36 +63,9 @@ class DisagreementReviewGUI:
         # Charger tous les désaccords
         self.load_all_disagreements()
 
-    def ensure_final_column(self):
-        """Ajoute la colonne finale si elle n'existe pas"""
-        try:
-            self.cursor.execute(f"""
-                ALTER TABLE UNIL_Commentaire 
-                ADD COLUMN {self.FINAL_COLUMN} INT
-            """)
-            self.conn.commit()
-            print(f"✓ Colonne {self.FINAL_COLUMN} ajoutée")
-        except sqlite3.OperationalError:
-            # La colonne existe déjà
-            pass
-
     def load_all_disagreements(self):
-        """Charge tous les désaccords des deux paires et les mélange"""
-        all_disagreements = []
-
-        # Paire 1: Augustin & Luca
-        disagreements_pair1 = self.get_disagreements_for_pair(
-            'com_verif_haine_augustin',
-            'com_verif_haine_luca'
-        )
-        all_disagreements.extend(disagreements_pair1)
-
-        # Paire 2: Matthieu & Severin
-        disagreements_pair2 = self.get_disagreements_for_pair(
-            'com_verif_haine_matthieu',
-            'com_verif_haine_severin'
-        )
-        all_disagreements.extend(disagreements_pair2)
+        """Charge tous les désaccords entre annotateurs et les mélange"""
+        all_disagreements = self.get_disagreements()
 
         if not all_disagreements:
             messagebox.showinfo("Info",
@@ -96,47 +81,51 @@ class DisagreementReviewGUI:
         # Afficher l'interface
         self.show_review_interface()
 
-    def get_disagreements_for_pair(self, col1, col2):
+    def get_disagreements(self):
         """
-        Récupère tous les commentaires où les deux annotateurs ne sont pas d'accord
-
-        Args:
-            col1: Première colonne d'annotation
-            col2: Deuxième colonne d'annotation
+        Récupère tous les commentaires annotés par au moins deux personnes avec des scores différents
+        (quel que soit le nombre d'annotateurs)
 
         Returns:
-            Liste de dictionnaires avec commentaire, article et annotations
+            Liste de dictionnaires avec commentaire, article, parent et annotations
         """
         query = f"""
+        WITH desaccords AS (
+            SELECT ann_com_id,
+                   GROUP_CONCAT(ann_annotateur || ':' || ann_score, ',') AS annotations
+            FROM UNIL_Annotation
+            WHERE ann_tour = ?
+            GROUP BY ann_com_id
+            HAVING COUNT(*) >= 2
+               AND MIN(ann_score) != MAX(ann_score)
+        )
         SELECT 
             c.*,
             a.art_id, a.art_titre, a.art_url, a.art_categorie, 
             a.art_date, a.art_description,
-            c.{col1} as annotation1,
-            c.{col2} as annotation2,
-            c.{self.FINAL_COLUMN} as final_annotation
-        FROM UNIL_Commentaire c
+            d.annotations,
+            c.{self.FINAL_COLUMN} as final_annotation,
+            p.com_auteur as parent_auteur,
+            p.com_contenu as parent_contenu
+        FROM desaccords d
+        INNER JOIN UNIL_Commentaire c ON c.com_id = d.ann_com_id
         INNER JOIN UNIL_Article a ON c.com_art_id = a.art_id
-        WHERE c.{col1} IS NOT NULL 
-          AND c.{col2} IS NOT NULL
-          AND c.{col1} != c.{col2}
-        ORDER BY a.art_id, c.com_id
+        LEFT JOIN UNIL_Commentaire p ON p.com_id = c.com_commentaire_parent
         """
 
-        self.cursor.execute(query)
+        self.cursor.execute(query, (self.ROUND,))
         results = [dict(row) for row in self.cursor.fetchall()]
 
-        # Ajouter le commentaire parent si nécessaire
         for result in results:
-            if result['com_commentaire_parent']:
-                parent_query = """
-                               SELECT * \
-                               FROM UNIL_Commentaire \
-                               WHERE com_id = ? \
-                               """
-                self.cursor.execute(parent_query, (result['com_commentaire_parent'],))
-                parent = self.cursor.fetchone()
-                result['parent'] = dict(parent) if parent else None
+            # "augustin:3,luca:2" -> [("augustin", 3), ("luca", 2)]
+            result['annotations'] = sorted(
+                (name, int(score)) for name, score in
+                (item.split(':') for item in result['annotations'].split(','))
+            )
+            # Commentaire parent (pour contexte) si c'est une réponse
+            if result['com_commentaire_parent'] and result['parent_contenu'] is not None:
+                result['parent'] = {'com_auteur': result['parent_auteur'],
+                                    'com_contenu': result['parent_contenu']}
             else:
                 result['parent'] = None
 
@@ -147,7 +136,8 @@ class DisagreementReviewGUI:
         try:
             query = f"""
                 UPDATE UNIL_Commentaire 
-                SET {self.FINAL_COLUMN} = ?
+                SET {self.FINAL_COLUMN} = ?,
+                    com_haine_final_date = datetime('now', 'localtime')
                 WHERE com_id = ?
             """
             self.cursor.execute(query, (score, com_id))
@@ -292,11 +282,11 @@ class DisagreementReviewGUI:
             self.url_label.config(text="")
 
         # Annotations existantes
-        ann1 = item['annotation1']
-        ann2 = item['annotation2']
-
-        ann_text = f"Annotateur 1: Niveau {ann1} ({self.SCALE_INFO[ann1][0]})     "
-        ann_text += f"Annotateur 2: Niveau {ann2} ({self.SCALE_INFO[ann2][0]})"
+        # Annotateurs anonymisés pour la révision
+        ann_text = "     ".join(
+            f"Annotateur {i}: Niveau {score} ({self.SCALE_INFO[score][0]})"
+            for i, (_, score) in enumerate(item['annotations'], 1)
+        )
 
         if item['final_annotation'] is not None:
             ann_text += f"\n⚠️ Déjà révisé: Niveau {item['final_annotation']}"
@@ -379,7 +369,7 @@ def main():
         app.run()
     except FileNotFoundError as e:
         print(f"❌ Erreur: {e}")
-        print(f"\n💡 Usage: python review_disagreements.py [chemin_base_de_données]")
+        print(f"\n💡 Usage: python classify_review_gui.py [chemin_base_de_données]")
         print(f"   Par défaut: {db_path}")
         sys.exit(1)
     except Exception as e:
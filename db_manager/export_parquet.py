@@ -0,0 +1,273 @@
+import json
+import os
+import re
+import shutil
+import sqlite3
+import sys
+from datetime import datetime
+
+from db_manager.migrations import migrate
+
+# ✅ EXPORT COLONNAIRE (PARQUET) : le corpus est exporté en jeux de données Parquet
+# partitionnés par site et par mois de publication (répertoires site=.../mois=..., lisibles
+# par pyarrow.dataset, pandas.read_parquet, polars, DuckDB). Les lignes sont lues par blocs
+# de EXPORT_CHUNK_ROWS (fetchmany) : la mémoire reste bornée quelle que soit la taille de la base.
+#
+# Exports incrémentaux : les filigranes (rowid des commentaires, dates de scoring et de
+# révision finale, jou_id du journal des annotations) sont conservés dans export_etat.json ;
+# chaque exécution n'ajoute que de nouveaux fichiers part-<horodatage>.parquet. Les articles
+# (petite table, mis à jour par le crawler) sont réécrits en entier.
+#
+# Les dates sont à la seconde et une même seconde peut être commitée en plusieurs fois (le
+# scoring écrit par blocs) : le nombre de lignes à la date du filigrane est mémorisé et, s'il
+# a changé, cette seconde est réexportée (filigrane inclusif). Les annotations suivent le
+# journal (jou_id croissant dans l'ordre des commits), y compris celles fusionnées depuis les
+# bases d'annotateurs avec une date ancienne. Une même ligne peut donc apparaître plusieurs
+# fois : garder la plus récente (com_detox_date, com_haine_final_date, ann_date) par clé.
+# Les lignes sans date (reprises des anciennes bases) partent au premier export.
+#
+# Usage : python -m db_manager.export_parquet base.db [dossier_export] [--complet]
+EXPORT_DIR = "export"
+STATE_FILE = "export_etat.json"
+EXPORT_CHUNK_ROWS = 50_000
+
+# Chaque requête commence par (site, date de l'article) : clés de partition, non exportées
+DATASETS = {
+    "articles": {
+        "filigrane": None,  # Réécrit en entier
+        "sql": """
+               SELECT a.art_nom_journal, a.art_date,
+                      a.art_id, a.art_titre, a.art_url, a.art_categorie, a.art_date, a.art_description,
+                      a.art_commentaires_actifs, a.art_date_recolte, a.art_nom_pdf, a.art_hash_pdf,
+                      a.art_nb_commentaires
+               FROM UNIL_Article a
+               """,
+        "colonnes": [("art_id", "string"), ("art_titre", "string"), ("art_url", "string"),
+                     ("art_categorie", "string"), ("art_date", "string"), ("art_description", "string"),
+                     ("art_commentaires_actifs", "int64"), ("art_date_recolte", "string"),
+                     ("art_nom_pdf", "string"), ("art_hash_pdf", "string"), ("art_nb_commentaires", "int64")],
+    },
+    "commentaires": {
+        # (filigrane courant, nom, nombre de lignes à une date donnée : filigrane inclusif)
+        "filigrane": ("SELECT MAX(rowid) FROM UNIL_Commentaire", "rowid", None),
+        "sql": """
+               SELECT a.art_nom_journal, a.art_date,
+                      c.com_id, c.com_auteur, c.com_contenu, c.com_art_id, c.com_commentaire_parent
+               FROM UNIL_Commentaire c
+                        INNER JOIN UNIL_Article a ON a.art_id = c.com_art_id
+               WHERE (?1 IS NULL OR c.rowid > ?1)
+                 AND c.rowid <= ?2
+               ORDER BY c.rowid
+               """,
+        "colonnes": [("com_id", "string"), ("com_auteur", "string"), ("com_contenu", "string"),
+                     ("com_art_id", "string"), ("com_commentaire_parent", "string")],
+    },
+    "scores": {
+        "filigrane": ("SELECT MAX(com_detox_date) FROM UNIL_Commentaire", "com_detox_date",
+                      "SELECT COUNT(*) FROM UNIL_Commentaire WHERE com_detox_date = ?"),
+        "sql": """
+               SELECT a.art_nom_journal, a.art_date,
+                      c.com_id, c.com_detox_is_haine, c.com_detox_toxicity, c.com_detox_severe_toxicity,
+                      c.com_detox_obscene, c.com_detox_threat, c.com_detox_insult,
+                      c.com_detox_identity_attack, c.com_detox_date
+               FROM UNIL_Commentaire c
+                        INNER JOIN UNIL_Article a ON a.art_id = c.com_art_id
+               WHERE c.com_detox_is_haine IS NOT NULL
+                 AND (?1 IS NULL OR c.com_detox_date > ?1 OR (?3 AND c.com_detox_date = ?1))
+                 AND (c.com_detox_date IS NULL OR c.com_detox_date <= ?2)
+               """,
+        "colonnes": [("com_id", "string"), ("com_detox_is_haine", "float64"), ("com_detox_toxicity", "float64"),
+                     ("com_detox_severe_toxicity", "float64"), ("com_detox_obscene", "float64"),
+                     ("com_detox_threat", "float64"), ("com_detox_insult", "float64"),
+                     ("com_detox_identity_attack", "float64"), ("com_detox_date", "string")],
+    },
+    "revisions": {
+        "filigrane": ("SELECT MAX(com_haine_final_date) FROM UNIL_Commentaire", "com_haine_final_date",
+                      "SELECT COUNT(*) FROM UNIL_Commentaire WHERE com_haine_final_date = ?"),
+        "sql": """
+               SELECT a.art_nom_journal, a.art_date,
+                      c.com_id, c.com_haine_final, c.com_haine_final_date
+               FROM UNIL_Commentaire c
+                        INNER JOIN UNIL_Article a ON a.art_id = c.com_art_id
+               WHERE c.com_haine_final IS NOT NULL
+                 AND (?1 IS NULL OR c.com_haine_final_date > ?1 OR (?3 AND c.com_haine_final_date = ?1))
+                 AND (c.com_haine_final_date IS NULL OR c.com_haine_final_date <= ?2)
+               """,
+        "colonnes": [("com_id", "string"), ("com_haine_final", "int64"), ("com_haine_final_date", "string")],
+    },
+    "annotations": {
+        "filigrane": ("SELECT MAX(jou_id) FROM UNIL_Annotation_Journal", "jou_id", None),
+        "sql": """
+               SELECT a.art_nom_journal, a.art_date,
+                      an.ann_com_id, an.ann_tour, an.ann_annotateur, an.ann_score, an.ann_date
+               FROM UNIL_Annotation an
+                        INNER JOIN UNIL_Commentaire c ON c.com_id = an.ann_com_id
+                        INNER JOIN UNIL_Article a ON a.art_id = c.com_art_id
+               WHERE ?1 IS NULL
+                  OR (an.ann_com_id, an.ann_tour, an.ann_annotateur) IN (
+                          SELECT jou_com_id, jou_tour, jou_annotateur
+                          FROM UNIL_Annotation_Journal
+                          WHERE jou_id > ?1
+                            AND jou_id <= ?2)
+               """,
+        "colonnes": [("ann_com_id", "string"), ("ann_tour", "int64"), ("ann_annotateur", "string"),
+                     ("ann_score", "int64"), ("ann_date", "string")],
+    },
+}
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError("L'export Parquet nécessite pyarrow (pip install pyarrow)")
+    return pyarrow, pyarrow.parquet
+
+
+def _partition(site, art_date):
+    """Répertoire de partition : site=20min.ch_fr/mois=2024-05"""
+    site = re.sub(r"[^\w.-]+", "_", site or "inconnu").strip("_") or "inconnu"
+    mois = art_date[:7] if art_date and re.match(r"\d{4}-\d{2}", art_date) else "inconnu"
+    return os.path.join(f"site={site}", f"mois={mois}")
+
+
+def load_state(export_dir):
+    path = os.path.join(export_dir, STATE_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_state(export_dir, state):
+    """Écriture atomique de l'état (un export interrompu ne fait pas avancer les filigranes)"""
+    path = os.path.join(export_dir, STATE_FILE)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(state, f, ensure_ascii=False, indent=2)
+    os.replace(path + ".tmp", path)
+
+
+def export_dataset(conn, name, dataset_dir, run_id, params=()):
+    """
+    Exporte une requête de DATASETS par blocs, un fichier Parquet par partition.
+
+    Args:
+        conn: Connexion SQLite
+        name: Nom du jeu de données (clé de DATASETS)
+        dataset_dir: Répertoire du jeu de données
+        run_id: Horodatage de l'exécution (nom des fichiers)
+        params: (filigrane précédent, filigrane courant[, filigrane inclusif])
+
+    Returns:
+        int: Nombre de lignes exportées
+    """
+    pa, pq = _import_pyarrow()
+    spec = DATASETS[name]
+    schema = pa.schema([(col, getattr(pa, col_type)()) for col, col_type in spec["colonnes"]])
+    names = [col for col, _ in spec["colonnes"]]
+
+    writers = {}
+    total = 0
+    cursor = conn.execute(spec["sql"], params)
+    try:
+        while True:
+            rows = cursor.fetchmany(EXPORT_CHUNK_ROWS)
+            if not rows:
+                break
+            # Regroupement du bloc par partition
+            partitions = {}
+            for row in rows:
+                partitions.setdefault(_partition(row[0], row[1]), []).append(row[2:])
+            for partition, part_rows in partitions.items():
+                if partition not in writers:
+                    os.makedirs(os.path.join(dataset_dir, partition), exist_ok=True)
+                    writers[partition] = pq.ParquetWriter(
+                        os.path.join(dataset_dir, partition, f"part-{run_id}.parquet"), schema, compression="zstd")
+                columns = list(zip(*part_rows))
+                writers[partition].write_table(pa.Table.from_arrays(
+                    [pa.array(column, type=schema.field(i).type) for i, column in enumerate(columns)],
+                    names=names))
+            total += len(rows)
+    finally:
+        for writer in writers.values():
+            writer.close()
+    return total
+
+
+def export_corpus(db_path, export_dir=EXPORT_DIR, full=False):
+    """
+    Exporte (ou complète) le corpus au format Parquet.
+
+    Args:
+        db_path: Base SQLite
+        export_dir: Dossier de sortie
+        full: Ignorer les filigranes et tout réexporter
+
+    Returns:
+        dict {jeu de données: lignes exportées}
+    """
+    _import_pyarrow()
+    os.makedirs(export_dir, exist_ok=True)
+    state = {} if full else load_state(export_dir)
+    run_id = datetime.now().strftime("%Y%m%d%H%M%S")
+    counts = {}
+    # Nombre de lignes à la date de chaque filigrane inclusif lors du dernier export
+    at_watermark = state.setdefault("lignes_au_filigrane", {})
+
+    conn = sqlite3.connect(db_path)
+    try:
+        migrate(conn)
+        # Une seule transaction de lecture : instantané cohérent de la base (WAL)
+        conn.execute("BEGIN")
+        for name, spec in DATASETS.items():
+            dataset_dir = os.path.join(export_dir, name)
+            if spec["filigrane"] is None:
+                # Réécriture complète dans un dossier temporaire, puis remplacement
+                tmp_dir = dataset_dir + ".tmp"
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+                counts[name] = export_dataset(conn, name, tmp_dir, run_id)
+                shutil.rmtree(dataset_dir, ignore_errors=True)
+                if os.path.exists(tmp_dir):
+                    os.replace(tmp_dir, dataset_dir)
+                print(f"  ✓ {name} : {counts[name]} ligne(s) (réécriture complète)")
+                continue
+
+            if full:
+                shutil.rmtree(dataset_dir, ignore_errors=True)
+            watermark_sql, watermark_name, count_sql = spec["filigrane"]
+            numeric = watermark_name in ("rowid", "jou_id")
+            previous = state.get(name)
+            current = conn.execute(watermark_sql).fetchone()[0]
+            if previous is not None and isinstance(previous, str) == numeric:
+                # Filigrane d'un autre type (annotations suivies par date avant le journal)
+                print(f"  ⚠️ {name} : filigrane {previous!r} d'un ancien format, réexport complet")
+                previous = None
+            # Lignes commitées depuis le dernier export à la seconde du filigrane : elle est réexportée
+            inclusive = count_sql is not None and previous not in (None, "") and (
+                    conn.execute(count_sql, (previous,)).fetchone()[0] != at_watermark.get(name))
+            if current is not None and previous is not None and current <= previous and not inclusive:
+                counts[name] = 0
+                continue
+            params = (previous, current) + ((inclusive,) if count_sql is not None else ())
+            counts[name] = export_dataset(conn, name, dataset_dir, run_id, params)
+            # Aucune ligne datée : le filigrane marque tout de même l'export des lignes sans date
+            state[name] = current if current is not None else (0 if numeric else "")
+            if count_sql is not None and current is not None:
+                at_watermark[name] = conn.execute(count_sql, (current,)).fetchone()[0]
+            print(f"  ✓ {name} : {counts[name]} ligne(s) ({watermark_name} ≤ {current})")
+        conn.rollback()
+    finally:
+        conn.close()
+
+    save_state(export_dir, state)
+    return counts
+
+
+if __name__ == "__main__":
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    if not args:
+        print("Usage : python -m db_manager.export_parquet base.db [dossier_export] [--complet]")
+        sys.exit(1)
+    print(f"📦 Export Parquet de {args[0]}")
+    export_corpus(args[0], args[1] if len(args) > 1 else EXPORT_DIR, full="--complet" in sys.argv)
@@ -1,5 +1,112 @@
-import sqlite3
+import contextlib
+import hashlib
+import io
 import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+# Lancé depuis son dossier (python merger.py) : la racine du dépôt remplace le dossier du
+# script dans sys.path pour que le paquet db_manager soit importable
+if __name__ == "__main__" and not __package__:
+    sys.path[0] = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+from db_manager.migrations import migrate
+
+
+# ✅ VÉRIFICATION PAR EMPREINTES : les com_id de chaque base sont regroupés en seaux par
+# préfixe (substr(com_id, 1, n)) et résumés par (nombre, empreinte) via un agrégat SQL.
+# Deux bases identiques ne coûtent qu'un parcours de l'index de clé primaire chacune ;
+# seuls les seaux qui diffèrent sont redécoupés (préfixe plus long) jusqu'à LEAF_SIZE
+# commentaires, où les com_id manquants ou en trop sont listés par EXCEPT.
+LEAF_SIZE = 256
+MAX_RANGES_SHOWN = 5
+
+
+class _BucketDigest:
+    """
+    Agrégat SQL : XOR des hash() des com_id (indépendant de l'ordre).
+
+    hash() varie d'un processus à l'autre (PYTHONHASHSEED) mais pas au sein d'un même
+    processus : les empreintes ne servent qu'à comparer des bases lues ensemble.
+    """
+
+    def __init__(self):
+        self.digest = 0
+
+    def step(self, value):
+        self.digest ^= hash(value)
+
+    def finalize(self):
+        return str(self.digest)
+
+
+def _uri(path):
+    """URI SQLite en lecture seule"""
+    return Path(path).resolve().as_uri() + "?mode=ro"
+
+
+def _bucket_digests(conn, schema, prefix, depth):
+    """{préfixe de longueur depth: (nombre, empreinte)} des com_id commençant par prefix"""
+    rows = conn.execute(f"""
+        SELECT substr(com_id, 1, ?), COUNT(*), bucket_digest(com_id)
+        FROM {schema}.UNIL_Commentaire
+        WHERE com_id >= ? AND com_id < ? || char(1114111)
+        GROUP BY 1
+    """, (depth, prefix, prefix))
+    return {bucket: (count, digest) for bucket, count, digest in rows}
+
+
+def _leaf_diff(conn, schema, prefix, exact):
+    """com_id manquants et en trop dans schema pour un seau (exact : com_id = prefix)"""
+    condition = "com_id = ?1" if exact else "com_id >= ?1 AND com_id < ?1 || char(1114111)"
+    missing = [row[0] for row in conn.execute(f"""
+        SELECT com_id FROM main.UNIL_Commentaire WHERE {condition}
+        EXCEPT
+        SELECT com_id FROM {schema}.UNIL_Commentaire WHERE {condition}
+    """, (prefix,))]
+    extra = [row[0] for row in conn.execute(f"""
+        SELECT com_id FROM {schema}.UNIL_Commentaire WHERE {condition}
+        EXCEPT
+        SELECT com_id FROM main.UNIL_Commentaire WHERE {condition}
+    """, (prefix,))]
+    return missing, extra
+
+
+def diff_ranges(conn, schema, prefix="", depth=1, master=None):
+    """
+    Compare les com_id de la base principale et d'une base attachée, seau par seau.
+
+    Args:
+        conn: Connexion (base principale en main, bucket_digest enregistré)
+        schema: Alias de la base attachée
+        prefix: Préfixe de com_id à comparer ("" pour toute la table)
+        depth: Longueur des préfixes des seaux
+        master: Seaux de la base principale déjà calculés (réutilisés d'une base à l'autre)
+
+    Returns:
+        Liste de tuples (préfixe divergent, com_id manquants, com_id en trop)
+    """
+    if master is None:
+        master = _bucket_digests(conn, "main", prefix, depth)
+    person = _bucket_digests(conn, schema, prefix, depth)
+    ranges = []
+    for bucket in sorted(set(master) | set(person)):
+        if master.get(bucket) == person.get(bucket):
+            continue
+        counts = (master.get(bucket, (0, None))[0], person.get(bucket, (0, None))[0])
+        # Un préfixe plus court que depth est un com_id complet : seau d'un seul élément
+        exact = len(bucket) < depth
+        if exact or min(counts) == 0 or max(counts) <= LEAF_SIZE:
+            missing, extra = _leaf_diff(conn, schema, bucket, exact)
+            ranges.append((bucket, missing, extra))
+        else:
+            ranges.extend(diff_ranges(conn, schema, bucket, depth + 1))
+    return ranges
 
 
 def verify_compatibility(master_db, person_dbs):
@@ -10,14 +117,12 @@ def verify_compatibility(master_db, person_dbs):
         bool: True si toutes les bases sont compatibles, False sinon
     """
 
-    conn_master = sqlite3.connect(master_db)
-    cursor_master = conn_master.cursor()
+    conn = sqlite3.connect(_uri(master_db), uri=True)
+    conn.create_aggregate("bucket_digest", 1, _BucketDigest)
+    master_buckets = _bucket_digests(conn, "main", "", 1)
+    master_count = sum(count for count, _ in master_buckets.values())
 
-    cursor_master.execute("SELECT com_id FROM UNIL_Commentaire ORDER BY com_id")
-    master_ids = set(row[0] for row in cursor_master.fetchall())
-    conn_master.close()
-
-    print(f"Base master : {len(master_ids)} commentaires")
+    print(f"Base master : {master_count} commentaires")
 
     all_compatible = True
 
@@ -27,33 +132,38 @@ def verify_compatibility(master_db, person_dbs):
             all_compatible = False
             continue
 
-        conn_person = sqlite3.connect(person_db_path)
-        cursor_person = conn_person.cursor()
-
-        cursor_person.execute("SELECT com_id FROM UNIL_Commentaire ORDER BY com_id")
-        person_ids = set(row[0] for row in cursor_person.fetchall())
-        conn_person.close()
+        start = time.perf_counter()
+        conn.execute("ATTACH DATABASE ? AS person", (_uri(person_db_path),))
+        try:
+            person_count = conn.execute("SELECT COUNT(*) FROM person.UNIL_Commentaire").fetchone()[0]
+            ranges = diff_ranges(conn, "person", master=master_buckets)
+        finally:
+            conn.execute("DETACH DATABASE person")
 
         # Vérifier les différences
-        only_in_master = master_ids - person_ids
-        only_in_person = person_ids - master_ids
+        only_in_master = [com_id for _, missing, _ in ranges for com_id in missing]
+        only_in_person = [com_id for _, _, extra in ranges for com_id in extra]
 
         print(f"\n{person_name}:")
-        print(f"  - Commentaires : {len(person_ids)}")
+        print(f"  - Commentaires : {person_count}")
         print(f"  - Manquants dans {person_name} : {len(only_in_master)}")
         print(f"  - En trop dans {person_name} : {len(only_in_person)}")
 
         # Marquer comme incompatible s'il y a des différences
-        if only_in_master or only_in_person:
+        if ranges:
             all_compatible = False
-            print(f"  ❌ INCOMPATIBLE")
+            print(f"  ❌ INCOMPATIBLE ({len(ranges)} plage(s) divergente(s), {time.perf_counter() - start:.2f} s)")
 
+            for prefix, missing, extra in ranges[:MAX_RANGES_SHOWN]:
+                print(f"    Plage « {prefix}* » : {len(missing)} manquant(s), {len(extra)} en trop")
             if only_in_master:
-                print(f"    Exemples manquants : {list(only_in_master)[:5]}")
+                print(f"    Exemples manquants : {only_in_master[:5]}")
             if only_in_person:
-                print(f"    Exemples en trop : {list(only_in_person)[:5]}")
+                print(f"    Exemples en trop : {only_in_person[:5]}")
         else:
-            print(f"  ✓ Compatible")
+            print(f"  ✓ Compatible ({time.perf_counter() - start:.2f} s)")
+
+    conn.close()
 
     print(f"\n{'=' * 50}")
     if all_compatible:
@@ -64,82 +174,391 @@ def verify_compatibility(master_db, person_dbs):
 
     return all_compatible
 
-def merge_databases(master_db, person_dbs, output_db=None):
+# ✅ SYNCHRONISATION INCRÉMENTALE : chaque base tient un journal de ses annotations
+# (UNIL_Annotation_Journal, alimenté par triggers, migration 0011). La base fusionnée
+# retient pour chaque source le dernier jou_id déjà fusionné (UNIL_Synchro) : une fusion
+# ne lit que les changements postérieurs. Pour chaque annotation modifiée, l'état final
+# de la source n'est appliqué que si la base fusionnée a encore la valeur d'avant le
+# changement ; sinon (modifiée entre-temps des deux côtés) il est consigné dans UNIL_Conflit.
+# Une annotation sur un commentaire encore absent de la base fusionnée n'est pas perdue :
+# le filigrane s'arrête juste avant elle et elle est relue à la fusion suivante.
+# Les bases sources ne sont jamais modifiées (attachées en lecture seule).
+JOURNAL_VERSION = 11   # Migration 0011 : journal des annotations, requis dans chaque source
+
+DELTA_SQL = """
+    CREATE TEMP TABLE _delta AS
+    WITH changements AS (
+        SELECT jou_com_id, jou_tour, jou_annotateur, jou_score, jou_date,
+               FIRST_VALUE(jou_id) OVER cle AS premier_jou_id,
+               FIRST_VALUE(jou_score_avant) OVER cle AS score_avant,
+               ROW_NUMBER() OVER (PARTITION BY jou_com_id, jou_tour, jou_annotateur
+                                  ORDER BY jou_id DESC) AS rang
+        FROM {alias}.UNIL_Annotation_Journal
+        WHERE jou_id > ? AND jou_id <= ?
+          AND jou_annotateur = ?
+        WINDOW cle AS (PARTITION BY jou_com_id, jou_tour, jou_annotateur ORDER BY jou_id)
+    )
+    SELECT d.jou_com_id AS com_id, d.jou_tour AS tour, d.jou_annotateur AS annotateur,
+           d.premier_jou_id, d.score_avant, d.jou_score AS score, d.jou_date AS date, m.ann_score AS score_maitre,
+           CASE
+               WHEN c.com_id IS NULL THEN 'absent'
+               WHEN m.ann_score IS d.jou_score THEN 'identique'
+               WHEN m.ann_score IS d.score_avant THEN 'applique'
+               ELSE 'conflit'
+           END AS etat
+    FROM changements d
+             LEFT JOIN main.UNIL_Commentaire c ON c.com_id = d.jou_com_id
+             LEFT JOIN main.UNIL_Annotation m
+                       ON m.ann_com_id = d.jou_com_id AND m.ann_tour = d.jou_tour
+                           AND m.ann_annotateur = d.jou_annotateur
+    WHERE d.rang = 1
+"""
+
+
+def _sync_source(conn, person_name, alias, date):
     """
-    Fusionne plusieurs bases de données SQLite.
+    Fusionne les changements d'une source attachée depuis son filigrane.
+
+    Returns:
+        dict {changements, appliques, identiques, conflits, absents}
+    """
+    row = conn.execute("SELECT syn_jou_id FROM UNIL_Synchro WHERE syn_source = ?", (person_name,)).fetchone()
+    last = row[0] if row else 0
+    head = conn.execute(f"SELECT COALESCE(MAX(jou_id), 0) FROM {alias}.UNIL_Annotation_Journal").fetchone()[0]
+    if head < last:
+        # Base de l'annotateur remplacée (journal plus court que le filigrane) : tout relire
+        print(f"   ⚠️ Journal de {person_name} réinitialisé, resynchronisation complète")
+        last = 0
+
+    conn.execute(DELTA_SQL.format(alias=alias), (last, head, person_name.lower()))
+    try:
+        stats = dict(conn.execute("SELECT etat, COUNT(*) FROM _delta GROUP BY etat").fetchall())
+
+        # Changements sans concurrence : insertion / mise à jour, puis suppressions
+        conn.execute("""
+            INSERT INTO UNIL_Annotation (ann_com_id, ann_tour, ann_annotateur, ann_score, ann_date)
+            SELECT com_id, tour, annotateur, score, date
+            FROM _delta
+            WHERE etat = 'applique' AND score IS NOT NULL
+            ON CONFLICT(ann_com_id, ann_tour, ann_annotateur) DO UPDATE SET
+                ann_score = excluded.ann_score,
+                ann_date  = excluded.ann_date
+        """)
+        appliques = conn.execute("SELECT changes()").fetchone()[0]
+        conn.execute("""
+            DELETE FROM UNIL_Annotation
+            WHERE (ann_com_id, ann_tour, ann_annotateur) IN
+                  (SELECT com_id, tour, annotateur FROM _delta WHERE etat = 'applique' AND score IS NULL)
+        """)
+        appliques += conn.execute("SELECT changes()").fetchone()[0]
+
+        # Les conflits précédents sur ces annotations sont remplacés par l'état actuel
+        conn.execute("""
+            UPDATE UNIL_Conflit
+            SET con_resolu = 1
+            WHERE con_resolu = 0
+              AND con_source = ?
+              AND (con_com_id, con_tour, con_annotateur) IN (SELECT com_id, tour, annotateur FROM _delta)
+        """, (person_name,))
+        conn.execute("""
+            INSERT INTO UNIL_Conflit (con_source, con_com_id, con_tour, con_annotateur, con_score_avant,
+                                      con_score_maitre, con_score_source, con_date_source, con_date)
+            SELECT ?, com_id, tour, annotateur, score_avant, score_maitre, score, date, ?
+            FROM _delta
+            WHERE etat = 'conflit'
+        """, (person_name, date))
+
+        # Annotations sur des commentaires absents : relues à partir de la première d'entre elles
+        first_absent = conn.execute("SELECT MIN(premier_jou_id) FROM _delta WHERE etat = 'absent'").fetchone()[0]
+        watermark = head if first_absent is None else first_absent - 1
+        conn.execute("""
+            INSERT INTO UNIL_Synchro (syn_source, syn_jou_id, syn_date) VALUES (?, ?, ?)
+            ON CONFLICT(syn_source) DO UPDATE SET
+                syn_jou_id = excluded.syn_jou_id,
+                syn_date   = excluded.syn_date
+        """, (person_name, watermark, date))
+    finally:
+        conn.execute("DROP TABLE temp._delta")
+
+    return {"changements": sum(stats.values()), "appliques": appliques,
+            "identiques": stats.get("identique", 0), "conflits": stats.get("conflit", 0),
+            "absents": stats.get("absent", 0)}
+
+
+def _column_names(conn, schema, table):
+    return [row[1] for row in conn.execute(f"PRAGMA {schema}.table_info({table})")]
+
+
+def _pull_master(conn, alias):
+    """
+    Ajoute à la base fusionnée les articles et commentaires arrivés dans la base principale
+    depuis sa copie (colonnes communes aux deux schémas, lignes existantes inchangées).
+
+    Returns:
+        int: Nombre de lignes ajoutées
+    """
+    added = 0
+    for table in ("UNIL_Article", "UNIL_Commentaire"):
+        source_columns = set(_column_names(conn, alias, table))
+        columns = ", ".join(c for c in _column_names(conn, "main", table) if c in source_columns)
+        conn.execute(f"INSERT OR IGNORE INTO main.{table} ({columns}) SELECT {columns} FROM {alias}.{table}")
+        added += conn.execute("SELECT changes()").fetchone()[0]
+    return added
+
+
+def merge_databases(master_db, person_dbs, output_db=None, full=False):
+    """
+    Fusionne plusieurs bases de données SQLite (incrémental).
+
+    Chaque base d'annotateur est attachée (ATTACH, en lecture seule) à la base de sortie ; seuls ses changements
+    journalisés depuis la fusion précédente sont lus et appliqués en quelques instructions
+    ensemblistes. Toutes les sources sont fusionnées dans une seule transaction (tout ou rien).
 
     Args:
         master_db: chemin vers la base principale
         person_dbs: dict {'nom_personne': 'chemin_db', ...}
         output_db: chemin de sortie (si None, écrase master_db)
+        full: recopier la base principale vers output_db et tout refusionner
+
+    Returns:
+        dict {nom_personne: {changements, appliques, identiques, conflits, absents}}
     """
 
     if output_db is None:
         output_db = master_db
-    elif output_db != master_db:
-        # Copier la base master vers output
-        import shutil
+    elif output_db != master_db and (full or not os.path.exists(output_db)):
+        # Copier la base master vers output (les fusions suivantes la complètent)
         shutil.copy2(master_db, output_db)
 
-    conn_master = sqlite3.connect(output_db)
-    cursor_master = conn_master.cursor()
-
-    # Pour chaque personne
+    # uri=True : les sources sont attachées en lecture seule (file:...?mode=ro)
+    conn_master = sqlite3.connect(output_db, uri=True)
+    migrate(conn_master)
+    if full:
+        conn_master.execute("DELETE FROM UNIL_Synchro")
+        conn_master.commit()
+
+    # ATTACH est interdit dans une transaction : toutes les bases sont attachées avant
+    master_alias = None
+    if os.path.abspath(master_db) != os.path.abspath(output_db):
+        master_alias = "principale"
+        conn_master.execute(f"ATTACH DATABASE ? AS {master_alias}", (_uri(master_db),))
+    sources = {}
     for person_name, person_db_path in person_dbs.items():
-        print(f"\n=== Fusion des données de {person_name} ===")
-
         if not os.path.exists(person_db_path):
             print(f"⚠️  Base {person_db_path} introuvable, ignorée")
             continue
-
-        conn_person = sqlite3.connect(person_db_path)
-        cursor_person = conn_person.cursor()
-
-        # Obtenir la colonne correspondante (ex: com_verif_haine_luca)
-        column_name = f"com_verif_haine_{person_name.lower()}"
-
-        # Vérifier que la colonne existe
-        cursor_master.execute("PRAGMA table_info(UNIL_Commentaire)")
-        columns = [row[1] for row in cursor_master.fetchall()]
-
-        if column_name not in columns:
-            print(f"⚠️  Colonne {column_name} introuvable dans la base master")
+        alias = f"src_{len(sources)}"
+        conn_master.execute(f"ATTACH DATABASE ? AS {alias}", (_uri(person_db_path),))
+        version = conn_master.execute(f"PRAGMA {alias}.user_version").fetchone()[0]
+        if version < JOURNAL_VERSION:
+            # Pas de journal : la base de l'annotateur doit être mise à jour (elle n'est jamais modifiée ici)
+            conn_master.execute(f"DETACH DATABASE {alias}")
+            print(f"❌ Base {person_db_path} en version {version} (journal des annotations requis), ignorée.\n"
+                  f"   Mettre à jour : python -m db_manager.migrations {person_db_path}")
             continue
+        sources[person_name] = alias
+
+    stats = {}
+    date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    try:
+        conn_master.execute("BEGIN IMMEDIATE")
+        if master_alias:
+            pulled = _pull_master(conn_master, master_alias)
+            if pulled:
+                print(f"   + {pulled} article(s) / commentaire(s) repris de {master_db}")
+        for person_name, alias in sources.items():
+            print(f"\n=== Fusion des données de {person_name} ===")
+            stats[person_name] = person_stats = _sync_source(conn_master, person_name, alias, date)
+
+            print(f"   {person_stats['changements']} annotation(s) modifiée(s) depuis la dernière fusion")
+            print(f"   ✓ {person_stats['appliques']} annotations mises à jour")
+            if person_stats["identiques"]:
+                print(f"   = {person_stats['identiques']} déjà à jour")
+            if person_stats["absents"]:
+                print(f"   ⚠️ {person_stats['absents']} sur des commentaires absents de la base fusionnée "
+                      f"(relues à la prochaine fusion)")
+            if person_stats["conflits"]:
+                print(f"   ❌ {person_stats['conflits']} conflit(s) non appliqué(s) (voir UNIL_Conflit)")
+        conn_master.commit()
+    except Exception:
+        conn_master.rollback()
+        raise
+    finally:
+        for alias in [*sources.values(), *([master_alias] if master_alias else [])]:
+            conn_master.execute(f"DETACH DATABASE {alias}")
+        conn_master.close()
 
-        # Récupérer les données de la personne
-        cursor_person.execute(f"""
-            SELECT com_id, {column_name}
-            FROM UNIL_Commentaire
-            WHERE {column_name} IS NOT NULL
-        """)
+    print(f"\n✓ Fusion terminée : {output_db}")
+    return stats
 
-        updates = cursor_person.fetchall()
-        print(f"   {len(updates)} lignes à mettre à jour")
 
-        # Mettre à jour dans la base master
-        updated_count = 0
-        for com_id, value in updates:
-            cursor_master.execute(f"""
-                UPDATE UNIL_Commentaire
-                SET {column_name} = ?
-                WHERE com_id = ?
-            """, (value, com_id))
+def conflict_report(db_path, limit=20):
+    """
+    Affiche les conflits non résolus de la base fusionnée.
 
-            if cursor_master.rowcount > 0:
-                updated_count += 1
+    Returns:
+        int: Nombre de conflits non résolus
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        migrate(conn, verbose=False)
+        rows = conn.execute("""
+            SELECT con_id, con_source, con_com_id, con_tour, con_annotateur,
+                   con_score_avant, con_score_maitre, con_score_source, con_date_source
+            FROM UNIL_Conflit
+            WHERE con_resolu = 0
+            ORDER BY con_id
+        """).fetchall()
+    finally:
+        conn.close()
+
+    if not rows:
+        print("✓ Aucun conflit en attente")
+        return 0
+    print(f"❌ {len(rows)} conflit(s) en attente :")
+    for con_id, source, com_id, tour, annotateur, avant, maitre, score, date_source in rows[:limit]:
+        print(f"  #{con_id} {com_id} (tour {tour}, {annotateur}) : base fusionnée {maitre}, "
+              f"{source} {avant} → {score} le {date_source}")
+    if len(rows) > limit:
+        print(f"  ... et {len(rows) - limit} autre(s)")
+    return len(rows)
+
+
+def resolve_conflicts(db_path, keep="source"):
+    """
+    Résout tous les conflits en attente.
 
-        print(f"   ✓ {updated_count} lignes mises à jour")
+    Args:
+        db_path: Base fusionnée
+        keep: "source" (appliquer la valeur de l'annotateur) ou "fusion" (garder la valeur actuelle)
 
-        conn_person.close()
+    Returns:
+        int: Nombre de conflits résolus
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        migrate(conn, verbose=False)
+        conn.execute("BEGIN IMMEDIATE")
+        if keep == "source":
+            # Le conflit le plus récent de chaque annotation l'emporte
+            conn.execute("""
+                INSERT INTO UNIL_Annotation (ann_com_id, ann_tour, ann_annotateur, ann_score, ann_date)
+                SELECT con_com_id, con_tour, con_annotateur, con_score_source, con_date_source
+                FROM UNIL_Conflit
+                WHERE con_id IN (SELECT MAX(con_id) FROM UNIL_Conflit WHERE con_resolu = 0
+                                 GROUP BY con_com_id, con_tour, con_annotateur)
+                  AND con_score_source IS NOT NULL
+                ON CONFLICT(ann_com_id, ann_tour, ann_annotateur) DO UPDATE SET
+                    ann_score = excluded.ann_score,
+                    ann_date  = excluded.ann_date
+            """)
+            conn.execute("""
+                DELETE FROM UNIL_Annotation
+                WHERE (ann_com_id, ann_tour, ann_annotateur) IN
+                      (SELECT con_com_id, con_tour, con_annotateur
+                       FROM UNIL_Conflit
+                       WHERE con_id IN (SELECT MAX(con_id) FROM UNIL_Conflit WHERE con_resolu = 0
+                                        GROUP BY con_com_id, con_tour, con_annotateur)
+                         AND con_score_source IS NULL)
+            """)
+        resolved = conn.execute("UPDATE UNIL_Conflit SET con_resolu = 1 WHERE con_resolu = 0").rowcount
+        conn.commit()
+    finally:
+        conn.close()
+    print(f"✓ {resolved} conflit(s) résolu(s) (valeur conservée : {keep})")
+    return resolved
+
+
+def _file_digest(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def self_check():
+    """
+    Rejoue sur des bases temporaires les cas délicats de la fusion incrémentale :
+    commentaire arrivé dans la base principale après la première fusion, commentaire encore
+    absent partout (annotation relue plus tard), sources laissées intactes, source sans journal.
 
-    conn_master.commit()
-    conn_master.close()
-    print(f"\n✓ Fusion terminée : {output_db}")
+    Returns:
+        bool: True si tous les contrôles passent
+    """
+    workdir = tempfile.mkdtemp(prefix="merger-")
+    master, luca, output = (os.path.join(workdir, name) for name in ("principale.db", "luca.db", "fusion.db"))
+
+    def execute(path, *statements):
+        conn = sqlite3.connect(path)
+        migrate(conn, verbose=False)
+        for statement in statements:
+            conn.execute(statement)
+        conn.commit()
+        conn.close()
+
+    def merged_score(com_id):
+        conn = sqlite3.connect(output)
+        row = conn.execute("SELECT ann_score FROM UNIL_Annotation WHERE ann_com_id = ? AND ann_annotateur = 'luca'",
+                           (com_id,)).fetchone()
+        conn.close()
+        return row[0] if row else None
+
+    def merge():
+        with contextlib.redirect_stdout(io.StringIO()):
+            return merge_databases(master, {"luca": luca}, output_db=output)["luca"]
+
+    def comment(com_id):
+        return f"INSERT INTO UNIL_Commentaire (com_id, com_art_id, com_contenu) VALUES ('{com_id}', 'a1', '...')"
+
+    def annotate(com_id, score):
+        return (f"INSERT INTO UNIL_Annotation (ann_com_id, ann_tour, ann_annotateur, ann_score) "
+                f"VALUES ('{com_id}', 1, 'luca', {score})")
+
+    checks = []
+    try:
+        execute(master, "INSERT INTO UNIL_Article (art_id) VALUES ('a1')", comment("c1"))
+        shutil.copy2(master, luca)
+        execute(luca, annotate("c1", 2))
+        merge()
+        checks.append(("première fusion", merged_score("c1") == 2))
+
+        # c2 récolté après la première fusion : présent dans la principale et chez l'annotateur
+        execute(master, comment("c2"))
+        execute(luca, comment("c2"), annotate("c2", 5))
+        merge()
+        checks.append(("commentaire arrivé dans la base principale après la copie", merged_score("c2") == 5))
+
+        # c3 seulement chez l'annotateur : annotation absente, relue quand c3 arrive
+        execute(luca, comment("c3"), annotate("c3", 4),
+                "UPDATE UNIL_Annotation SET ann_score = 3 WHERE ann_com_id = 'c1'")
+        digest = _file_digest(luca)
+        stats = merge()
+        checks.append(("annotation sur commentaire absent signalée", stats["absents"] == 1 and merged_score("c3") is None))
+        checks.append(("changements suivants appliqués malgré l'absent", merged_score("c1") == 3))
+        checks.append(("base de l'annotateur inchangée", _file_digest(luca) == digest))
+        execute(master, comment("c3"))
+        merge()
+        checks.append(("annotation absente appliquée à la fusion suivante", merged_score("c3") == 4))
+        stats = merge()
+        checks.append(("fusion sans changement", stats["changements"] == 0))
+
+        # Base sans journal : ignorée, jamais migrée en place
+        execute(luca, "PRAGMA user_version = 10")
+        digest = _file_digest(luca)
+        with contextlib.redirect_stdout(io.StringIO()):
+            stats = merge_databases(master, {"luca": luca}, output_db=output)
+        checks.append(("base sans journal ignorée et non modifiée", "luca" not in stats and _file_digest(luca) == digest))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    for name, ok in checks:
+        print(f"  {'✓' if ok else '❌'} {name}")
+    return all(ok for _, ok in checks)
 
 
 # Utilisation
 if __name__ == "__main__":
+    # python -m db_manager.merger [--complet] [--conflits] [--resoudre source|fusion] [--verifier]
     master_db = "UNIL_IVI_GR4.db"
+    output_db = "UNIL_IVI_GR4_Merged.db"
 
     person_dbs = {
         'luca': 'UNIL_IVI_GR4_luca.db',
@@ -148,10 +567,22 @@ if __name__ == "__main__":
         'severin': 'UNIL_IVI_GR4_severin.db'
     }
 
+    if "--verifier" in sys.argv:
+        print("🔎 Contrôle de la fusion incrémentale (bases temporaires)")
+        sys.exit(0 if self_check() else 1)
+    elif "--conflits" in sys.argv:
+        conflict_report(output_db)
+    elif "--resoudre" in sys.argv:
+        keep = sys.argv[sys.argv.index("--resoudre") + 1] if len(sys.argv) > sys.argv.index("--resoudre") + 1 else ""
+        if keep not in ("source", "fusion"):
+            print("Usage : python -m db_manager.merger --resoudre source|fusion")
+            sys.exit(1)
+        resolve_conflicts(output_db, keep)
     # Vérifier avant de fusionner
-    if verify_compatibility(master_db, person_dbs):
+    elif verify_compatibility(master_db, person_dbs):
         print("Lancement de la fusion...\n")
-        merge_databases(master_db, person_dbs, output_db="UNIL_IVI_GR4_Merged.db")
+        merge_databases(master_db, person_dbs, output_db=output_db, full="--complet" in sys.argv)
+        conflict_report(output_db)
     else:
         print("⚠️  Fusion annulée en raison d'incompatibilités")
-        print("Veuillez vérifier que toutes les bases proviennent de la même source")
\ No newline at end of file
+        print("Veuillez vérifier que toutes les bases proviennent de la même source")
@@ -0,0 +1,192 @@
+import re
+import sqlite3
+import sys
+from datetime import datetime
+from pathlib import Path
+
+# ✅ MIGRATIONS DE SCHÉMA VERSIONNÉES : chaque évolution du schéma est un fichier SQL
+# numéroté de db_manager/migrations/ (0001_xxx.sql, 0002_xxx.sql...). La version d'une
+# base est stockée dans PRAGMA user_version (lecture quasi gratuite : une base à jour
+# ne coûte qu'un PRAGMA) et l'historique dans UNIL_Schema_Version. Chaque outil
+# (scraper, Detoxify, annotation, révision, fusion) appelle migrate() à l'ouverture.
+# Usage depuis la racine du dépôt : python -m db_manager.migrations base.db [--verifier]
+MIGRATIONS_DIR = Path(__file__).resolve().parent / "migrations"
+SCHEMA_PATH = Path(__file__).resolve().parent.parent / "scraper" / "db_schema.sql"
+VERSION_TABLE = "UNIL_Schema_Version"
+
+_MIGRATION_RE = re.compile(r"^(\d{4})_(\w+)\.sql$")
+_ADD_COLUMN_RE = re.compile(r"^\s*ALTER\s+TABLE\s+(\w+)\s+ADD\s+(?:COLUMN\s+)?(\w+)", re.IGNORECASE)
+_DROP_COLUMN_RE = re.compile(r"^\s*ALTER\s+TABLE\s+(\w+)\s+DROP\s+(?:COLUMN\s+)?(\w+)", re.IGNORECASE)
+
+
+def list_migrations():
+    """
+    Liste les migrations disponibles, dans l'ordre.
+
+    Returns:
+        Liste de tuples (numéro, nom, chemin)
+    """
+    migrations = []
+    for path in sorted(MIGRATIONS_DIR.glob("*.sql")):
+        match = _MIGRATION_RE.match(path.name)
+        if match:
+            migrations.append((int(match.group(1)), match.group(2), path))
+    return migrations
+
+
+LATEST_VERSION = max((num for num, _, _ in list_migrations()), default=0)
+
+
+def _split_statements(sql):
+    """Découpe un script SQL en instructions (les corps de triggers BEGIN ... END restent entiers)"""
+    statements, current = [], ""
+    for line in sql.splitlines(keepends=True):
+        if not current and line.strip().startswith("--"):
+            continue
+        current += line
+        if sqlite3.complete_statement(current):
+            if current.strip():
+                statements.append(current.strip())
+            current = ""
+    if current.strip():
+        statements.append(current.strip())
+    return statements
+
+
+def _columns(conn, table):
+    return {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+
+
+def _table_exists(conn, table):
+    return conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+                        (table,)).fetchone() is not None
+
+
+def _apply_script(conn, sql):
+    """Exécute un script de migration ; les colonnes déjà ajoutées (ou absentes) sont ignorées"""
+    for statement in _split_statements(sql):
+        match = _ADD_COLUMN_RE.match(statement)
+        if match and match.group(2) in _columns(conn, match.group(1)):
+            continue  # Colonne ajoutée avant les migrations (ALTER ad hoc des anciens scripts)
+        match = _DROP_COLUMN_RE.match(statement)
+        if match and match.group(2) not in _columns(conn, match.group(1)):
+            continue
+        conn.execute(statement)
+
+
+def current_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn, verbose=True):
+    """
+    Amène une base à la dernière version du schéma (idempotent).
+
+    Une base neuve reçoit directement le schéma complet (scraper/db_schema.sql) ; une base
+    existante reçoit les migrations manquantes, le tout dans une seule transaction.
+
+    Args:
+        conn: Connexion SQLite ouverte
+        verbose: Afficher les migrations appliquées
+
+    Returns:
+        int: Version du schéma après migration
+    """
+    version = current_version(conn)
+    if version == LATEST_VERSION:
+        return version
+    if version > LATEST_VERSION:
+        raise RuntimeError(f"Base en version {version}, plus récente que le code (version {LATEST_VERSION})")
+
+    if conn.in_transaction:
+        conn.commit()
+    # BEGIN IMMEDIATE : un seul processus migre, les autres attendent puis relisent la version
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        version = current_version(conn)
+        conn.execute(f"""
+                     CREATE TABLE IF NOT EXISTS {VERSION_TABLE} (
+                         ver_numero INTEGER PRIMARY KEY,
+                         ver_nom VARCHAR,
+                         ver_date VARCHAR
+                     )""")
+        date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+        if version == 0 and not _table_exists(conn, "UNIL_Article"):
+            # Base neuve : schéma complet en une fois
+            _apply_script(conn, SCHEMA_PATH.read_text(encoding="utf-8"))
+            conn.executemany(f"INSERT OR REPLACE INTO {VERSION_TABLE} VALUES (?, ?, ?)",
+                             [(num, name, date) for num, name, _ in list_migrations()])
+            if verbose:
+                print(f"✓ Schéma complet créé (version {LATEST_VERSION})")
+        else:
+            for num, name, path in list_migrations():
+                if num <= version:
+                    continue
+                _apply_script(conn, path.read_text(encoding="utf-8"))
+                conn.execute(f"INSERT OR REPLACE INTO {VERSION_TABLE} VALUES (?, ?, ?)", (num, name, date))
+                if verbose:
+                    print(f"✓ Migration {num:04d} appliquée : {name}")
+
+        conn.execute(f"PRAGMA user_version = {LATEST_VERSION}")
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return LATEST_VERSION
+
+
+def migrate_database(db_path, verbose=True):
+    """Ouvre une base, la migre puis la ferme"""
+    conn = sqlite3.connect(str(db_path), timeout=30)
+    try:
+        return migrate(conn, verbose)
+    finally:
+        conn.close()
+
+
+def _describe(conn):
+    """Colonnes et index de chaque table (comparaison de schémas)"""
+    description = {}
+    for name, obj_type in conn.execute("""
+                                       SELECT name, type
+                                       FROM sqlite_master
+                                       WHERE type IN ('table', 'index', 'view', 'trigger')
+                                         AND name NOT LIKE 'sqlite_%'
+                                       """):
+        if obj_type == "table":
+            description[name] = [row[1:] for row in conn.execute(f"PRAGMA table_info({name})")]
+        elif obj_type == "index":
+            description[name] = [row[2] for row in conn.execute(f"PRAGMA index_info({name})")]
+        else:
+            description[name] = obj_type
+    return description
+
+
+def schema_drift():
+    """
+    Compare le schéma complet avec le résultat de toutes les migrations appliquées à la suite.
+
+    Returns:
+        Liste des objets qui diffèrent (vide si db_schema.sql est à jour)
+    """
+    from_schema = sqlite3.connect(":memory:")
+    from_migrations = sqlite3.connect(":memory:")
+    migrate(from_schema, verbose=False)
+    _apply_script(from_migrations, list_migrations()[0][2].read_text(encoding="utf-8"))
+    from_migrations.execute("PRAGMA user_version = 1")
+    migrate(from_migrations, verbose=False)
+
+    a, b = _describe(from_schema), _describe(from_migrations)
+    return sorted(name for name in set(a) | set(b) if a.get(name) != b.get(name))
+
+
+if __name__ == "__main__":
+    if "--verifier" in sys.argv:
+        drift = schema_drift()
+        if drift:
+            print(f"❌ db_schema.sql diffère des migrations : {', '.join(drift)}")
+            sys.exit(1)
+        print(f"✓ db_schema.sql correspond aux migrations (version {LATEST_VERSION})")
+    for db_path in [arg for arg in sys.argv[1:] if not arg.startswith("--")]:
+        print(f"📁 {db_path} : version {migrate_database(db_path)}")
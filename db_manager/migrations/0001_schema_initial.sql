@@ -0,0 +1,28 @@
+-- Schéma d'origine : articles et commentaires (une colonne d'annotation par annotateur)
+CREATE TABLE IF NOT EXISTS UNIL_Article (
+    art_id VARCHAR PRIMARY KEY,
+    art_titre VARCHAR,
+    art_url VARCHAR,
+    art_categorie VARCHAR,
+    art_date VARCHAR,
+    art_description VARCHAR,
+    art_commentaires_actifs INTEGER,
+    art_nom_journal VARCHAR,
+    art_date_recolte VARCHAR,
+    art_nom_pdf VARCHAR,
+    art_hash_pdf VARCHAR
+);
+
+CREATE TABLE IF NOT EXISTS UNIL_Commentaire (
+    com_id VARCHAR PRIMARY KEY,
+    com_auteur VARCHAR,
+    com_contenu VARCHAR,
+    com_art_id VARCHAR NOT NULL,
+    com_commentaire_parent VARCHAR,
+    com_verif_haine_luca INT,
+    com_verif_haine_augustin INT,
+    com_verif_haine_matthieu INT,
+    com_verif_haine_severin INT,
+    FOREIGN KEY (com_art_id) REFERENCES UNIL_Article(art_id),
+    FOREIGN KEY (com_commentaire_parent) REFERENCES UNIL_Commentaire(com_id)
+);
@@ -0,0 +1,55 @@
+-- Tables du crawler : re-visites, file de travail, échecs et métriques
+CREATE TABLE IF NOT EXISTS UNIL_Revisite (
+    rev_art_id VARCHAR PRIMARY KEY,
+    rev_nb_commentaires INTEGER,
+    rev_croissance REAL,
+    rev_nb_visites INTEGER DEFAULT 0,
+    rev_derniere_visite VARCHAR,
+    rev_prochaine_visite VARCHAR,
+    FOREIGN KEY (rev_art_id) REFERENCES UNIL_Article(art_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_revisite_prochaine ON UNIL_Revisite(rev_prochaine_visite);
+
+CREATE TABLE IF NOT EXISTS UNIL_File_Travail (
+    fq_art_id VARCHAR PRIMARY KEY,
+    fq_url VARCHAR NOT NULL,
+    fq_titre VARCHAR,
+    fq_site VARCHAR NOT NULL,
+    fq_categorie VARCHAR NOT NULL,
+    fq_etat VARCHAR NOT NULL DEFAULT 'attente',
+    fq_priorite REAL DEFAULT 0,
+    fq_tentatives INTEGER DEFAULT 0,
+    fq_proprietaire VARCHAR,
+    fq_bail_expire VARCHAR,
+    fq_disponible_apres VARCHAR,
+    fq_date_maj VARCHAR
+);
+
+CREATE INDEX IF NOT EXISTS idx_file_travail_etat ON UNIL_File_Travail(fq_site, fq_categorie, fq_etat, fq_priorite DESC);
+
+CREATE TABLE IF NOT EXISTS UNIL_Echec (
+    ech_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ech_art_id VARCHAR,
+    ech_url VARCHAR,
+    ech_page_url VARCHAR,
+    ech_site VARCHAR,
+    ech_categorie VARCHAR,
+    ech_type VARCHAR,
+    ech_exception VARCHAR,
+    ech_message VARCHAR,
+    ech_trace VARCHAR,
+    ech_tentatives INTEGER,
+    ech_date VARCHAR
+);
+
+CREATE TABLE IF NOT EXISTS UNIL_Crawl_Metrique (
+    met_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    met_type VARCHAR NOT NULL,
+    met_site VARCHAR,
+    met_valeur REAL,
+    met_details VARCHAR,
+    met_date VARCHAR
+);
+
+CREATE INDEX IF NOT EXISTS idx_crawl_metrique_type ON UNIL_Crawl_Metrique(met_type, met_date);
@@ -0,0 +1,3 @@
+-- Empreinte des fils de commentaires (scraper/fingerprint.py)
+ALTER TABLE UNIL_Article ADD COLUMN art_empreinte_commentaires VARCHAR;
+ALTER TABLE UNIL_Article ADD COLUMN art_nb_commentaires INTEGER;
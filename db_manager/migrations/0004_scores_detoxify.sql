@@ -0,0 +1,8 @@
+-- Scores Detoxify (check_hate/check_hate_bdd.py), de 0 à 1
+ALTER TABLE UNIL_Commentaire ADD COLUMN com_detox_is_haine REAL;
+ALTER TABLE UNIL_Commentaire ADD COLUMN com_detox_toxicity REAL;
+ALTER TABLE UNIL_Commentaire ADD COLUMN com_detox_severe_toxicity REAL;
+ALTER TABLE UNIL_Commentaire ADD COLUMN com_detox_obscene REAL;
+ALTER TABLE UNIL_Commentaire ADD COLUMN com_detox_threat REAL;
+ALTER TABLE UNIL_Commentaire ADD COLUMN com_detox_insult REAL;
+ALTER TABLE UNIL_Commentaire ADD COLUMN com_detox_identity_attack REAL;
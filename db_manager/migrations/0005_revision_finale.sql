@@ -0,0 +1,2 @@
+-- Annotation finale des désaccords (classify/classify_review_gui.py)
+ALTER TABLE UNIL_Commentaire ADD COLUMN com_haine_final INT;
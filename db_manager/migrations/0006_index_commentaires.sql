@@ -0,0 +1,3 @@
+-- Index des clés étrangères : commentaires d'un article, réponses d'un commentaire
+CREATE INDEX IF NOT EXISTS idx_commentaire_article ON UNIL_Commentaire(com_art_id);
+CREATE INDEX IF NOT EXISTS idx_commentaire_parent ON UNIL_Commentaire(com_commentaire_parent);
@@ -0,0 +1,26 @@
+-- Index dérivés des requêtes réelles (vérifiés par python -m db_manager.query_plans)
+
+-- Commentaires d'un article dans l'ordre (annotateurs, revisit) : remplace l'index simple
+DROP INDEX IF EXISTS idx_commentaire_article;
+CREATE INDEX IF NOT EXISTS idx_commentaire_article_id ON UNIL_Commentaire(com_art_id, com_id);
+
+-- Commentaires restant à scorer par Detoxify (index partiel : se vide au fil du scoring)
+CREATE INDEX IF NOT EXISTS idx_commentaire_a_scorer ON UNIL_Commentaire(com_id)
+    WHERE com_detox_is_haine IS NULL;
+
+-- Classement par score (commentaires les plus toxiques, exemples au-dessus / en dessous du seuil)
+CREATE INDEX IF NOT EXISTS idx_commentaire_score ON UNIL_Commentaire(com_detox_is_haine DESC)
+    WHERE com_detox_is_haine IS NOT NULL;
+
+-- Désaccords par paire d'annotateurs (révision finale) : seuls les désaccords sont indexés
+CREATE INDEX IF NOT EXISTS idx_desaccord_augustin_luca ON UNIL_Commentaire(com_art_id, com_id)
+    WHERE com_verif_haine_augustin IS NOT NULL
+      AND com_verif_haine_luca IS NOT NULL
+      AND com_verif_haine_augustin != com_verif_haine_luca;
+CREATE INDEX IF NOT EXISTS idx_desaccord_matthieu_severin ON UNIL_Commentaire(com_art_id, com_id)
+    WHERE com_verif_haine_matthieu IS NOT NULL
+      AND com_verif_haine_severin IS NOT NULL
+      AND com_verif_haine_matthieu != com_verif_haine_severin;
+
+-- Articles à commentaires actifs (annotateurs, revisit)
+CREATE INDEX IF NOT EXISTS idx_article_commentaires_actifs ON UNIL_Article(art_commentaires_actifs, art_id);
@@ -0,0 +1,44 @@
+-- Annotations normalisées : une ligne par (commentaire, tour, annotateur) au lieu d'une
+-- colonne com_verif_haine_<prénom> par annotateur dans UNIL_Commentaire
+CREATE TABLE IF NOT EXISTS UNIL_Annotation (
+    ann_com_id VARCHAR NOT NULL,
+    ann_tour INTEGER NOT NULL DEFAULT 1,
+    ann_annotateur VARCHAR NOT NULL,
+    ann_score INT NOT NULL,
+    ann_date VARCHAR,
+    PRIMARY KEY (ann_com_id, ann_tour, ann_annotateur),
+    FOREIGN KEY (ann_com_id) REFERENCES UNIL_Commentaire(com_id)
+);
+
+-- Progression et fusion par annotateur (index couvrant)
+CREATE INDEX IF NOT EXISTS idx_annotation_annotateur ON UNIL_Annotation(ann_annotateur, ann_tour, ann_com_id, ann_score);
+
+-- Reprise des anciennes colonnes
+INSERT OR IGNORE INTO UNIL_Annotation (ann_com_id, ann_tour, ann_annotateur, ann_score)
+SELECT com_id, 1, 'augustin', com_verif_haine_augustin FROM UNIL_Commentaire WHERE com_verif_haine_augustin IS NOT NULL;
+INSERT OR IGNORE INTO UNIL_Annotation (ann_com_id, ann_tour, ann_annotateur, ann_score)
+SELECT com_id, 1, 'luca', com_verif_haine_luca FROM UNIL_Commentaire WHERE com_verif_haine_luca IS NOT NULL;
+INSERT OR IGNORE INTO UNIL_Annotation (ann_com_id, ann_tour, ann_annotateur, ann_score)
+SELECT com_id, 1, 'matthieu', com_verif_haine_matthieu FROM UNIL_Commentaire WHERE com_verif_haine_matthieu IS NOT NULL;
+INSERT OR IGNORE INTO UNIL_Annotation (ann_com_id, ann_tour, ann_annotateur, ann_score)
+SELECT com_id, 1, 'severin', com_verif_haine_severin FROM UNIL_Commentaire WHERE com_verif_haine_severin IS NOT NULL;
+
+DROP INDEX IF EXISTS idx_desaccord_augustin_luca;
+DROP INDEX IF EXISTS idx_desaccord_matthieu_severin;
+ALTER TABLE UNIL_Commentaire DROP COLUMN com_verif_haine_luca;
+ALTER TABLE UNIL_Commentaire DROP COLUMN com_verif_haine_augustin;
+ALTER TABLE UNIL_Commentaire DROP COLUMN com_verif_haine_matthieu;
+ALTER TABLE UNIL_Commentaire DROP COLUMN com_verif_haine_severin;
+
+-- Vue de compatibilité : les anciennes colonnes (requêtes du README, exports existants)
+CREATE VIEW IF NOT EXISTS UNIL_Commentaire_Verif AS
+SELECT c.*,
+       (SELECT ann_score FROM UNIL_Annotation
+        WHERE ann_com_id = c.com_id AND ann_tour = 1 AND ann_annotateur = 'luca') AS com_verif_haine_luca,
+       (SELECT ann_score FROM UNIL_Annotation
+        WHERE ann_com_id = c.com_id AND ann_tour = 1 AND ann_annotateur = 'augustin') AS com_verif_haine_augustin,
+       (SELECT ann_score FROM UNIL_Annotation
+        WHERE ann_com_id = c.com_id AND ann_tour = 1 AND ann_annotateur = 'matthieu') AS com_verif_haine_matthieu,
+       (SELECT ann_score FROM UNIL_Annotation
+        WHERE ann_com_id = c.com_id AND ann_tour = 1 AND ann_annotateur = 'severin') AS com_verif_haine_severin
+FROM UNIL_Commentaire c;
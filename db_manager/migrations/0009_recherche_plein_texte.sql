@@ -0,0 +1,65 @@
+-- Recherche plein texte (FTS5) sur les commentaires et les articles (db_manager/search.py).
+-- Tables à contenu externe : le texte n'est pas dupliqué, seul l'index inversé est stocké.
+-- unicode61 + remove_diacritics 2 : « élève », « eleve » et « ÉLÈVE » se retrouvent ;
+-- l'apostrophe sépare les élisions (l'homme -> l, homme). Index de préfixes 2 et 3
+-- caractères pour les requêtes « migr* ».
+CREATE VIRTUAL TABLE IF NOT EXISTS UNIL_Commentaire_FTS USING fts5(
+    com_contenu,
+    com_auteur,
+    content = 'UNIL_Commentaire',
+    content_rowid = 'rowid',
+    tokenize = 'unicode61 remove_diacritics 2',
+    prefix = '2 3'
+);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS UNIL_Article_FTS USING fts5(
+    art_titre,
+    art_description,
+    content = 'UNIL_Article',
+    content_rowid = 'rowid',
+    tokenize = 'unicode61 remove_diacritics 2',
+    prefix = '2 3'
+);
+
+-- Classement bm25 : le contenu (ou le titre) pèse plus que l'auteur (ou la description)
+INSERT INTO UNIL_Commentaire_FTS(UNIL_Commentaire_FTS, rank) VALUES ('rank', 'bm25(1.0, 0.3)');
+INSERT INTO UNIL_Article_FTS(UNIL_Article_FTS, rank) VALUES ('rank', 'bm25(1.0, 0.5)');
+
+-- Synchronisation par triggers (les mises à jour des scores Detoxify ne touchent pas l'index)
+CREATE TRIGGER IF NOT EXISTS trg_commentaire_fts_insert AFTER INSERT ON UNIL_Commentaire BEGIN
+    INSERT INTO UNIL_Commentaire_FTS(rowid, com_contenu, com_auteur)
+    VALUES (new.rowid, new.com_contenu, new.com_auteur);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_commentaire_fts_delete AFTER DELETE ON UNIL_Commentaire BEGIN
+    INSERT INTO UNIL_Commentaire_FTS(UNIL_Commentaire_FTS, rowid, com_contenu, com_auteur)
+    VALUES ('delete', old.rowid, old.com_contenu, old.com_auteur);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_commentaire_fts_update AFTER UPDATE OF com_contenu, com_auteur ON UNIL_Commentaire BEGIN
+    INSERT INTO UNIL_Commentaire_FTS(UNIL_Commentaire_FTS, rowid, com_contenu, com_auteur)
+    VALUES ('delete', old.rowid, old.com_contenu, old.com_auteur);
+    INSERT INTO UNIL_Commentaire_FTS(rowid, com_contenu, com_auteur)
+    VALUES (new.rowid, new.com_contenu, new.com_auteur);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_article_fts_insert AFTER INSERT ON UNIL_Article BEGIN
+    INSERT INTO UNIL_Article_FTS(rowid, art_titre, art_description)
+    VALUES (new.rowid, new.art_titre, new.art_description);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_article_fts_delete AFTER DELETE ON UNIL_Article BEGIN
+    INSERT INTO UNIL_Article_FTS(UNIL_Article_FTS, rowid, art_titre, art_description)
+    VALUES ('delete', old.rowid, old.art_titre, old.art_description);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_article_fts_update AFTER UPDATE OF art_titre, art_description ON UNIL_Article BEGIN
+    INSERT INTO UNIL_Article_FTS(UNIL_Article_FTS, rowid, art_titre, art_description)
+    VALUES ('delete', old.rowid, old.art_titre, old.art_description);
+    INSERT INTO UNIL_Article_FTS(rowid, art_titre, art_description)
+    VALUES (new.rowid, new.art_titre, new.art_description);
+END;
+
+-- Indexation des lignes existantes
+INSERT INTO UNIL_Commentaire_FTS(UNIL_Commentaire_FTS) VALUES ('rebuild');
+INSERT INTO UNIL_Article_FTS(UNIL_Article_FTS) VALUES ('rebuild');
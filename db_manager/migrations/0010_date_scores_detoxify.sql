@@ -0,0 +1,5 @@
+-- Date du scoring Detoxify : filigrane des exports incrémentaux (db_manager/export_parquet.py)
+ALTER TABLE UNIL_Commentaire ADD COLUMN com_detox_date VARCHAR;
+
+CREATE INDEX IF NOT EXISTS idx_commentaire_date_score ON UNIL_Commentaire(com_detox_date)
+    WHERE com_detox_date IS NOT NULL;
@@ -0,0 +1,60 @@
+-- Journal des annotations (alimenté par triggers) : synchronisation incrémentale des bases
+-- d'annotateurs vers la base fusionnée (db_manager/merger.py)
+CREATE TABLE IF NOT EXISTS UNIL_Annotation_Journal (
+    jou_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    jou_com_id VARCHAR NOT NULL,
+    jou_tour INTEGER NOT NULL,
+    jou_annotateur VARCHAR NOT NULL,
+    jou_score_avant INT,
+    jou_score INT,
+    jou_date VARCHAR
+);
+
+CREATE TRIGGER IF NOT EXISTS trg_annotation_journal_insert AFTER INSERT ON UNIL_Annotation BEGIN
+    INSERT INTO UNIL_Annotation_Journal (jou_com_id, jou_tour, jou_annotateur, jou_score_avant, jou_score, jou_date)
+    VALUES (new.ann_com_id, new.ann_tour, new.ann_annotateur, NULL, new.ann_score,
+            COALESCE(new.ann_date, datetime('now', 'localtime')));
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_annotation_journal_update AFTER UPDATE OF ann_score ON UNIL_Annotation
+    WHEN old.ann_score IS NOT new.ann_score BEGIN
+    INSERT INTO UNIL_Annotation_Journal (jou_com_id, jou_tour, jou_annotateur, jou_score_avant, jou_score, jou_date)
+    VALUES (new.ann_com_id, new.ann_tour, new.ann_annotateur, old.ann_score, new.ann_score,
+            COALESCE(new.ann_date, datetime('now', 'localtime')));
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_annotation_journal_delete AFTER DELETE ON UNIL_Annotation BEGIN
+    INSERT INTO UNIL_Annotation_Journal (jou_com_id, jou_tour, jou_annotateur, jou_score_avant, jou_score, jou_date)
+    VALUES (old.ann_com_id, old.ann_tour, old.ann_annotateur, old.ann_score, NULL, datetime('now', 'localtime'));
+END;
+
+-- Filigrane de synchronisation : dernier jou_id de chaque source déjà fusionné
+CREATE TABLE IF NOT EXISTS UNIL_Synchro (
+    syn_source VARCHAR PRIMARY KEY,
+    syn_jou_id INTEGER NOT NULL,
+    syn_date VARCHAR
+);
+
+-- Modifications concurrentes détectées à la fusion (non appliquées)
+CREATE TABLE IF NOT EXISTS UNIL_Conflit (
+    con_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    con_source VARCHAR NOT NULL,
+    con_com_id VARCHAR NOT NULL,
+    con_tour INTEGER NOT NULL,
+    con_annotateur VARCHAR NOT NULL,
+    con_score_avant INT,
+    con_score_maitre INT,
+    con_score_source INT,
+    con_date_source VARCHAR,
+    con_date VARCHAR,
+    con_resolu INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE INDEX IF NOT EXISTS idx_conflit_ouvert ON UNIL_Conflit(con_com_id, con_tour, con_annotateur)
+    WHERE con_resolu = 0;
+
+-- Reprise : chaque annotation existante entre dans le journal comme une insertion
+INSERT INTO UNIL_Annotation_Journal (jou_com_id, jou_tour, jou_annotateur, jou_score_avant, jou_score, jou_date)
+SELECT ann_com_id, ann_tour, ann_annotateur, NULL, ann_score, ann_date
+FROM UNIL_Annotation
+ORDER BY ann_date, ann_com_id;
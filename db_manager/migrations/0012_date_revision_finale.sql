@@ -0,0 +1,5 @@
+-- Date de la révision finale : filigrane des exports incrémentaux (db_manager/export_parquet.py)
+ALTER TABLE UNIL_Commentaire ADD COLUMN com_haine_final_date VARCHAR;
+
+CREATE INDEX IF NOT EXISTS idx_commentaire_date_revision ON UNIL_Commentaire(com_haine_final_date)
+    WHERE com_haine_final_date IS NOT NULL;
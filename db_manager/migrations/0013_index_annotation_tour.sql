@@ -0,0 +1,3 @@
+-- Désaccords d'un tour d'annotation (classify_review_gui) : recherche par tour, groupes par
+-- commentaire dans l'ordre de l'index, annotateur et score lus sans accès à la table
+CREATE INDEX IF NOT EXISTS idx_annotation_tour ON UNIL_Annotation(ann_tour, ann_com_id, ann_score, ann_annotateur);
@@ -0,0 +1,127 @@
+import argparse
+import os
+import re
+import sqlite3
+import sys
+
+from db_manager.migrations import migrate
+
+# ✅ CONTRÔLE DES PLANS DE REQUÊTE : chaque requête fréquente des outils (annotation,
+# révision, Detoxify, revisit) doit rester servie par son index. EXPLAIN QUERY PLAN est
+# exécuté sur le schéma à jour (base neuve en mémoire, ou base réelle avec ses
+# statistiques ANALYZE) ; un parcours complet de table ou un tri temporaire est une
+# régression. Usage : python -m db_manager.query_plans [base.db]
+WORKLOAD = [
+    # (nom, outil, requête, index attendu)
+    ("commentaires_article", "classify / classify_gui",
+     "SELECT * FROM UNIL_Commentaire WHERE com_art_id = ? ORDER BY com_id",
+     "idx_commentaire_article_id"),
+    ("nb_commentaires_article", "revisit",
+     "SELECT COUNT(*) FROM UNIL_Commentaire WHERE com_art_id = ?",
+     "idx_commentaire_article_id"),
+    ("articles_avec_commentaires", "classify / classify_gui",
+     """SELECT a.* FROM UNIL_Article a
+        WHERE a.art_commentaires_actifs = 1
+          AND EXISTS (SELECT 1 FROM UNIL_Commentaire c WHERE c.com_art_id = a.art_id)
+        ORDER BY a.art_id ASC""",
+     "idx_article_commentaires_actifs"),
+    ("reponses_commentaire", "clé étrangère com_commentaire_parent (foreign_keys = ON)",
+     "SELECT com_id FROM UNIL_Commentaire WHERE com_commentaire_parent = ?",
+     "idx_commentaire_parent"),
+    ("commentaires_a_scorer", "check_hate_bdd.fetch_unscored",
+     """SELECT com_id, com_contenu FROM UNIL_Commentaire
+        WHERE com_detox_is_haine IS NULL AND com_contenu IS NOT NULL AND com_contenu != ''
+          AND com_id > ? AND com_id <= ?
+        ORDER BY com_id LIMIT ?""",
+     "idx_commentaire_a_scorer"),
+    ("plus_toxiques", "check_hate_bdd.find_most_toxic_comments",
+     """SELECT com_id, com_contenu, com_detox_is_haine FROM UNIL_Commentaire
+        WHERE com_detox_is_haine IS NOT NULL ORDER BY com_detox_is_haine DESC LIMIT ?""",
+     "idx_commentaire_score"),
+    ("exemples_seuil", "check_hate_bdd.view_sample_comments",
+     """SELECT com_id, com_contenu FROM UNIL_Commentaire
+        WHERE com_detox_is_haine IS NOT NULL AND com_detox_is_haine >= 0.5 LIMIT ?""",
+     "idx_commentaire_score"),
+    ("desaccords", "classify_review_gui",
+     """SELECT ann_com_id, GROUP_CONCAT(ann_annotateur || ':' || ann_score, ',')
+        FROM UNIL_Annotation
+        WHERE ann_tour = ?
+        GROUP BY ann_com_id
+        HAVING COUNT(*) >= 2 AND MIN(ann_score) != MAX(ann_score)""",
+     "idx_annotation_tour"),
+    ("annotation_commentaire", "classify.get_annotation",
+     """SELECT ann_score FROM UNIL_Annotation
+        WHERE ann_com_id = ? AND ann_tour = ? AND ann_annotateur = ?""",
+     "sqlite_autoindex_UNIL_Annotation_1"),
+    ("annotations_annotateur", "merger",
+     """SELECT ann_com_id, ann_tour, ann_annotateur, ann_score, ann_date
+        FROM UNIL_Annotation WHERE ann_annotateur = ?""",
+     "idx_annotation_annotateur"),
+    ("progression_annotateur", "classify.get_annotation_stats",
+     """SELECT COUNT(*), COUNT(an.ann_score)
+        FROM UNIL_Commentaire c
+        LEFT JOIN UNIL_Annotation an
+               ON an.ann_com_id = c.com_id AND an.ann_tour = ? AND an.ann_annotateur = ?
+        WHERE c.com_art_id IN (SELECT value FROM json_each(?))""",
+     "idx_commentaire_article_id"),
+]
+
+# Requêtes filtrées par la clé de tête de leur index : même un parcours complet de l'index
+# (SCAN ... USING INDEX) est une régression, seule une recherche (SEARCH) est acceptée
+SEARCH_ONLY = {"desaccords"}
+
+
+def query_plan(conn, query):
+    """Lignes de EXPLAIN QUERY PLAN (détail seulement)"""
+    numbered = [int(n) for n in re.findall(r"\?(\d+)", query)]
+    params = [None] * (max(numbered) if numbered else query.count("?"))
+    return [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + query, params)]
+
+
+def check_plans(conn, verbose=True):
+    """
+    Vérifie que chaque requête du WORKLOAD utilise son index, sans parcours complet ni tri temporaire.
+
+    Returns:
+        Liste des noms de requêtes en régression
+    """
+    failures = []
+    for name, tool, query, index in WORKLOAD:
+        plan = query_plan(conn, query)
+        problems = []
+        if not any(index in step for step in plan):
+            problems.append(f"index {index} non utilisé")
+        for step in plan:
+            if step.startswith("SCAN") and ("INDEX" not in step or name in SEARCH_ONLY):
+                problems.append(step)
+            if "TEMP B-TREE" in step:
+                problems.append(step)
+        if problems:
+            failures.append(name)
+        if verbose:
+            print(f"  {'❌' if problems else '✓'} {name} ({tool})")
+            for step in plan:
+                print(f"      {step}")
+            for problem in problems:
+                print(f"      ⚠️ {problem}")
+    return failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Vérifie que les requêtes fréquentes sont servies par leurs index")
+    parser.add_argument("base", nargs="?", default=":memory:",
+                        help="Base SQLite existante (défaut : base neuve en mémoire)")
+    db_path = parser.parse_args().base
+    if db_path != ":memory:" and not os.path.exists(db_path):
+        parser.error(f"base introuvable : {db_path}")
+    conn = sqlite3.connect(db_path)
+    try:
+        migrate(conn, verbose=False)
+        print(f"🔎 Plans de requête ({db_path})")
+        failures = check_plans(conn)
+    finally:
+        conn.close()
+    if failures:
+        print(f"\n❌ {len(failures)} requête(s) sans index : {', '.join(failures)}")
+        sys.exit(1)
+    print(f"\n✓ {len(WORKLOAD)} requêtes servies par leurs index")
@@ -0,0 +1,195 @@
+import argparse
+import sqlite3
+import sys
+import time
+
+from db_manager.migrations import migrate
+
+# ✅ RECHERCHE PLEIN TEXTE : interroge les index FTS5 (migration 0009) des commentaires
+# (contenu, auteur) et des articles (titre, description), classés par bm25, avec filtres
+# par site, catégorie, date d'article et score Detoxify.
+#
+# Syntaxe FTS5 acceptée telle quelle :
+#   frontaliers genève          tous les mots (accents et majuscules ignorés)
+#   "retour à la normale"       expression exacte
+#   migr*                       préfixe
+#   com_auteur:dupont           un seul champ
+#   vaccin NOT covid, a OR b    opérateurs
+#
+# Usage : python -m db_manager.search base.db "requête" [--site 24heures.ch] [--depuis 2024-01-01]
+#         [--toxicite-min 0.5] [--articles] [--limite 20]
+#         python -m db_manager.search base.db --reconstruire   (après un VACUUM)
+FTS_TABLES = {
+    "UNIL_Commentaire_FTS": "UNIL_Commentaire",
+    "UNIL_Article_FTS": "UNIL_Article",
+}
+
+
+def _quote_terms(query):
+    """
+    Requête invalide en syntaxe FTS5 : chaque mot est recherché littéralement.
+
+    Chaque mot devient une expression entre guillemets : « - » et « : » n'y sont plus des
+    opérateurs (Saint-Gall, aujourd-hui → expressions « saint gall », « aujourd hui ») et les
+    guillemets isolés sont retirés (« "les élèves » → les élèves).
+    """
+    terms = [term.replace('"', "") for term in query.split()]
+    return " ".join(f'"{term}"' for term in terms if any(ch.isalnum() for ch in term))
+
+
+def _execute(conn, sql, query, params):
+    """
+    Exécute une recherche ; une requête que FTS5 refuse (guillemet non fermé, mot composé
+    lu comme « colonne:terme » ou « -terme », opérateur isolé...) est relancée mot à mot.
+    """
+    try:
+        return conn.execute(sql, (query, *params)).fetchall()
+    except sqlite3.OperationalError:
+        literal = _quote_terms(query)
+        if not literal:
+            return []
+        return conn.execute(sql, (literal, *params)).fetchall()
+
+
+def search_comments(conn, query, site=None, categorie=None, date_min=None, date_max=None,
+                    toxicite_min=None, limit=20):
+    """
+    Recherche des commentaires par mots-clés.
+
+    Args:
+        conn: Connexion SQLite (schéma migré)
+        query: Requête FTS5 (mots, "expression", préfixe*, colonne:mot)
+        site: Journal (art_nom_journal)
+        categorie: Catégorie de l'article
+        date_min: Date d'article minimale (format SQL, ex: 2024-01-01)
+        date_max: Date d'article maximale (exclue)
+        toxicite_min: Score com_detox_is_haine minimal
+        limit: Nombre de résultats
+
+    Returns:
+        Liste de dict (com_id, auteur, extrait, article, site, date, score)
+    """
+    sql = """
+          SELECT c.com_id,
+                 c.com_auteur,
+                 snippet(UNIL_Commentaire_FTS, 0, '[', ']', '…', 16) AS extrait,
+                 a.art_titre,
+                 a.art_nom_journal,
+                 a.art_categorie,
+                 a.art_date,
+                 c.com_detox_is_haine
+          FROM UNIL_Commentaire_FTS f
+                   INNER JOIN UNIL_Commentaire c ON c.rowid = f.rowid
+                   INNER JOIN UNIL_Article a ON a.art_id = c.com_art_id
+          WHERE UNIL_Commentaire_FTS MATCH ?
+            AND (?2 IS NULL OR a.art_nom_journal = ?2)
+            AND (?3 IS NULL OR a.art_categorie = ?3)
+            AND (?4 IS NULL OR a.art_date >= ?4)
+            AND (?5 IS NULL OR a.art_date < ?5)
+            AND (?6 IS NULL OR c.com_detox_is_haine >= ?6)
+          ORDER BY f.rank
+          LIMIT ?7
+          """
+    rows = _execute(conn, sql, query, (site, categorie, date_min, date_max, toxicite_min, limit))
+    keys = ("com_id", "auteur", "extrait", "article", "site", "categorie", "date", "score")
+    return [dict(zip(keys, row)) for row in rows]
+
+
+def search_articles(conn, query, site=None, categorie=None, date_min=None, date_max=None, limit=20):
+    """
+    Recherche des articles par mots-clés dans le titre et la description.
+
+    Returns:
+        Liste de dict (art_id, titre, extrait, url, site, date, nb de commentaires)
+    """
+    sql = """
+          SELECT a.art_id,
+                 a.art_titre,
+                 snippet(UNIL_Article_FTS, 1, '[', ']', '…', 16) AS extrait,
+                 a.art_url,
+                 a.art_nom_journal,
+                 a.art_categorie,
+                 a.art_date,
+                 (SELECT COUNT(*) FROM UNIL_Commentaire c WHERE c.com_art_id = a.art_id) AS nb_commentaires
+          FROM UNIL_Article_FTS f
+                   INNER JOIN UNIL_Article a ON a.rowid = f.rowid
+          WHERE UNIL_Article_FTS MATCH ?
+            AND (?2 IS NULL OR a.art_nom_journal = ?2)
+            AND (?3 IS NULL OR a.art_categorie = ?3)
+            AND (?4 IS NULL OR a.art_date >= ?4)
+            AND (?5 IS NULL OR a.art_date < ?5)
+          ORDER BY f.rank
+          LIMIT ?6
+          """
+    rows = _execute(conn, sql, query, (site, categorie, date_min, date_max, limit))
+    keys = ("art_id", "titre", "extrait", "url", "site", "categorie", "date", "nb_commentaires")
+    return [dict(zip(keys, row)) for row in rows]
+
+
+def rebuild_index(conn):
+    """
+    Reconstruit les index plein texte depuis les tables.
+
+    À lancer après un VACUUM : les tables sans INTEGER PRIMARY KEY peuvent y être renumérotées,
+    ce qui désynchronise les index à contenu externe (liés par rowid).
+    """
+    for fts_table, table in FTS_TABLES.items():
+        start = time.perf_counter()
+        conn.execute(f"INSERT INTO {fts_table}({fts_table}) VALUES ('rebuild')")
+        conn.execute(f"INSERT INTO {fts_table}({fts_table}) VALUES ('optimize')")
+        conn.commit()
+        print(f"✓ {fts_table} reconstruit depuis {table} ({time.perf_counter() - start:.1f} s)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Recherche plein texte dans les commentaires et articles")
+    parser.add_argument("db_path", help="Base SQLite")
+    parser.add_argument("query", nargs="?", help="Requête FTS5")
+    parser.add_argument("--articles", action="store_true", help="Chercher dans les articles")
+    parser.add_argument("--site", help="Journal (ex: 24heures.ch)")
+    parser.add_argument("--categorie", help="Catégorie de l'article")
+    parser.add_argument("--depuis", help="Date d'article minimale (AAAA-MM-JJ)")
+    parser.add_argument("--jusqua", help="Date d'article maximale, exclue (AAAA-MM-JJ)")
+    parser.add_argument("--toxicite-min", type=float, help="Score Detoxify minimal")
+    parser.add_argument("--limite", type=int, default=20, help="Nombre de résultats")
+    parser.add_argument("--reconstruire", action="store_true", help="Reconstruire les index (après VACUUM)")
+    args = parser.parse_args(argv)
+
+    conn = sqlite3.connect(args.db_path)
+    try:
+        migrate(conn)
+        if args.reconstruire:
+            rebuild_index(conn)
+        if not args.query:
+            return
+
+        start = time.perf_counter()
+        if args.articles:
+            results = search_articles(conn, args.query, args.site, args.categorie, args.depuis, args.jusqua,
+                                      args.limite)
+        else:
+            results = search_comments(conn, args.query, args.site, args.categorie, args.depuis, args.jusqua,
+                                      args.toxicite_min, args.limite)
+        elapsed = (time.perf_counter() - start) * 1000
+
+        print(f"🔎 {len(results)} résultat(s) pour « {args.query} » ({elapsed:.1f} ms)\n")
+        for i, result in enumerate(results, 1):
+            if args.articles:
+                print(f"{i:3d}. 📰 {result['titre']}")
+                print(f"     {result['site']} | {result['categorie']} | {result['date']} | "
+                      f"💬 {result['nb_commentaires']}")
+                if result['extrait']:
+                    print(f"     {result['extrait']}")
+                print(f"     🔗 {result['url']}")
+            else:
+                score = f" | ☠️ {result['score']:.3f}" if result['score'] is not None else ""
+                print(f"{i:3d}. 💬 {result['auteur']} ({result['com_id']}){score}")
+                print(f"     {result['extrait']}")
+                print(f"     📰 {result['article']} | {result['site']} | {result['date']}")
+            print()
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,624 @@
+import asyncio
+import base64
+import itertools
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from queue import Empty
+from time import sleep, time
+
+from selenium.common.exceptions import (
+    ElementNotInteractableException,
+    InvalidSessionIdException,
+    JavascriptException,
+    NoSuchElementException,
+    StaleElementReferenceException,
+    TimeoutException,
+    WebDriverException
+)
+
+from scraper.le20minutes import minutes_article, minutes_category, minutes_comments, minutes_main
+from scraper.le24heures import heures_article, heures_category, heures_comments, heures_main
+from scraper.lematin import matin_article, matin_category, matin_comments, matin_main
+from scraper.retry import handle_failure, is_due
+from scraper.utils import USER_AGENT
+from scraper.crawl_log import get_logger, set_context
+
+log = get_logger(__name__)
+
+# ✅ POOL CDP : quelques processus Chrome pilotés directement par le protocole DevTools,
+# chacun avec de nombreux onglets. Une seule connexion websocket asyncio par navigateur
+# multiplexe toutes les sessions d'onglets ; chaque onglet est exposé au code existant
+# (scrap_article, scrap_comments...) par une façade synchrone au format Selenium.
+SITES = {
+    "20min.ch/fr": (minutes_main.URLS, minutes_article, minutes_category, minutes_comments),
+    "24heures.ch": (heures_main.URLS, heures_article, heures_category, heures_comments),
+    "lematin.ch/": (matin_main.URLS, matin_article, matin_category, matin_comments),
+}
+
+BROWSERS = 2                # Processus Chrome
+TABS_PER_BROWSER = 8        # Onglets (workers) par processus Chrome
+PAGE_LOAD_TIMEOUT = 90      # Comme driver.set_page_load_timeout(90)
+IMPLICIT_WAIT = 10          # Comme driver.implicitly_wait(10)
+COMMAND_TIMEOUT = 60        # Échéance d'une commande CDP
+LONG_COMMANDS = {"Page.printToPDF": 120, "Page.captureSnapshot": 120}
+STARTUP_TIMEOUT = 30
+POLL_INTERVAL = 0.25
+
+CHROME_BINARIES = ("google-chrome", "google-chrome-stable", "chromium", "chromium-browser")
+CHROME_ARGS = [
+    "--headless=new",
+    "--no-sandbox",
+    "--disable-dev-shm-usage",
+    "--window-size=1920,1080",
+    f"--user-agent={USER_AGENT}",
+    "--disable-blink-features=AutomationControlled",
+    "--no-first-run",
+    "--no-default-browser-check",
+    # Les onglets en arrière-plan ne doivent pas être ralentis
+    "--disable-background-timer-throttling",
+    "--disable-backgrounding-occluded-windows",
+    "--disable-renderer-backgrounding",
+]
+
+# Traduction des stratégies Selenium (By.*) en sélecteurs CSS ; "xpath" est traité à part
+_BY_TO_CSS = {
+    "css selector": lambda v: v,
+    "id": lambda v: f'[id="{v}"]',
+    "name": lambda v: f'[name="{v}"]',
+    "class name": lambda v: "." + v,
+    "tag name": lambda v: v,
+}
+
+_FIND_JS = """function(by, value) {
+    if (by === "xpath") {
+        const doc = this.ownerDocument || this;
+        const snap = doc.evaluate(value, this, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+        const out = [];
+        for (let i = 0; i < snap.snapshotLength; i++) out.push(snap.snapshotItem(i));
+        return out;
+    }
+    return Array.from(this.querySelectorAll(value));
+}"""
+
+_ATTRIBUTE_JS = """function(name) {
+    if (name in this) {
+        const v = this[name];
+        if (v === null || v === undefined) return null;
+        if (typeof v === "boolean") return v ? "true" : null;
+        if (typeof v !== "object" && typeof v !== "function") return String(v);
+    }
+    return this.getAttribute(name);
+}"""
+
+_DISPLAYED_JS = """function() {
+    const style = getComputedStyle(this);
+    return this.getClientRects().length > 0 && style.visibility !== "hidden" && style.display !== "none";
+}"""
+
+_CLICK_POINT_JS = """function() {
+    this.scrollIntoView({block: "center", inline: "center"});
+    const r = this.getBoundingClientRect();
+    return [r.left + r.width / 2, r.top + r.height / 2, r.width, r.height];
+}"""
+
+
+class CdpError(WebDriverException):
+    """Erreur renvoyée par Chrome pour une commande CDP"""
+
+
+def find_chrome():
+    for name in CHROME_BINARIES:
+        path = shutil.which(name)
+        if path:
+            return path
+    raise WebDriverException("Aucun exécutable Chrome/Chromium trouvé")
+
+
+class CdpConnection:
+    """Connexion websocket DevTools d'un navigateur, partagée par toutes ses sessions d'onglets"""
+
+    def __init__(self, ws_url):
+        self.ws_url = ws_url
+        self.ws = None
+        self._ids = itertools.count(1)
+        self._pending = {}
+        self._waiters = {}   # (sessionId, méthode) -> [futures]
+        self._reader = None
+        self.closed = False
+
+    async def connect(self):
+        try:
+            import websockets
+        except ImportError:
+            raise ImportError("Le mode CDP nécessite le paquet 'websockets' (pip install websockets)")
+        self.ws = await websockets.connect(self.ws_url, max_size=None, ping_interval=None)
+        self._reader = asyncio.ensure_future(self._read_loop())
+
+    async def _read_loop(self):
+        try:
+            async for raw in self.ws:
+                message = json.loads(raw)
+                if "id" in message:
+                    future = self._pending.pop(message["id"], None)
+                    if future is None or future.done():
+                        continue
+                    if "error" in message:
+                        future.set_exception(CdpError(message["error"].get("message", str(message["error"]))))
+                    else:
+                        future.set_result(message.get("result", {}))
+                else:
+                    for future in self._waiters.pop((message.get("sessionId"), message.get("method")), []):
+                        if not future.done():
+                            future.set_result(message.get("params", {}))
+        except Exception:
+            pass
+        finally:
+            # Navigateur mort ou connexion coupée : toutes les commandes en vol échouent
+            self.closed = True
+            error = InvalidSessionIdException("Connexion DevTools fermée")
+            for future in list(self._pending.values()) + [f for fs in self._waiters.values() for f in fs]:
+                if not future.done():
+                    future.set_exception(error)
+            self._pending.clear()
+            self._waiters.clear()
+
+    async def send(self, method, params=None, session_id=None):
+        if self.closed:
+            raise InvalidSessionIdException("Connexion DevTools fermée")
+        message_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[message_id] = future
+        message = {"id": message_id, "method": method, "params": params or {}}
+        if session_id:
+            message["sessionId"] = session_id
+        await self.ws.send(json.dumps(message))
+        try:
+            return await asyncio.wait_for(future, LONG_COMMANDS.get(method, COMMAND_TIMEOUT))
+        except asyncio.TimeoutError:
+            self._pending.pop(message_id, None)
+            raise TimeoutException(f"Commande CDP {method} sans réponse")
+
+    def expect(self, session_id, method):
+        """Future résolue au prochain événement `method` de la session (à créer avant la commande)"""
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault((session_id, method), []).append(future)
+        return future
+
+    async def close(self):
+        if self.ws is not None:
+            await self.ws.close()
+        if self._reader is not None:
+            await asyncio.gather(self._reader, return_exceptions=True)
+
+
+class CdpBrowser:
+    """Un processus Chrome lancé avec --remote-debugging-port et sa connexion DevTools"""
+
+    def __init__(self, index):
+        self.index = index
+        self.process = None
+        self.user_data_dir = None
+        self.connection = None
+        self.generation = 0
+        self._restart_lock = asyncio.Lock()
+
+    @property
+    def alive(self):
+        return self.process is not None and self.process.poll() is None and not self.connection.closed
+
+    async def start(self):
+        self.user_data_dir = tempfile.mkdtemp(prefix=f"cdp-chrome-{self.index}-")
+        self.process = subprocess.Popen(
+            [find_chrome(), *CHROME_ARGS, "--remote-debugging-port=0",
+             f"--user-data-dir={self.user_data_dir}", "about:blank"],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+        # Chrome écrit le port choisi et le chemin du websocket dans DevToolsActivePort
+        port_file = os.path.join(self.user_data_dir, "DevToolsActivePort")
+        deadline = time() + STARTUP_TIMEOUT
+        while True:
+            try:
+                with open(port_file) as f:
+                    lines = f.read().split("\n")
+                if len(lines) >= 2 and lines[1]:
+                    break
+            except FileNotFoundError:
+                pass
+            if time() > deadline or self.process.poll() is not None:
+                raise WebDriverException("Chrome n'a pas démarré (DevToolsActivePort absent)")
+            await asyncio.sleep(0.1)
+
+        self.connection = CdpConnection(f"ws://127.0.0.1:{lines[0].strip()}{lines[1].strip()}")
+        await self.connection.connect()
+        self.generation += 1
+
+    async def stop(self):
+        if self.connection is not None:
+            await self.connection.close()
+        if self.process is not None and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                await asyncio.get_running_loop().run_in_executor(None, self.process.wait, 10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+        if self.user_data_dir:
+            shutil.rmtree(self.user_data_dir, ignore_errors=True)
+
+    async def ensure_alive(self, generation):
+        """Relance le navigateur s'il est mort (une seule fois pour tous ses onglets)"""
+        async with self._restart_lock:
+            if self.generation == generation and not self.alive:
+                log.info(f"  🔄 Navigateur CDP {self.index} perdu, relance...")
+                await self.stop()
+                await self.start()
+
+    async def new_tab(self):
+        target = await self.connection.send("Target.createTarget", {"url": "about:blank"})
+        attached = await self.connection.send("Target.attachToTarget",
+                                              {"targetId": target["targetId"], "flatten": True})
+        tab = CdpTab(self, target["targetId"], attached["sessionId"])
+        await tab.setup()
+        return tab
+
+
+class CdpTab:
+    """Session CDP d'un onglet (commandes asynchrones)"""
+
+    def __init__(self, browser, target_id, session_id):
+        self.browser = browser
+        self.connection = browser.connection
+        self.generation = browser.generation
+        self.target_id = target_id
+        self.session_id = session_id
+
+    async def send(self, method, params=None):
+        return await self.connection.send(method, params, self.session_id)
+
+    async def setup(self):
+        await self.send("Page.enable")
+        await self.send("Network.enable")
+        await self.send("Emulation.setDeviceMetricsOverride",
+                        {"width": 1920, "height": 1080, "deviceScaleFactor": 1, "mobile": False})
+        # Chaque onglet se comporte comme s'il avait le focus (pas de rendu suspendu)
+        await self.send("Emulation.setFocusEmulationEnabled", {"enabled": True})
+        await self.send("Page.addScriptToEvaluateOnNewDocument",
+                        {"source": "Object.defineProperty(navigator, 'webdriver', {get: () => undefined})"})
+
+    async def _wait_load(self, command, params):
+        loaded = self.connection.expect(self.session_id, "Page.loadEventFired")
+        result = await self.send(command, params)
+        if result.get("errorText"):
+            loaded.cancel()
+            raise WebDriverException(f"Navigation impossible : {result['errorText']}")
+        if command == "Page.navigate" and not result.get("loaderId"):
+            loaded.cancel()  # Navigation dans le même document : pas d'événement load
+            return
+        try:
+            await asyncio.wait_for(loaded, PAGE_LOAD_TIMEOUT)
+        except asyncio.TimeoutError:
+            await self.send("Page.stopLoading")
+            raise TimeoutException(f"Chargement de la page au-delà de {PAGE_LOAD_TIMEOUT}s")
+
+    async def navigate(self, url):
+        await self.send("Runtime.releaseObjectGroup", {"objectGroup": "scraper"})
+        await self._wait_load("Page.navigate", {"url": url})
+
+    async def reload(self):
+        await self.send("Runtime.releaseObjectGroup", {"objectGroup": "scraper"})
+        await self._wait_load("Page.reload", {})
+
+    async def document(self):
+        result = await self.send("Runtime.evaluate", {"expression": "document", "objectGroup": "scraper"})
+        return result["result"]["objectId"]
+
+    async def call(self, object_id, function, args=(), by_value=True):
+        try:
+            result = await self.send("Runtime.callFunctionOn", {
+                "objectId": object_id,
+                "functionDeclaration": function,
+                "arguments": list(args),
+                "returnByValue": by_value,
+                "awaitPromise": True,
+                "objectGroup": "scraper",
+            })
+        except CdpError as e:
+            if "object" in str(e).lower() or "context" in str(e).lower():
+                raise StaleElementReferenceException(str(e))
+            raise
+        if "exceptionDetails" in result:
+            details = result["exceptionDetails"]
+            raise JavascriptException(details.get("exception", {}).get("description") or details.get("text"))
+        return result["result"].get("value") if by_value else result["result"]
+
+    async def find(self, object_id, by, value):
+        if object_id is None:
+            object_id = await self.document()
+        if by == "xpath":
+            args = [{"value": "xpath"}, {"value": value}]
+        elif by in _BY_TO_CSS:
+            args = [{"value": "css"}, {"value": _BY_TO_CSS[by](value)}]
+        else:
+            raise WebDriverException(f"Stratégie de recherche non prise en charge : {by}")
+        array = await self.call(object_id, _FIND_JS, args, by_value=False)
+        properties = await self.send("Runtime.getProperties", {"objectId": array["objectId"], "ownProperties": True})
+        found = [(int(p["name"]), p["value"]["objectId"]) for p in properties["result"]
+                 if p["name"].isdigit() and "objectId" in p.get("value", {})]
+        return [element_id for _, element_id in sorted(found)]
+
+    async def click(self, object_id):
+        x, y, width, height = await self.call(object_id, _CLICK_POINT_JS)
+        if not width or not height:
+            raise ElementNotInteractableException("Élément sans dimensions, clic impossible")
+        for event in ("mousePressed", "mouseReleased"):
+            await self.send("Input.dispatchMouseEvent",
+                            {"type": event, "x": x, "y": y, "button": "left", "clickCount": 1})
+
+    async def close(self):
+        try:
+            await self.connection.send("Target.closeTarget", {"targetId": self.target_id})
+        except Exception:
+            pass
+
+
+class CdpElement:
+    """Façade WebElement sur un objet DOM distant"""
+
+    def __init__(self, driver, object_id):
+        self._driver = driver
+        self.object_id = object_id
+
+    def find_element(self, by, value):
+        return self._driver._find(self.object_id, by, value, single=True)
+
+    def find_elements(self, by, value):
+        return self._driver._find(self.object_id, by, value, single=False)
+
+    @property
+    def text(self):
+        return self._driver._run(self._driver.tab.call(self.object_id, "function() { return this.innerText; }")) or ""
+
+    def get_attribute(self, name):
+        return self._driver._run(self._driver.tab.call(self.object_id, _ATTRIBUTE_JS, [{"value": name}]))
+
+    def is_displayed(self):
+        return bool(self._driver._run(self._driver.tab.call(self.object_id, _DISPLAYED_JS)))
+
+    def is_enabled(self):
+        return not self._driver._run(self._driver.tab.call(self.object_id, "function() { return !!this.disabled; }"))
+
+    def click(self):
+        self._driver._run(self._driver.tab.click(self.object_id))
+
+
+class CdpTabDriver:
+    """
+    Façade synchrone au format Selenium sur un onglet CDP.
+
+    Les méthodes utilisées par les modules *_article.py / *_comments.py (get, refresh,
+    find_element(s), execute_script, execute_cdp_cmd, cookies, captures) sont traduites
+    en commandes CDP exécutées sur la boucle asyncio du pool.
+    """
+
+    def __init__(self, pool, tab):
+        self.pool = pool
+        self.tab = tab
+        self.page_load_timeout = PAGE_LOAD_TIMEOUT
+        self.implicit_wait = IMPLICIT_WAIT
+
+    def _run(self, coroutine, timeout=None):
+        future = asyncio.run_coroutine_threadsafe(coroutine, self.pool.loop)
+        try:
+            return future.result(timeout or self.page_load_timeout + COMMAND_TIMEOUT)
+        except FutureTimeoutError:
+            future.cancel()
+            raise TimeoutException("Onglet CDP sans réponse")
+
+    def _find(self, object_id, by, value, single):
+        deadline = time() + self.implicit_wait
+        while True:
+            found = self._run(self.tab.find(object_id, by, value))
+            if found or time() >= deadline:
+                break
+            sleep(POLL_INTERVAL)
+        if single:
+            if not found:
+                raise NoSuchElementException(f"Aucun élément pour {by}={value}")
+            return CdpElement(self, found[0])
+        return [CdpElement(self, element_id) for element_id in found]
+
+    # Interface WebDriver
+
+    def get(self, url):
+        self._run(self.tab.navigate(url))
+
+    def refresh(self):
+        self._run(self.tab.reload())
+
+    @property
+    def current_url(self):
+        return self._run(self.tab.send("Runtime.evaluate", {"expression": "location.href", "returnByValue": True}))[
+            "result"].get("value")
+
+    def set_page_load_timeout(self, seconds):
+        self.page_load_timeout = seconds
+
+    def implicitly_wait(self, seconds):
+        self.implicit_wait = seconds
+
+    def find_element(self, by, value):
+        return self._find(None, by, value, single=True)
+
+    def find_elements(self, by, value):
+        return self._find(None, by, value, single=False)
+
+    def execute_script(self, script, *args):
+        arguments = [{"objectId": a.object_id} if isinstance(a, CdpElement) else {"value": a} for a in args]
+
+        async def run():
+            return await self.tab.call(await self.tab.document(), f"function() {{ {script}\n }}", arguments)
+
+        return self._run(run())
+
+    def execute_cdp_cmd(self, cmd, cmd_args):
+        return self._run(self.tab.send(cmd, cmd_args))
+
+    def get_screenshot_as_png(self):
+        return base64.b64decode(self._run(self.tab.send("Page.captureScreenshot", {"format": "png"}))["data"])
+
+    def add_cookie(self, cookie):
+        params = {k: cookie[k] for k in ("name", "value", "domain", "path", "secure", "httpOnly", "sameSite")
+                  if cookie.get(k) is not None}
+        if "expiry" in cookie:
+            params["expires"] = cookie["expiry"]
+        if "domain" not in params:
+            params["url"] = self.current_url
+        self._run(self.tab.send("Network.setCookie", params))
+
+    def get_cookies(self):
+        cookies = self._run(self.tab.send("Network.getCookies"))["cookies"]
+        result = []
+        for c in cookies:
+            cookie = {k: c[k] for k in ("name", "value", "domain", "path", "secure", "httpOnly") if k in c}
+            if c.get("sameSite"):
+                cookie["sameSite"] = c["sameSite"]
+            if not c.get("session") and c.get("expires", -1) > 0:
+                cookie["expiry"] = int(c["expires"])
+            result.append(cookie)
+        return result
+
+    def close(self):
+        self.quit()
+
+    def quit(self):
+        try:
+            self._run(self.tab.close(), timeout=COMMAND_TIMEOUT)
+        except Exception:
+            pass
+
+
+class CdpBrowserPool:
+    """Pool de navigateurs Chrome pilotés en CDP, N onglets par processus"""
+
+    def __init__(self, browsers=BROWSERS, tabs_per_browser=TABS_PER_BROWSER):
+        self.browsers = [CdpBrowser(i) for i in range(browsers)]
+        self.tabs_per_browser = tabs_per_browser
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, daemon=True, name="cdp-loop")
+
+    def _run(self, coroutine, timeout=STARTUP_TIMEOUT * 2):
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result(timeout)
+
+    def start(self):
+        self._thread.start()
+        for browser in self.browsers:
+            self._run(browser.start())
+        log.info(f"✓ Pool CDP : {len(self.browsers)} navigateur(s) × {self.tabs_per_browser} onglet(s)")
+        return self
+
+    def open_tabs(self):
+        """Ouvre un onglet par worker et retourne leurs façades synchrones"""
+        return [CdpTabDriver(self, self._run(browser.new_tab()))
+                for browser in self.browsers for _ in range(self.tabs_per_browser)]
+
+    def replace_tab(self, driver):
+        """Remplace l'onglet d'un driver (bloqué ou navigateur mort) par un onglet neuf"""
+        browser = driver.tab.browser
+        driver.quit()
+        self._run(browser.ensure_alive(driver.tab.generation))
+        driver.tab = self._run(browser.new_tab())
+        return driver
+
+    def close(self):
+        for browser in self.browsers:
+            try:
+                self._run(browser.stop())
+            except Exception:
+                pass
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout=5)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def tab_worker(pool, driver, article_queue, site, article_mod, cat, stats):
+    """Consomme la file d'articles d'une catégorie dans un onglet (un thread par onglet)"""
+    while True:
+        try:
+            article = article_queue.get(timeout=1)
+        except Empty:
+            return
+
+        if not is_due(article_queue, article):
+            article_queue.task_done()
+            continue
+
+        try:
+            set_context(site=site, categorie=cat, art_id=article_mod.get_id(article.get("url")))
+            log.info(f"[{threading.current_thread().name}] Traitement : {article.get('url')}")
+            article_mod.scrap_article(driver, article.get("url"), cat)
+            stats["processed"] += 1
+        except (InvalidSessionIdException, TimeoutException) as e:
+            log.warning(f"  ⚠️ Onglet bloqué ou navigateur perdu ({e}), remplacement de l'onglet...")
+            if handle_failure(article_queue, article, e, None, site, cat) == "retry":
+                stats["retried"] += 1
+            else:
+                stats["failed"] += 1
+            try:
+                pool.replace_tab(driver)
+            except Exception as replace_error:
+                log.error(f"  ❌ Impossible de remplacer l'onglet : {replace_error}")
+                article_queue.task_done()
+                return
+        except Exception as e:
+            log.error(f"  ❌ Erreur : {e}")
+            if handle_failure(article_queue, article, e, driver, site, cat) == "retry":
+                stats["retried"] += 1
+            else:
+                stats["failed"] += 1
+        article_queue.task_done()
+
+
+def crawl_category_cdp(pool, drivers, site, article_queue, cat):
+    """Traite la frontière d'une catégorie avec tous les onglets du pool en parallèle"""
+    _, article_mod, _, comments_mod = SITES[site]
+    # Un compteur par onglet (pas de verrou nécessaire), sommés à la fin
+    stats = [{"processed": 0, "failed": 0, "retried": 0} for _ in drivers]
+    threads = [threading.Thread(target=tab_worker,
+                                args=(pool, driver, article_queue, site, article_mod, cat, stats[i]),
+                                daemon=True, name=f"cdp-tab-{i}") for i, driver in enumerate(drivers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    article_mod.flush_article_batch()
+    comments_mod.flush_comment_batch()
+
+    log.info(f"\n📊 Résumé {cat} (CDP) :")
+    log.info(f"  ✓ Succès : {sum(s['processed'] for s in stats)}")
+    log.info(f"  ✗ Échecs : {sum(s['failed'] for s in stats)}")
+    log.info(f"  ↻ Relances : {sum(s['retried'] for s in stats)}")
+
+
+def start_scraping_cdp(browsers=BROWSERS, tabs_per_browser=TABS_PER_BROWSER):
+    """Mode CDP : toutes les catégories de tous les sites, traitées par le pool d'onglets"""
+    log.info(f"\n🧭 Mode CDP : {browsers} navigateur(s), {tabs_per_browser} onglet(s) chacun")
+    with CdpBrowserPool(browsers, tabs_per_browser) as pool:
+        drivers = pool.open_tabs()
+        for site, (URLS, _, category_mod, _) in SITES.items():
+            for category, url in URLS.items():
+                # Le listing de la catégorie (et l'enregistrement des cookies) reste en Selenium
+                res_articles = category_mod.scrape_articles_from_category(url, category)
+                if res_articles and not res_articles.empty():
+                    crawl_category_cdp(pool, drivers, site, res_articles, category)
+                else:
+                    log.warning(f"⚠️ Aucun article trouvé pour {category}\n")
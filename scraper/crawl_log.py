@@ -0,0 +1,148 @@
+import atexit
+import contextvars
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+from datetime import datetime
+
+# ✅ JOURNALISATION STRUCTURÉE : les modules n'écrivent plus directement sur stdout.
+# Chaque événement passe par une file (QueueHandler) vidée par un seul thread
+# (QueueListener) qui écrit la console et un fichier JSONL interrogeable après coup
+# (jq, pandas.read_json(lines=True)...). Les threads de scraping ne se bloquent donc
+# jamais sur stdout ni sur le disque.
+LOG_DIR = "logs"
+ROOT_LOGGER = "scraper"
+
+# Contexte courant (site, catégorie, article) du thread : ajouté à chaque événement
+_context = contextvars.ContextVar("crawl_log_context", default={})
+
+_listener = None
+_log_path = None
+
+# Attributs standards d'un LogRecord : tout le reste est un champ structuré (extra=...)
+_STANDARD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    """Un objet JSON par ligne : horodatage, niveau, module, message et champs structurés"""
+
+    def format(self, record):
+        event = {
+            "ts": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "niveau": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage().strip(),
+            "thread": record.threadName,
+            "pid": record.process,
+        }
+        for key, value in vars(record).items():
+            if key not in _STANDARD_ATTRS and not key.startswith("_"):
+                event[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            event["exception"] = record.exc_text
+        return json.dumps(event, ensure_ascii=False, default=str)
+
+
+class _ContextFilter(logging.Filter):
+    """Ajoute le contexte du thread émetteur (avant le passage dans la file)"""
+
+    def filter(self, record):
+        for key, value in _context.get().items():
+            if not hasattr(record, key):
+                setattr(record, key, value)
+        return True
+
+
+class _SiteAdapter(logging.LoggerAdapter):
+    """LoggerAdapter qui fusionne le contexte fixe (site...) avec les extra de l'appel"""
+
+    def process(self, msg, kwargs):
+        kwargs["extra"] = {**self.extra, **kwargs.get("extra", {})}
+        return msg, kwargs
+
+
+def set_context(**fields):
+    """Définit le contexte (ex: categorie, art_id) des prochains événements du thread courant"""
+    _context.set({**_context.get(), **fields})
+
+
+def clear_context(*keys):
+    current = dict(_context.get())
+    for key in keys or list(current):
+        current.pop(key, None)
+    _context.set(current)
+
+
+def configure_logging(level=logging.INFO, console=True, log_file=True):
+    """
+    Installe (ou réinstalle) la journalisation : file asynchrone, console et fichier JSONL.
+
+    Args:
+        level: Niveau minimal
+        console: Afficher les messages sur stdout
+        log_file: Écrire les événements dans logs/crawl-<date>-<pid>.jsonl
+
+    Returns:
+        str: Chemin du fichier JSONL (None si désactivé)
+    """
+    global _listener, _log_path
+    stop_logging()
+
+    handlers = []
+    if console:
+        console_handler = logging.StreamHandler(sys.stdout)
+        console_handler.setFormatter(logging.Formatter("%(message)s"))
+        handlers.append(console_handler)
+    _log_path = None
+    if log_file:
+        os.makedirs(LOG_DIR, exist_ok=True)
+        _log_path = os.path.join(LOG_DIR, f"crawl-{datetime.now().strftime('%Y%m%d-%H%M%S')}-{os.getpid()}.jsonl")
+        file_handler = logging.FileHandler(_log_path, encoding="utf-8")
+        file_handler.setFormatter(JsonFormatter())
+        handlers.append(file_handler)
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.addFilter(_ContextFilter())
+
+    root = logging.getLogger(ROOT_LOGGER)
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+    root.propagate = False
+
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    return _log_path
+
+
+def stop_logging():
+    """Vide la file et arrête le thread d'écriture"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+def get_logger(name, **fields):
+    """
+    Logger d'un module, avec un contexte fixe (ex: site="20min.ch/fr").
+
+    Sans configure_logging() préalable, une configuration console seule est installée.
+    """
+    if _listener is None:
+        configure_logging(log_file=False)
+    if not name.startswith(ROOT_LOGGER):
+        name = f"{ROOT_LOGGER}.{name}"
+    return _SiteAdapter(logging.getLogger(name), fields)
+
+
+atexit.register(stop_logging)
@@ -1,37 +1,160 @@
+import contextlib
+import functools
 import sqlite3
+import threading
 
-# Cache de connexion global
+# Fichier de base de données partagé par tous les modules
+DB_PATH = 'UNIL_IVI_GR4.db'
+
+# ✅ GESTIONNAIRE DE CONNEXIONS : un seul écrivain par processus (get_connection(), écritures
+# sérialisées par db_lock) et une connexion de lecture par thread (get_read_connection()).
+# En WAL, les lecteurs ne bloquent pas l'écrivain et voient le dernier état commité ; les
+# autres processus (Detoxify, annotation, file partagée) attendent jusqu'à BUSY_TIMEOUT_S
+# au lieu d'échouer sur « database is locked ».
+BUSY_TIMEOUT_S = 30
+# Checkpoint automatique du WAL (pages de 4 Ko) et taille conservée après checkpoint
+WAL_AUTOCHECKPOINT_PAGES = 1000
+WAL_SIZE_LIMIT = 64 * 1024 ** 2
+
+# PRAGMA appliqués à chaque connexion (ils ne valent que pour la connexion qui les exécute)
+CONNECTION_PRAGMAS = (
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA cache_size = -64000",  # 64MB de cache
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA mmap_size = 30000000000",
+    "PRAGMA foreign_keys = ON",  # IMPORTANT pour les FK
+)
+
+# Connexion d'écriture (partagée entre threads)
 _connection_cache = None
+# Connexions de lecture : une par thread, toutes conservées pour close_connection()
+_readers = threading.local()
+_reader_connections = []
+_readers_lock = threading.Lock()
+_generation = 0  # Incrémenté à chaque fermeture : les connexions de lecture des threads sont périmées
+
+# Verrou des écritures : plusieurs onglets CDP (threads) partagent la connexion et les batchs
+db_lock = threading.RLock()
+
+
+def synchronized(func):
+    """Exécute la fonction sous db_lock (batchs globaux et connexion partagés entre threads)"""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with db_lock:
+            return func(*args, **kwargs)
+    return wrapper
+
+
+def _connect(read_only=False):
+    """Ouvre une connexion configurée (délai d'attente des verrous et PRAGMA de la connexion)"""
+    conn = sqlite3.connect(DB_PATH, timeout=BUSY_TIMEOUT_S, check_same_thread=False)
+    for pragma in CONNECTION_PRAGMAS:
+        conn.execute(pragma)
+    if read_only:
+        conn.execute("PRAGMA query_only = ON")
+    else:
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute(f"PRAGMA wal_autocheckpoint = {WAL_AUTOCHECKPOINT_PAGES}")
+        conn.execute(f"PRAGMA journal_size_limit = {WAL_SIZE_LIMIT}")
+    return conn
+
 
 def get_connection():
-    """Retourne une connexion SQLite réutilisable et optimisée"""
+    """Retourne la connexion d'écriture, réutilisable et optimisée (écritures sous db_lock)"""
     global _connection_cache
     if _connection_cache is None:
-        try:
-            _connection_cache = sqlite3.connect('UNIL_IVI_GR4.db')
-            cursor = _connection_cache.cursor()
-            # ✅ Optimisations critiques SQLite
-            cursor.execute("PRAGMA journal_mode = WAL")
-            cursor.execute("PRAGMA synchronous = NORMAL")
-            cursor.execute("PRAGMA cache_size = -64000")  # 64MB de cache
-            cursor.execute("PRAGMA temp_store = MEMORY")
-            cursor.execute("PRAGMA mmap_size = 30000000000")
-            cursor.execute("PRAGMA foreign_keys = ON")  # IMPORTANT pour les FK
-            print("✓ Connexion SQLite établie et optimisée")
-        except sqlite3.Error as e:
-            print(f"❌ Erreur de connexion à SQLite : {e}")
-            exit(1)
+        with db_lock:
+            if _connection_cache is None:
+                try:
+                    _connection_cache = _connect()
+                    print("✓ Connexion SQLite établie et optimisée")
+                except sqlite3.Error as e:
+                    print(f"❌ Erreur de connexion à SQLite : {e}")
+                    exit(1)
     return _connection_cache
 
+
+def get_read_connection():
+    """Retourne la connexion de lecture du thread courant (lecture seule, sans verrou)"""
+    if getattr(_readers, "generation", None) != _generation:
+        # L'écrivain crée la base et passe en WAL avant la première lecture
+        get_connection()
+        with _readers_lock:
+            _readers.conn = _connect(read_only=True)
+            _readers.generation = _generation
+            _reader_connections.append(_readers.conn)
+    return _readers.conn
+
+
+def release_read_connection():
+    """Ferme la connexion de lecture du thread courant (threads éphémères : requêtes HTTP...)"""
+    if getattr(_readers, "generation", None) != _generation:
+        return
+    with _readers_lock:
+        if _readers.conn in _reader_connections:
+            _reader_connections.remove(_readers.conn)
+        _readers.conn.close()
+        _readers.generation = None
+
+
+@contextlib.contextmanager
+def write_transaction():
+    """
+    Transaction d'écriture sérialisée : commit en sortie, rollback en cas d'exception.
+
+    Exemple :
+        with write_transaction() as conn:
+            conn.execute("UPDATE ...")
+    """
+    with db_lock:
+        conn = get_connection()
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+
+def checkpoint(mode="PASSIVE"):
+    """
+    Checkpoint du WAL.
+
+    Args:
+        mode: PASSIVE (sans attendre les lecteurs), RESTART ou TRUNCATE (remet le WAL à zéro)
+
+    Returns:
+        (busy, pages du WAL, pages recopiées dans la base)
+    """
+    with db_lock:
+        conn = get_connection()
+        if conn.in_transaction:
+            conn.commit()
+        return conn.execute(f"PRAGMA wal_checkpoint({mode})").fetchone()
+
+
 def close_connection():
-    """Ferme la connexion cachée"""
-    global _connection_cache
-    if _connection_cache is not None:
-        _connection_cache.close()
-        _connection_cache = None
-        print("✓ Connexion SQLite fermée")
+    """Ferme la connexion d'écriture et les connexions de lecture"""
+    global _connection_cache, _generation
+    with _readers_lock:
+        for conn in _reader_connections:
+            conn.close()
+        _reader_connections.clear()
+        _generation += 1
+    with db_lock:
+        if _connection_cache is not None:
+            try:
+                # Tous les lecteurs sont fermés : le WAL peut être vidé et tronqué
+                _connection_cache.commit()
+                _connection_cache.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            except sqlite3.Error:
+                pass
+            _connection_cache.close()
+            _connection_cache = None
+            print("✓ Connexion SQLite fermée")
 
 def reset_connection():
     """Force la réinitialisation de la connexion"""
     close_connection()
-    return get_connection()
\ No newline at end of file
+    return get_connection()
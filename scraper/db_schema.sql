@@ -1,3 +1,7 @@
+-- Schéma complet à la dernière version des migrations (db_manager/migrations/).
+-- Chargé tel quel pour une base neuve ; toute modification passe aussi par une
+-- nouvelle migration numérotée (python -m db_manager.migrations --verifier).
+
 -- Table UNIL_Article
 CREATE TABLE IF NOT EXISTS UNIL_Article (
     art_id VARCHAR PRIMARY KEY,
@@ -10,9 +14,13 @@ CREATE TABLE IF NOT EXISTS UNIL_Article (
     art_nom_journal VARCHAR,
     art_date_recolte VARCHAR,
     art_nom_pdf VARCHAR,
-    art_hash_pdf VARCHAR
+    art_hash_pdf VARCHAR,
+    art_empreinte_commentaires VARCHAR,
+    art_nb_commentaires INTEGER
 );
 
+CREATE INDEX IF NOT EXISTS idx_article_commentaires_actifs ON UNIL_Article(art_commentaires_actifs, art_id);
+
 -- Table UNIL_Commentaire
 CREATE TABLE IF NOT EXISTS UNIL_Commentaire (
     com_id VARCHAR PRIMARY KEY,
@@ -20,10 +28,226 @@ CREATE TABLE IF NOT EXISTS UNIL_Commentaire (
     com_contenu VARCHAR,
     com_art_id VARCHAR NOT NULL,
     com_commentaire_parent VARCHAR,
-    com_verif_haine_luca INT,
-    com_verif_haine_augustin INT,
-    com_verif_haine_matthieu INT,
-    com_verif_haine_severin INT,
+    com_detox_is_haine REAL,
+    com_detox_toxicity REAL,
+    com_detox_severe_toxicity REAL,
+    com_detox_obscene REAL,
+    com_detox_threat REAL,
+    com_detox_insult REAL,
+    com_detox_identity_attack REAL,
+    com_haine_final INT,
+    com_detox_date VARCHAR,
+    com_haine_final_date VARCHAR,
     FOREIGN KEY (com_art_id) REFERENCES UNIL_Article(art_id),
     FOREIGN KEY (com_commentaire_parent) REFERENCES UNIL_Commentaire(com_id)
-);
\ No newline at end of file
+);
+
+CREATE INDEX IF NOT EXISTS idx_commentaire_article_id ON UNIL_Commentaire(com_art_id, com_id);
+CREATE INDEX IF NOT EXISTS idx_commentaire_parent ON UNIL_Commentaire(com_commentaire_parent);
+CREATE INDEX IF NOT EXISTS idx_commentaire_a_scorer ON UNIL_Commentaire(com_id)
+    WHERE com_detox_is_haine IS NULL;
+CREATE INDEX IF NOT EXISTS idx_commentaire_score ON UNIL_Commentaire(com_detox_is_haine DESC)
+    WHERE com_detox_is_haine IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_commentaire_date_score ON UNIL_Commentaire(com_detox_date)
+    WHERE com_detox_date IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_commentaire_date_revision ON UNIL_Commentaire(com_haine_final_date)
+    WHERE com_haine_final_date IS NOT NULL;
+
+-- Table UNIL_Annotation (une ligne par commentaire, tour d'annotation et annotateur)
+CREATE TABLE IF NOT EXISTS UNIL_Annotation (
+    ann_com_id VARCHAR NOT NULL,
+    ann_tour INTEGER NOT NULL DEFAULT 1,
+    ann_annotateur VARCHAR NOT NULL,
+    ann_score INT NOT NULL,
+    ann_date VARCHAR,
+    PRIMARY KEY (ann_com_id, ann_tour, ann_annotateur),
+    FOREIGN KEY (ann_com_id) REFERENCES UNIL_Commentaire(com_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_annotation_annotateur ON UNIL_Annotation(ann_annotateur, ann_tour, ann_com_id, ann_score);
+CREATE INDEX IF NOT EXISTS idx_annotation_tour ON UNIL_Annotation(ann_tour, ann_com_id, ann_score, ann_annotateur);
+
+-- Vue de compatibilité : anciennes colonnes com_verif_haine_<prénom>
+CREATE VIEW IF NOT EXISTS UNIL_Commentaire_Verif AS
+SELECT c.*,
+       (SELECT ann_score FROM UNIL_Annotation
+        WHERE ann_com_id = c.com_id AND ann_tour = 1 AND ann_annotateur = 'luca') AS com_verif_haine_luca,
+       (SELECT ann_score FROM UNIL_Annotation
+        WHERE ann_com_id = c.com_id AND ann_tour = 1 AND ann_annotateur = 'augustin') AS com_verif_haine_augustin,
+       (SELECT ann_score FROM UNIL_Annotation
+        WHERE ann_com_id = c.com_id AND ann_tour = 1 AND ann_annotateur = 'matthieu') AS com_verif_haine_matthieu,
+       (SELECT ann_score FROM UNIL_Annotation
+        WHERE ann_com_id = c.com_id AND ann_tour = 1 AND ann_annotateur = 'severin') AS com_verif_haine_severin
+FROM UNIL_Commentaire c;
+
+-- Journal des annotations (alimenté par triggers) : synchronisation incrémentale des bases
+-- d'annotateurs vers la base fusionnée (db_manager/merger.py)
+CREATE TABLE IF NOT EXISTS UNIL_Annotation_Journal (
+    jou_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    jou_com_id VARCHAR NOT NULL,
+    jou_tour INTEGER NOT NULL,
+    jou_annotateur VARCHAR NOT NULL,
+    jou_score_avant INT,
+    jou_score INT,
+    jou_date VARCHAR
+);
+
+CREATE TRIGGER IF NOT EXISTS trg_annotation_journal_insert AFTER INSERT ON UNIL_Annotation BEGIN
+    INSERT INTO UNIL_Annotation_Journal (jou_com_id, jou_tour, jou_annotateur, jou_score_avant, jou_score, jou_date)
+    VALUES (new.ann_com_id, new.ann_tour, new.ann_annotateur, NULL, new.ann_score,
+            COALESCE(new.ann_date, datetime('now', 'localtime')));
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_annotation_journal_update AFTER UPDATE OF ann_score ON UNIL_Annotation
+    WHEN old.ann_score IS NOT new.ann_score BEGIN
+    INSERT INTO UNIL_Annotation_Journal (jou_com_id, jou_tour, jou_annotateur, jou_score_avant, jou_score, jou_date)
+    VALUES (new.ann_com_id, new.ann_tour, new.ann_annotateur, old.ann_score, new.ann_score,
+            COALESCE(new.ann_date, datetime('now', 'localtime')));
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_annotation_journal_delete AFTER DELETE ON UNIL_Annotation BEGIN
+    INSERT INTO UNIL_Annotation_Journal (jou_com_id, jou_tour, jou_annotateur, jou_score_avant, jou_score, jou_date)
+    VALUES (old.ann_com_id, old.ann_tour, old.ann_annotateur, old.ann_score, NULL, datetime('now', 'localtime'));
+END;
+
+-- Filigrane de synchronisation : dernier jou_id de chaque source déjà fusionné
+CREATE TABLE IF NOT EXISTS UNIL_Synchro (
+    syn_source VARCHAR PRIMARY KEY,
+    syn_jou_id INTEGER NOT NULL,
+    syn_date VARCHAR
+);
+
+-- Modifications concurrentes détectées à la fusion (non appliquées)
+CREATE TABLE IF NOT EXISTS UNIL_Conflit (
+    con_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    con_source VARCHAR NOT NULL,
+    con_com_id VARCHAR NOT NULL,
+    con_tour INTEGER NOT NULL,
+    con_annotateur VARCHAR NOT NULL,
+    con_score_avant INT,
+    con_score_maitre INT,
+    con_score_source INT,
+    con_date_source VARCHAR,
+    con_date VARCHAR,
+    con_resolu INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE INDEX IF NOT EXISTS idx_conflit_ouvert ON UNIL_Conflit(con_com_id, con_tour, con_annotateur)
+    WHERE con_resolu = 0;
+
+-- Table UNIL_Revisite (planification des re-visites des fils de commentaires actifs)
+CREATE TABLE IF NOT EXISTS UNIL_Revisite (
+    rev_art_id VARCHAR PRIMARY KEY,
+    rev_nb_commentaires INTEGER,
+    rev_croissance REAL,
+    rev_nb_visites INTEGER DEFAULT 0,
+    rev_derniere_visite VARCHAR,
+    rev_prochaine_visite VARCHAR,
+    FOREIGN KEY (rev_art_id) REFERENCES UNIL_Article(art_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_revisite_prochaine ON UNIL_Revisite(rev_prochaine_visite);
+
+-- Table UNIL_File_Travail (file de travail partagée entre plusieurs processus de scraping)
+CREATE TABLE IF NOT EXISTS UNIL_File_Travail (
+    fq_art_id VARCHAR PRIMARY KEY,
+    fq_url VARCHAR NOT NULL,
+    fq_titre VARCHAR,
+    fq_site VARCHAR NOT NULL,
+    fq_categorie VARCHAR NOT NULL,
+    fq_etat VARCHAR NOT NULL DEFAULT 'attente',
+    fq_priorite REAL DEFAULT 0,
+    fq_tentatives INTEGER DEFAULT 0,
+    fq_proprietaire VARCHAR,
+    fq_bail_expire VARCHAR,
+    fq_disponible_apres VARCHAR,
+    fq_date_maj VARCHAR
+);
+
+CREATE INDEX IF NOT EXISTS idx_file_travail_etat ON UNIL_File_Travail(fq_site, fq_categorie, fq_etat, fq_priorite DESC);
+
+-- Table UNIL_Echec (articles abandonnés : échec permanent ou tentatives épuisées)
+CREATE TABLE IF NOT EXISTS UNIL_Echec (
+    ech_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ech_art_id VARCHAR,
+    ech_url VARCHAR,
+    ech_page_url VARCHAR,
+    ech_site VARCHAR,
+    ech_categorie VARCHAR,
+    ech_type VARCHAR,
+    ech_exception VARCHAR,
+    ech_message VARCHAR,
+    ech_trace VARCHAR,
+    ech_tentatives INTEGER,
+    ech_date VARCHAR
+);
+
+-- Table UNIL_Crawl_Metrique (métriques de crawl : blocages du driver, profilage, ...)
+CREATE TABLE IF NOT EXISTS UNIL_Crawl_Metrique (
+    met_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    met_type VARCHAR NOT NULL,
+    met_site VARCHAR,
+    met_valeur REAL,
+    met_details VARCHAR,
+    met_date VARCHAR
+);
+
+CREATE INDEX IF NOT EXISTS idx_crawl_metrique_type ON UNIL_Crawl_Metrique(met_type, met_date);
+
+-- Recherche plein texte (FTS5, contenu externe) synchronisée par triggers
+CREATE VIRTUAL TABLE IF NOT EXISTS UNIL_Commentaire_FTS USING fts5(
+    com_contenu,
+    com_auteur,
+    content = 'UNIL_Commentaire',
+    content_rowid = 'rowid',
+    tokenize = 'unicode61 remove_diacritics 2',
+    prefix = '2 3'
+);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS UNIL_Article_FTS USING fts5(
+    art_titre,
+    art_description,
+    content = 'UNIL_Article',
+    content_rowid = 'rowid',
+    tokenize = 'unicode61 remove_diacritics 2',
+    prefix = '2 3'
+);
+
+-- Classement bm25 : le contenu (ou le titre) pèse plus que l'auteur (ou la description)
+INSERT INTO UNIL_Commentaire_FTS(UNIL_Commentaire_FTS, rank) VALUES ('rank', 'bm25(1.0, 0.3)');
+INSERT INTO UNIL_Article_FTS(UNIL_Article_FTS, rank) VALUES ('rank', 'bm25(1.0, 0.5)');
+
+-- Synchronisation par triggers (les mises à jour des scores Detoxify ne touchent pas l'index)
+CREATE TRIGGER IF NOT EXISTS trg_commentaire_fts_insert AFTER INSERT ON UNIL_Commentaire BEGIN
+    INSERT INTO UNIL_Commentaire_FTS(rowid, com_contenu, com_auteur)
+    VALUES (new.rowid, new.com_contenu, new.com_auteur);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_commentaire_fts_delete AFTER DELETE ON UNIL_Commentaire BEGIN
+    INSERT INTO UNIL_Commentaire_FTS(UNIL_Commentaire_FTS, rowid, com_contenu, com_auteur)
+    VALUES ('delete', old.rowid, old.com_contenu, old.com_auteur);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_commentaire_fts_update AFTER UPDATE OF com_contenu, com_auteur ON UNIL_Commentaire BEGIN
+    INSERT INTO UNIL_Commentaire_FTS(UNIL_Commentaire_FTS, rowid, com_contenu, com_auteur)
+    VALUES ('delete', old.rowid, old.com_contenu, old.com_auteur);
+    INSERT INTO UNIL_Commentaire_FTS(rowid, com_contenu, com_auteur)
+    VALUES (new.rowid, new.com_contenu, new.com_auteur);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_article_fts_insert AFTER INSERT ON UNIL_Article BEGIN
+    INSERT INTO UNIL_Article_FTS(rowid, art_titre, art_description)
+    VALUES (new.rowid, new.art_titre, new.art_description);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_article_fts_delete AFTER DELETE ON UNIL_Article BEGIN
+    INSERT INTO UNIL_Article_FTS(UNIL_Article_FTS, rowid, art_titre, art_description)
+    VALUES ('delete', old.rowid, old.art_titre, old.art_description);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_article_fts_update AFTER UPDATE OF art_titre, art_description ON UNIL_Article BEGIN
+    INSERT INTO UNIL_Article_FTS(UNIL_Article_FTS, rowid, art_titre, art_description)
+    VALUES ('delete', old.rowid, old.art_titre, old.art_description);
+    INSERT INTO UNIL_Article_FTS(rowid, art_titre, art_description)
+    VALUES (new.rowid, new.art_titre, new.art_description);
+END;
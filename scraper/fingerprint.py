@@ -0,0 +1,69 @@
+import hashlib
+
+from scraper.dbConfig import get_connection, get_read_connection, synchronized
+from scraper.crawl_log import get_logger
+
+log = get_logger(__name__)
+
+# ✅ EMPREINTE DES FILS DE COMMENTAIRES : digest ordonné des com_id de premier niveau
+# (hash_md5 de pseudo + contenu), de leurs réponses et nombre de commentaires. Si
+# l'empreinte n'a pas changé depuis la dernière capture, la capture et les écritures en
+# base sont évitées. Les réponses entrent dans le digest par leurs com_id quand elles sont
+# dans le DOM (24heures, Le Matin), sinon par le texte du bouton « N réponses » (20min) :
+# un fil qui ne gagne que des réponses est recapturé. Les identifiants sont lus en un seul
+# appel execute_script par page (pas de find_element par commentaire ni d'attente implicite).
+# Colonnes art_empreinte_commentaires / art_nb_commentaires : migration 0003.
+
+# Fonction JavaScript commune : texte d'un sous-élément (chaîne vide s'il est absent)
+JS_TEXT = "const text = (root, sel) => { const el = root.querySelector(sel); return el ? el.innerText.trim() : ''; };"
+
+
+def comments_fingerprint(com_ids, replies=None):
+    """
+    Calcule l'empreinte d'un fil de commentaires.
+
+    Args:
+        com_ids: Identifiants des commentaires de premier niveau, dans l'ordre de la page
+        replies: Pour chaque commentaire, la liste de ses réponses (com_id, ou texte du
+                 bouton « N réponses » si elles sont repliées)
+
+    Returns:
+        Tuple (empreinte, nombre de commentaires de premier niveau)
+    """
+    digest = hashlib.sha256()
+    for i, com_id in enumerate(com_ids):
+        digest.update(com_id.encode("utf-8"))
+        digest.update(b"\n")
+        for reply in (replies[i] if replies else ()):
+            digest.update(b"\t" + reply.encode("utf-8") + b"\n")
+    return digest.hexdigest(), len(com_ids)
+
+
+def is_unchanged(art_id, empreinte, nb_commentaires):
+    """Vrai si le fil a déjà été capturé avec la même empreinte"""
+    conn = get_read_connection()
+    row = conn.execute("""
+                       SELECT art_empreinte_commentaires, art_nb_commentaires
+                       FROM UNIL_Article
+                       WHERE art_id = ?
+                         AND art_hash_pdf IS NOT NULL
+                       """, (art_id,)).fetchone()
+    return row is not None and row[0] == empreinte and row[1] == nb_commentaires
+
+
+@synchronized
+def save_fingerprint(art_id, empreinte, nb_commentaires):
+    """Enregistre l'empreinte d'un fil (après l'écriture de ses commentaires)"""
+    conn = get_connection()
+    try:
+        conn.execute("""
+                     UPDATE UNIL_Article
+                     SET art_empreinte_commentaires = ?,
+                         art_nb_commentaires        = ?
+                     WHERE art_id = ?
+                     """, (empreinte, nb_commentaires, art_id))
+        conn.commit()
+    except Exception as e:
+        # Sans empreinte, le fil sera simplement recapturé au prochain passage
+        log.warning(f"  ⚠️ Erreur enregistrement de l'empreinte: {e}")
+        conn.rollback()
@@ -0,0 +1,47 @@
+from scraper.dbConfig import get_read_connection
+from scraper.crawl_log import get_logger
+
+log = get_logger(__name__)
+
+# ✅ FRONTIÈRE GLOBALE : un article n'est visité qu'une seule fois,
+# toutes catégories, tous sites et toutes exécutions confondus.
+# La clé est get_id(url), comme la clé primaire de UNIL_Article.
+_seen_ids = None
+
+
+def load_seen_ids():
+    """Charge les identifiants des articles déjà entièrement traités lors des exécutions précédentes"""
+    global _seen_ids
+    if _seen_ids is None:
+        conn = get_read_connection()
+        # Un article est "terminé" s'il n'a pas de commentaires ou si son PDF a été enregistré.
+        # Les articles avec commentaires mais sans PDF ont échoué en cours de route : on les retente.
+        cursor = conn.execute("""
+                              SELECT art_id
+                              FROM UNIL_Article
+                              WHERE art_commentaires_actifs = 0
+                                 OR art_hash_pdf IS NOT NULL
+                              """)
+        _seen_ids = set(row[0] for row in cursor)
+        log.info(f"✓ Frontière globale : {len(_seen_ids)} article(s) déjà traités")
+    return _seen_ids
+
+
+def claim(art_id) -> bool:
+    """
+    Réserve un article pour l'exécution courante.
+
+    Returns:
+        bool: True si l'article n'a encore jamais été vu, False s'il doit être ignoré
+    """
+    seen = load_seen_ids()
+    if art_id in seen:
+        return False
+    seen.add(art_id)
+    return True
+
+
+def reset_frontier():
+    """Vide le cache en mémoire (il sera rechargé depuis la base au prochain appel)"""
+    global _seen_ids
+    _seen_ids = None
@@ -4,14 +4,20 @@ import requests
 from selenium.webdriver.common.by import By
 
 from scraper.le20minutes.minutes_comments import scrap_comments
-from scraper.dbConfig import get_connection
+from scraper.dbConfig import get_connection, synchronized
+from scraper import spool
+from scraper.warc import archive_page
 from scraper.utils import normalize_date, load_cookies
+from scraper.crawl_log import get_logger
+
+log = get_logger(__name__, site="20min.ch/fr")
 
 # ✅ BATCH POUR ARTICLES
 _article_batch = []
 ARTICLE_BATCH_SIZE = 10
 
 
+@synchronized
 def save_data(art_id, art_titre, art_categorie, art_date, art_description, art_url, art_commentaires_actifs):
     """Sauvegarde en batch pour optimisation"""
     global _article_batch
@@ -30,23 +36,29 @@ def save_data(art_id, art_titre, art_categorie, art_date, art_description, art_u
         art_nom_journal,
         art_date_article
     ))
+    spool.append("article", _article_batch[-1])
 
     # Flush quand le batch est plein
     if len(_article_batch) >= ARTICLE_BATCH_SIZE:
         flush_article_batch()
 
+@synchronized
 def save_pdf_details(art_id, art_nom_pdf, art_hash_pdf):
+    spool.append("pdf", (art_id, art_nom_pdf, art_hash_pdf))
+    spool.sync()
     conn = get_connection()
     try:
         conn.execute("""UPDATE UNIL_Article SET art_nom_pdf = ?, art_hash_pdf = ? WHERE art_id = ?""",
                      (art_nom_pdf, art_hash_pdf, art_id))
         conn.commit()
-        print(f"  ✓ {art_id} article dont le PDF a été inséré en BDD.")
+        log.info(f"  ✓ {art_id} article dont le PDF a été inséré en BDD.")
     except Exception as e:
-        print(f"  ❌ Erreur insertion des détails du PDF de l'articles: {e}")
+        log.error(f"  ❌ Erreur insertion des détails du PDF de l'articles: {e}")
+        log.warning("  ↪ Détails du PDF conservés dans le spool, rejoués au prochain démarrage")
         conn.rollback()
 
 
+@synchronized
 def flush_article_batch():
     """Insère tous les articles en attente en une seule requête"""
     global _article_batch
@@ -54,6 +66,8 @@ def flush_article_batch():
     if not _article_batch:
         return
 
+    # Les articles sont déjà dans le spool : on le rend durable avant d'écrire en base
+    spool.sync()
     conn = get_connection()
 
     try:
@@ -66,11 +80,12 @@ def flush_article_batch():
 
         conn.commit()
 
-        print(f"  ✓ {len(_article_batch)} article(s) insérés en batch")
+        log.info(f"  ✓ {len(_article_batch)} article(s) insérés en batch", extra={"nb": len(_article_batch)})
         _article_batch = []
 
     except Exception as e:
-        print(f"  ❌ Erreur batch articles: {e}")
+        log.error(f"  ❌ Erreur batch articles: {e}")
+        log.warning(f"  ↪ {len(_article_batch)} article(s) conservés dans le spool, rejoués au prochain démarrage")
         conn.rollback()
         _article_batch = []
 
@@ -105,7 +120,7 @@ def has_comments_section(comments_url) -> bool:
         response = requests.get(comments_url, timeout=4)
         return response.status_code == 200
     except requests.RequestException as e:
-        print(f"  ⚠️ Erreur requête commentaires: {e}")
+        log.warning(f"  ⚠️ Erreur requête commentaires: {e}")
         return False
 
 
@@ -125,13 +140,15 @@ def scrap_article(driver, article_url, category):
     driver.get(article_url)
     load_cookies(driver, f"20min-session_cookies_{category}.pkl")
     driver.refresh()
+    archive_page(driver, "article", "20min.ch/fr", get_id(article_url), category)
 
     has_comments = process_article(article_url, category, driver)
 
     if has_comments:
-        print(f"\t✓ Commentaires actifs pour {article_url}")
+        log.info(f"\t✓ Commentaires actifs pour {article_url}")
         flush_article_batch()
         pdf_path, pdf_hash = scrap_comments(driver, get_id(article_url), get_url_comments(article_url))
-        save_pdf_details(get_id(article_url), pdf_path, pdf_hash)
+        if pdf_path:  # None : fil inchangé depuis la dernière capture
+            save_pdf_details(get_id(article_url), pdf_path, pdf_hash)
     else:
-        print(f"\t⊘ Commentaires désactivés pour {article_url}")
\ No newline at end of file
+        log.info(f"\t⊘ Commentaires désactivés pour {article_url}")
\ No newline at end of file
@@ -4,14 +4,22 @@ from typing import List, Tuple
 from selenium.common.exceptions import (NoSuchElementException, StaleElementReferenceException, WebDriverException)
 from selenium.webdriver.common.by import By
 
-from scraper.dbConfig import get_connection
-from scraper.utils import hash_md5, sauvegarder_page_pdf
+from scraper.dbConfig import get_connection, synchronized
+from scraper import spool
+from scraper.lease import heartbeat
+from scraper.fingerprint import JS_TEXT, comments_fingerprint, is_unchanged, save_fingerprint
+from scraper.warc import archive_page
+from scraper.utils import hash_md5, sauvegarder_page
+from scraper.crawl_log import get_logger
+
+log = get_logger(__name__, site="20min.ch/fr")
 
 # ✅ BATCH POUR COMMENTAIRES
 _comment_batch = []
 COMMENT_BATCH_SIZE = 20
 
 
+@synchronized
 def save_comment(art_id, com_id, com_author, com_content, com_ref_id=None):
     """Sauvegarde en batch (commentaire ou réponse)"""
     global _comment_batch
@@ -23,12 +31,14 @@ def save_comment(art_id, com_id, com_author, com_content, com_ref_id=None):
         art_id,
         com_ref_id
     ))
+    spool.append("commentaire", _comment_batch[-1])
 
     # Flush quand le batch est plein
     if len(_comment_batch) >= COMMENT_BATCH_SIZE:
         flush_comment_batch()
 
 
+@synchronized
 def flush_comment_batch():
     """Insère tous les commentaires en attente"""
     global _comment_batch
@@ -36,6 +46,8 @@ def flush_comment_batch():
     if not _comment_batch:
         return
 
+    # Les commentaires sont déjà dans le spool : on le rend durable avant d'écrire en base
+    spool.sync()
     conn = get_connection()
 
     try:
@@ -46,11 +58,12 @@ def flush_comment_batch():
             VALUES (?, ?, ?, ?, ?)
                          """, _comment_batch)
         conn.commit()
-        print(f"    ✓ {len(_comment_batch)} commentaire(s) insérés en batch")
+        log.info(f"    ✓ {len(_comment_batch)} commentaire(s) insérés en batch", extra={"nb": len(_comment_batch)})
         _comment_batch = []
 
     except Exception as e:
-        print(f"    ❌ Erreur batch commentaires: {e}")
+        log.error(f"    ❌ Erreur batch commentaires: {e}")
+        log.warning(f"    ↪ {len(_comment_batch)} commentaire(s) conservés dans le spool, rejoués au prochain démarrage")
         conn.rollback()
         _comment_batch = []
 
@@ -94,7 +107,7 @@ def is_reply_button(button) -> bool:
         return False
 
 
-def process_answers(art_id, comment, hash_comment):
+def process_answers(art_id, comment, hash_comment, pause=time.sleep):
     try:
         all_buttons = comment.find_elements(By.TAG_NAME, "button")
     except Exception:
@@ -107,7 +120,7 @@ def process_answers(art_id, comment, hash_comment):
 
             try:
                 button.click()
-                time.sleep(0.8)
+                pause(0.8)
             except Exception:
                 continue
 
@@ -137,17 +150,18 @@ def process_answers(art_id, comment, hash_comment):
     return False, 0
 
 
-def process_comments(dr, art_id) -> Tuple[int, int, int]:
+def process_comments(dr, art_id, pause=time.sleep) -> Tuple[int, int, int]:
     comments = get_all_comments(dr)
     total_comments = len(comments)
     total_replies = 0
     comments_with_replies = 0
 
     for index, article in enumerate(comments, 1):
+        heartbeat()
         try:
             try:
                 dr.execute_script("arguments[0].scrollIntoView({block: 'center'});", article)
-                time.sleep(0.3)
+                pause(0.3)
             except Exception:
                 continue
 
@@ -158,7 +172,7 @@ def process_comments(dr, art_id) -> Tuple[int, int, int]:
             except Exception:
                 continue
 
-            button_found, num_replies = process_answers(art_id, article, com_hash_id)
+            button_found, num_replies = process_answers(art_id, article, com_hash_id, pause)
 
             if button_found and num_replies > 0:
                 flush_comment_batch()
@@ -180,6 +194,7 @@ def load_all_articles(dr, max_attempts: int = 200, scroll_pause: float = 2.0):
 
     try:
         while attempt < max_attempts:
+            heartbeat()
             dr.execute_script("window.scrollTo(0, document.body.scrollHeight);")
             time.sleep(scroll_pause)
 
@@ -201,14 +216,44 @@ def load_all_articles(dr, max_attempts: int = 200, scroll_pause: float = 2.0):
         return previous_count
 
 
+def get_comment_ids(dr) -> Tuple[List[str], List[List[str]]]:
+    """
+    Identifiants (hash_md5) des commentaires de premier niveau, dans l'ordre de la page, et
+    texte de leur bouton « N réponses » (réponses repliées), lus en un seul appel JavaScript.
+    """
+    try:
+        rows = dr.execute_script(JS_TEXT + """
+            return Array.from(document.getElementsByTagName('article')).map(a => [
+                text(a, '.sc-d8c6148a-2.IIQUY'),
+                text(a, '.sc-5be4c02d-0.gDVcQV'),
+                Array.from(a.getElementsByTagName('button'))
+                     .map(b => b.innerText.trim())
+                     .filter(t => t.toLowerCase().includes('réponse'))
+            ]);
+        """)
+    except Exception:
+        return [], []
+    return [hash_md5(pseudo + contenu) for pseudo, contenu, _ in rows], [badges for _, _, badges in rows]
+
+
 def scrap_comments(driver, art_id, art_comments_url):
     driver.get(art_comments_url)
     load_all_articles(driver)
-    pdf_path, pdf_hash = sauvegarder_page_pdf(driver, "20min-" + art_id + '.pdf')
+    empreinte, nb_commentaires = comments_fingerprint(*get_comment_ids(driver))
+    if is_unchanged(art_id, empreinte, nb_commentaires):
+        log.info(f"    ↺ Fil inchangé ({nb_commentaires} commentaires), capture ignorée")
+        return None, None
+    pdf_path, pdf_hash = sauvegarder_page(driver, "20min-" + art_id)
     total_com, total_rep, com_with_rep = process_comments(driver, art_id)
+    # DOM final (réponses dépliées) : base de la ré-extraction hors ligne
+    archive_page(driver, "commentaires", "20min.ch/fr", art_id)
 
     # Flush après chaque article avec commentaires
     flush_comment_batch()
+    # Bail repris entre-temps : l'empreinte ne doit pas faire ignorer le fil au nouveau détenteur
+    heartbeat(force=True)
+    save_fingerprint(art_id, empreinte, nb_commentaires)
 
-    print(f"    → {total_com} commentaires, {total_rep} réponses")
+    log.info(f"    → {total_com} commentaires, {total_rep} réponses",
+             extra={"art_id": art_id, "nb_commentaires": total_com, "nb_reponses": total_rep})
     return pdf_path, pdf_hash
\ No newline at end of file
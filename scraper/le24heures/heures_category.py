@@ -1,4 +1,3 @@
-from queue import Queue
 from time import sleep
 
 from selenium import webdriver
@@ -11,21 +10,31 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
 
-from scraper.le24heures.heures_article import scrap_article, flush_article_batch
+from scraper.le24heures.heures_article import scrap_article, flush_article_batch, get_id
 from scraper.le24heures.heures_comments import flush_comment_batch
 from scraper.dbConfig import get_connection
+from scraper.frontier import claim
+from scraper.profiling import profile_tick
+from scraper.priority import build_frontier, teaser_date
+from scraper.retry import handle_failure, is_due
 from scraper.utils import get_driver_requirements, save_cookies, accept_cookies_24heures
+from scraper.watchdog import attach_watchdog, DriverHangError
+from scraper.crawl_log import get_logger, set_context
+
+log = get_logger(__name__, site="24heures.ch")
+
+SITE = "24heures.ch"  # Valeur de art_nom_journal
 
 
 def scrape_articles_from_category(url, category):
     options, service = get_driver_requirements()
-    driver = webdriver.Chrome(options=options)
-    queue_art = Queue()
+    driver = attach_watchdog(webdriver.Chrome(options=options), SITE)
+    candidates = []
     try:
-        print(f"\n{'=' * 60}")
-        print(f"📰 Catégorie : {category.upper()}")
-        print(f"{'=' * 60}")
-        print(f"Chargement de {url}")
+        log.info(f"\n{'=' * 60}")
+        log.info(f"📰 Catégorie : {category.upper()}")
+        log.info(f"{'=' * 60}")
+        log.info(f"Chargement de {url}")
         driver.get(url)
         accept_cookies_24heures(driver)
         save_cookies(driver, f"24heures-session_cookies_{category}.pkl")
@@ -37,25 +46,25 @@ def scrape_articles_from_category(url, category):
 
         # Extraire TOUS les liens d'articles
         elements = driver.find_elements(By.CLASS_NAME, "Teaser_link__aPG04")
-        print(f"→ {len(elements)} articles trouvés dans {category}")
+        log.info(f"→ {len(elements)} articles trouvés dans {category}")
 
-        seen_urls = set()
         for index, elem in enumerate(elements, 1):
             try:
                 title = "Art_number" + str(index)# elem.text.strip()
                 href = elem.get_attribute("href")
                 if href and not href.startswith("http"):
                     href = "https://www.24heures.ch" + href
-                if title and href and len(title) > 10 and href not in seen_urls:
-                    seen_urls.add(href)
-                    queue_art.put({"title": title, "url": href})
+                if title and href and len(title) > 10 and claim(get_id(href)):
+                    candidates.append({"title": title, "url": href, "art_date": teaser_date(elem)})
             except Exception:
                 continue
-        print(f"→ {queue_art.qsize()} articles uniques à traiter\n")
+        # Les articles les plus prometteurs d'abord
+        queue_art = build_frontier(SITE, candidates, None)
+        log.info(f"→ {queue_art.qsize()} articles uniques à traiter\n")
         return queue_art
     except Exception as e:
-        print(f"❌ Erreur lors du scraping de {category} : {e}")
-        print(e)
+        log.error(f"❌ Erreur lors du scraping de {category} : {e}")
+        log.info(e)
         return None
     finally:
         try:
@@ -65,9 +74,9 @@ def scrape_articles_from_category(url, category):
 
 def recreate_driver(cat):
     """Recrée un driver Chrome propre"""
-    print(f"\n🔄 Recréation du driver Chrome...")
+    log.info(f"\n🔄 Recréation du driver Chrome...")
     options, service = get_driver_requirements()
-    driver = webdriver.Chrome(options=options)
+    driver = attach_watchdog(webdriver.Chrome(options=options), SITE)
     # ✅ Configurer les timeouts
     driver.set_page_load_timeout(90)
     driver.implicitly_wait(10)
@@ -76,16 +85,18 @@ def recreate_driver(cat):
         accept_cookies_24heures(driver)
         save_cookies(driver, f"24heures-session_cookies_{cat}.pkl")
     except Exception as e:
-        print(f"⚠️ Erreur lors de l'initialisation du driver : {e}")
-    print("✓ Driver recréé\n")
+        log.warning(f"⚠️ Erreur lors de l'initialisation du driver : {e}")
+    log.info("✓ Driver recréé\n")
     return driver
 
 
 def worker_thread(article_queue, cat):
+    set_context(categorie=cat)
     driver = recreate_driver(cat)
     cpt = 0
     processed = 0
     failed = 0
+    retried = 0
     consecutive_errors = 0  # ✅ Compteur d'erreurs consécutives
     while True:
         try:
@@ -93,37 +104,69 @@ def worker_thread(article_queue, cat):
             if article is None:
                 article_queue.task_done()
                 break
+            # Article relancé dont le backoff n'est pas écoulé : remis en fin de file
+            if not is_due(article_queue, article):
+                article_queue.task_done()
+                continue
             try:
-                print(
+                set_context(art_id=get_id(article.get('url')))
+                log.info(
                     f"[{processed + failed + 1}/{article_queue.qsize() + processed + failed + 1}] Traitement : {article.get('url')}")
                 scrap_article(driver, article.get('url'), cat)
                 processed += 1
                 consecutive_errors = 0  # Reset le compteur en cas de succès
+                profile_tick(driver, SITE, cat)
                 # Petite pause entre articles
                 sleep(2)
+            except DriverHangError as e:
+                # Navigateur bloqué et tué par le watchdog → recréer le driver
+                log.warning(f"  ⚠️ {e}, recréation du driver...")
+
+                try:
+                    driver.quit()
+                except:
+                    pass
+
+                driver = recreate_driver(cat)
+                if handle_failure(article_queue, article, e, None, SITE, cat) == "retry":
+                    retried += 1
+                else:
+                    failed += 1
+                consecutive_errors += 1
+
             except InvalidSessionIdException as e:
                 # Session perdue → recréer le driver immédiatement
-                print(f"  ⚠️ Session driver perdue, recréation...")
+                log.warning(f"  ⚠️ Session driver perdue, recréation...")
                 try:
                     driver.quit()
                 except:
                     pass
                 driver = recreate_driver(cat)
-                failed += 1
+                # Session perdue : la page courante n'est plus accessible
+                if handle_failure(article_queue, article, e, None, SITE, cat) == "retry":
+                    retried += 1
+                else:
+                    failed += 1
                 consecutive_errors += 1
             except (TimeoutException, WebDriverException) as e:
-                print(f"  ❌ Erreur driver/timeout : {e}")
-                failed += 1
+                log.error(f"  ❌ Erreur driver/timeout : {e}")
+                if handle_failure(article_queue, article, e, driver, SITE, cat) == "retry":
+                    retried += 1
+                else:
+                    failed += 1
                 consecutive_errors += 1
             except Exception as e:
-                print(f"  ❌ Erreur : {e}")
-                failed += 1
+                log.error(f"  ❌ Erreur : {e}")
+                if handle_failure(article_queue, article, e, driver, SITE, cat) == "retry":
+                    retried += 1
+                else:
+                    failed += 1
                 consecutive_errors += 1
             article_queue.task_done()
             cpt += 1
             # ✅ Si trop d'erreurs consécutives → recréer le driver
             if consecutive_errors >= 3:
-                print(f"\n⚠️ 3 erreurs consécutives détectées, recréation du driver...")
+                log.warning(f"\n⚠️ 3 erreurs consécutives détectées, recréation du driver...")
                 # Flush avant de recréer
                 flush_article_batch()
                 flush_comment_batch()
@@ -139,15 +182,15 @@ def worker_thread(article_queue, cat):
                 consecutive_errors = 0
             # ✅ Checkpoint tous les 10 articles
             if cpt % 10 == 0:
-                print(f"\n💾 Checkpoint - Sauvegarde (après {cpt} articles)")
+                log.info(f"\n💾 Checkpoint - Sauvegarde (après {cpt} articles)")
                 flush_article_batch()
                 flush_comment_batch()
                 conn = get_connection()
                 conn.commit()
-                print("✓ Données sauvegardées\n")
+                log.info("✓ Données sauvegardées\n")
             # ✅ Réinitialisation périodique tous les 20 articles
             if cpt % 20 == 0:
-                print(f"\n⏸️ Pause - Réinitialisation du driver (après {cpt} articles)")
+                log.info(f"\n⏸️ Pause - Réinitialisation du driver (après {cpt} articles)")
                 # Flush avant de fermer
                 flush_article_batch()
                 flush_comment_batch()
@@ -160,12 +203,12 @@ def worker_thread(article_queue, cat):
                     pass
                 sleep(15)  # Pause plus longue
                 driver = recreate_driver(cat)
-                print("▶️ Reprise du scraping\n")
+                log.info("▶️ Reprise du scraping\n")
         except Exception as e:
-            print(f"❌ Erreur fatale dans worker_thread : {e}")
+            log.error(f"❌ Erreur fatale dans worker_thread : {e}")
             break
     # ✅ Nettoyage final
-    print("\n💾 Sauvegarde finale...")
+    log.info("\n💾 Sauvegarde finale...")
     flush_article_batch()
     flush_comment_batch()
     try:
@@ -177,31 +220,32 @@ def worker_thread(article_queue, cat):
         driver.quit()
     except:
         pass
-    print(f"\n📊 Résumé {cat} :")
-    print(f"  ✓ Succès : {processed}")
-    print(f"  ✗ Échecs : {failed}")
-    print(f"  Total : {processed + failed}")
+    log.info(f"\n📊 Résumé {cat} :")
+    log.info(f"  ✓ Succès : {processed}")
+    log.info(f"  ✗ Échecs : {failed}")
+    log.info(f"  ↻ Relances : {retried}")
+    log.info(f"  Total : {processed + failed}")
 
 def scrap_categories(URLS):
-    print("\n" + "=" * 60)
-    print("🚀 DÉBUT DU SCRAPING")
-    print("=" * 60)
+    log.info("\n" + "=" * 60)
+    log.info("🚀 DÉBUT DU SCRAPING")
+    log.info("=" * 60)
     for category, url in URLS.items():
         res_articles = scrape_articles_from_category(url, category)
         if res_articles and not res_articles.empty():
             worker_thread(res_articles, category)
             # ✅ Flush final après chaque catégorie
-            print(f"\n💾 Finalisation de la catégorie {category}...")
+            log.info(f"\n💾 Finalisation de la catégorie {category}...")
             flush_article_batch()
             flush_comment_batch()
             try:
                 conn = get_connection()
                 conn.commit()
-                print(f"✓ Catégorie {category} sauvegardée\n")
+                log.info(f"✓ Catégorie {category} sauvegardée\n")
             except Exception as e:
-                print(f"⚠️ Erreur commit : {e}")
+                log.warning(f"⚠️ Erreur commit : {e}")
         else:
-            print(f"⚠️ Aucun article trouvé pour {category}\n")
-    print("\n" + "=" * 60)
-    print("✅ SCRAPING TERMINÉ")
-    print("=" * 60)
\ No newline at end of file
+            log.warning(f"⚠️ Aucun article trouvé pour {category}\n")
+    log.info("\n" + "=" * 60)
+    log.info("✅ SCRAPING TERMINÉ")
+    log.info("=" * 60)
\ No newline at end of file
@@ -4,13 +4,21 @@ from typing import List, Tuple
 from selenium.common.exceptions import (NoSuchElementException, StaleElementReferenceException, WebDriverException)
 from selenium.webdriver.common.by import By
 
-from scraper.dbConfig import get_connection
-from scraper.utils import hash_md5, sauvegarder_page_avec_modal_pdf
+from scraper.dbConfig import get_connection, synchronized
+from scraper import spool
+from scraper.lease import heartbeat
+from scraper.fingerprint import JS_TEXT, comments_fingerprint, is_unchanged, save_fingerprint
+from scraper.warc import archive_page
+from scraper.utils import hash_md5, sauvegarder_page
+from scraper.crawl_log import get_logger
+
+log = get_logger(__name__, site="24heures.ch")
 
 # ✅ BATCH POUR COMMENTAIRES
 _comment_batch = []
 COMMENT_BATCH_SIZE = 20
 
+@synchronized
 def save_comment(art_id, com_id, com_author, com_content, com_ref_id=None):
     """Sauvegarde en batch (commentaire ou réponse)"""
     global _comment_batch
@@ -22,11 +30,13 @@ def save_comment(art_id, com_id, com_author, com_content, com_ref_id=None):
         art_id,
         com_ref_id
     ))
+    spool.append("commentaire", _comment_batch[-1])
 
     # Flush quand le batch est plein
     if len(_comment_batch) >= COMMENT_BATCH_SIZE:
         flush_comment_batch()
 
+@synchronized
 def flush_comment_batch():
     """Insère tous les commentaires en attente"""
     global _comment_batch
@@ -34,6 +44,8 @@ def flush_comment_batch():
     if not _comment_batch:
         return
 
+    # Les commentaires sont déjà dans le spool : on le rend durable avant d'écrire en base
+    spool.sync()
     conn = get_connection()
 
     try:
@@ -44,11 +56,12 @@ def flush_comment_batch():
             VALUES (?, ?, ?, ?, ?)
                          """, _comment_batch)
         conn.commit()
-        print(f"    ✓ {len(_comment_batch)} commentaire(s) insérés en batch")
+        log.info(f"    ✓ {len(_comment_batch)} commentaire(s) insérés en batch", extra={"nb": len(_comment_batch)})
         _comment_batch = []
 
     except Exception as e:
-        print(f"    ❌ Erreur batch commentaires: {e}")
+        log.error(f"    ❌ Erreur batch commentaires: {e}")
+        log.warning(f"    ↪ {len(_comment_batch)} commentaire(s) conservés dans le spool, rejoués au prochain démarrage")
         conn.rollback()
         _comment_batch = []
 
@@ -57,7 +70,7 @@ def get_all_comments(dr) -> List:
         comments = dr.find_elements(By.CSS_SELECTOR,"ul.comment-list > section.CommentItem_root__C_rfr")
         return comments
     except Exception as e:
-        print(e)
+        log.warning(f"  ⚠️ Erreur lecture des commentaires : {e}")
         return []
 
 
@@ -85,11 +98,11 @@ def extract_comment_data(cmt, is_comment = True) -> Tuple[str, str, list]:
 
     return pseudo, contenu, reponses
 
-def process_answers(dr, art_id, com_hash, reponses):
+def process_answers(dr, art_id, com_hash, reponses, pause=time.sleep):
     for index, reponse in enumerate(reponses, 1):
         try:
             dr.execute_script("arguments[0].scrollIntoView({block: 'center'});", reponse)
-            time.sleep(0.3)
+            pause(0.3)
         except Exception:
             continue
         try:
@@ -101,16 +114,17 @@ def process_answers(dr, art_id, com_hash, reponses):
         except Exception:
             continue
 
-def process_comments(dr, art_id) -> Tuple[int, int, int]:
+def process_comments(dr, art_id, pause=time.sleep) -> Tuple[int, int, int]:
     comments = get_all_comments(dr)
     total_comments = len(comments)
     total_replies = 0
     comments_with_replies = 0
     for index, comment in enumerate(comments, 1):
+        heartbeat()
         try:
             try:
                 dr.execute_script("arguments[0].scrollIntoView({block: 'center'});", comment)
-                time.sleep(0.3)
+                pause(0.3)
             except Exception:
                 continue
             try:
@@ -121,7 +135,7 @@ def process_comments(dr, art_id) -> Tuple[int, int, int]:
                 continue
             if len(reponses) > 0:
                 flush_comment_batch()
-                process_answers(dr, art_id, com_hash_id, reponses)
+                process_answers(dr, art_id, com_hash_id, reponses, pause)
                 total_replies += len(reponses)
                 comments_with_replies += 1
         except StaleElementReferenceException:
@@ -135,6 +149,7 @@ def load_all_comments(dr, max_attempts: int = 200, scroll_pause: float = 2.0):
     attempt = 0
     try:
         while attempt < max_attempts:
+            heartbeat()
             bouton = dr.find_element(By.CSS_SELECTOR, "button.Button_-secondary__QOaqE:nth-child(2)")
             dr.execute_script("arguments[0].scrollIntoView({block: 'center'});", bouton)
             time.sleep(scroll_pause)
@@ -144,12 +159,39 @@ def load_all_comments(dr, max_attempts: int = 200, scroll_pause: float = 2.0):
     except WebDriverException:
         return
 
+def get_comment_ids(dr) -> Tuple[List[str], List[List[str]]]:
+    """
+    Identifiants (hash_md5) des commentaires de premier niveau, dans l'ordre de la page, et
+    de leurs réponses (présentes dans le DOM), lus en un seul appel JavaScript.
+    """
+    try:
+        rows = dr.execute_script(JS_TEXT + """
+            const ids = c => [text(c, '.CommentItem_nickname__iDUQA'), text(c, '.CommentItem_text__rsEMC p')];
+            return Array.from(document.querySelectorAll('ul.comment-list > section.CommentItem_root__C_rfr'))
+                .map(c => [ids(c), Array.from(c.querySelectorAll('.CommentItem_root__C_rfr')).map(ids)]);
+        """)
+    except Exception:
+        return [], []
+    return ([hash_md5(pseudo + contenu) for (pseudo, contenu), _ in rows],
+            [[hash_md5(pseudo + contenu) for pseudo, contenu in reponses] for _, reponses in rows])
+
+
 def scrap_comments(driver, art_id):
     load_all_comments(driver)
+    empreinte, nb_commentaires = comments_fingerprint(*get_comment_ids(driver))
+    if is_unchanged(art_id, empreinte, nb_commentaires):
+        log.info(f"    ↺ Fil inchangé ({nb_commentaires} commentaires), capture ignorée")
+        return None, None
     modal_comment = driver.find_element(By.XPATH, "/html/body/div[1]/div/div[5]/div[2]/main/div[3]/div/div[2]/div")
-    pdf_path, pdf_hash = sauvegarder_page_avec_modal_pdf(driver, "24heures-" + art_id + '.pdf', modal_comment)
+    pdf_path, pdf_hash = sauvegarder_page(driver, "24heures-" + art_id, modal_comment)
     total_com, total_rep, com_with_rep = process_comments(driver, art_id)
+    # DOM final (réponses dépliées) : base de la ré-extraction hors ligne
+    archive_page(driver, "commentaires", "24heures.ch", art_id)
     # Flush après chaque article avec commentaires
     flush_comment_batch()
-    print(f"    → {total_com} commentaires, {total_rep} réponses")
+    # Bail repris entre-temps : l'empreinte ne doit pas faire ignorer le fil au nouveau détenteur
+    heartbeat(force=True)
+    save_fingerprint(art_id, empreinte, nb_commentaires)
+    log.info(f"    → {total_com} commentaires, {total_rep} réponses",
+             extra={"art_id": art_id, "nb_commentaires": total_com, "nb_reponses": total_rep})
     return pdf_path, pdf_hash
\ No newline at end of file
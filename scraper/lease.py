@@ -0,0 +1,47 @@
+import threading
+from time import time
+
+from scraper.crawl_log import get_logger
+
+log = get_logger(__name__)
+
+# ✅ BAIL EN COURS : la file partagée (work_queue.WorkQueue) enregistre ici, par thread,
+# l'article dont le worker tient le bail. Les boucles de défilement et de traitement des
+# commentaires appellent heartbeat() pour prolonger ce bail tant que l'article est en cours,
+# et s'arrêtent dès qu'il a été repris par un autre processus.
+HEARTBEAT_INTERVAL = 60   # Intervalle minimal (s) entre deux prolongations du bail
+
+_local = threading.local()
+
+
+class LeaseLostError(Exception):
+    """Le bail de l'article en cours a expiré et a été repris par un autre processus"""
+
+
+def hold(work_queue):
+    """Enregistre la file dont le thread courant tient un bail (appelé par WorkQueue.get)"""
+    _local.queue = work_queue
+    _local.last = time()
+
+
+def release():
+    """Le thread courant ne tient plus de bail (article acquitté, rendu ou abandonné)"""
+    _local.queue = None
+
+
+def heartbeat(force=False):
+    """
+    Prolonge le bail de l'article en cours (au plus une fois par HEARTBEAT_INTERVAL, sauf `force`).
+    Sans bail (file en mémoire, ré-extraction...), ne fait rien.
+
+    Raises:
+        LeaseLostError: le bail n'appartient plus à ce processus
+    """
+    work_queue = getattr(_local, "queue", None)
+    if work_queue is None or (not force and time() - _local.last < HEARTBEAT_INTERVAL):
+        return
+    _local.last = time()
+    art_id = work_queue.current["art_id"] if work_queue.current else None
+    if art_id is not None and not work_queue.renew(art_id):
+        release()
+        raise LeaseLostError(f"Bail perdu pour {art_id}")
@@ -4,14 +4,22 @@ from typing import List, Tuple
 from selenium.common.exceptions import (NoSuchElementException, StaleElementReferenceException, WebDriverException)
 from selenium.webdriver.common.by import By
 
-from scraper.dbConfig import get_connection
-from scraper.utils import hash_md5, sauvegarder_page_pdf
+from scraper.dbConfig import get_connection, synchronized
+from scraper import spool
+from scraper.lease import heartbeat
+from scraper.fingerprint import JS_TEXT, comments_fingerprint, is_unchanged, save_fingerprint
+from scraper.warc import archive_page
+from scraper.utils import hash_md5, sauvegarder_page
+from scraper.crawl_log import get_logger
+
+log = get_logger(__name__, site="lematin.ch/")
 
 # ✅ BATCH POUR COMMENTAIRES
 _comment_batch = []
 COMMENT_BATCH_SIZE = 20
 
 
+@synchronized
 def save_comment(art_id, com_id, com_author, com_content, com_ref_id=None):
     """Sauvegarde en batch (commentaire ou réponse)"""
     global _comment_batch
@@ -22,15 +30,19 @@ def save_comment(art_id, com_id, com_author, com_content, com_ref_id=None):
         art_id,
         com_ref_id
     ))
+    spool.append("commentaire", _comment_batch[-1])
     # Flush quand le batch est plein
     if len(_comment_batch) >= COMMENT_BATCH_SIZE:
         flush_comment_batch()
 
+@synchronized
 def flush_comment_batch():
     """Insère tous les commentaires en attente"""
     global _comment_batch
     if not _comment_batch:
         return
+    # Les commentaires sont déjà dans le spool : on le rend durable avant d'écrire en base
+    spool.sync()
     conn = get_connection()
     try:
         conn.executemany("""
@@ -40,10 +52,11 @@ def flush_comment_batch():
             VALUES (?, ?, ?, ?, ?)
                          """, _comment_batch)
         conn.commit()
-        print(f"    ✓ {len(_comment_batch)} commentaire(s) insérés en batch")
+        log.info(f"    ✓ {len(_comment_batch)} commentaire(s) insérés en batch", extra={"nb": len(_comment_batch)})
         _comment_batch = []
     except Exception as e:
-        print(f"    ❌ Erreur batch commentaires: {e}")
+        log.error(f"    ❌ Erreur batch commentaires: {e}")
+        log.warning(f"    ↪ {len(_comment_batch)} commentaire(s) conservés dans le spool, rejoués au prochain démarrage")
         conn.rollback()
         _comment_batch = []
 
@@ -70,7 +83,7 @@ def extract_comment_data(article) -> Tuple[str, str]:
         pass
     return pseudo, contenu
 
-def process_answers(dr, art_id, comment, hash_comment):
+def process_answers(dr, art_id, comment, hash_comment, pause=time.sleep):
     try:
         answers = comment.find_elements(By.CSS_SELECTOR, ".sc-12787c8d-3.beRDi")
     except:
@@ -81,7 +94,7 @@ def process_answers(dr, art_id, comment, hash_comment):
         try:
             try:
                 dr.execute_script("arguments[0].scrollIntoView({block: 'center'});", answer)
-                time.sleep(0.3)
+                pause(0.3)
             except Exception:
                 continue
             try:
@@ -97,16 +110,17 @@ def process_answers(dr, art_id, comment, hash_comment):
             continue
     return True, len(answers)
 
-def process_comments(dr, art_id) -> Tuple[int, int, int]:
+def process_comments(dr, art_id, pause=time.sleep) -> Tuple[int, int, int]:
     comments = get_all_comments(dr)
     total_comments = len(comments)
     total_replies = 0
     comments_with_replies = 0
     for index, commentaire in enumerate(comments, 1):
+        heartbeat()
         try:
             try:
                 dr.execute_script("arguments[0].scrollIntoView({block: 'center'});", commentaire)
-                time.sleep(0.3)
+                pause(0.3)
             except Exception:
                 continue
             try:
@@ -114,7 +128,7 @@ def process_comments(dr, art_id) -> Tuple[int, int, int]:
                 com_hash_id = hash_md5(pseudo + contenu)
                 # print("Commentaire: ", art_id, com_hash_id, pseudo, contenu)
                 save_comment(art_id, com_hash_id, pseudo, contenu)
-                has_answers, num_replies = process_answers(dr, art_id, commentaire, com_hash_id)
+                has_answers, num_replies = process_answers(dr, art_id, commentaire, com_hash_id, pause)
                 if has_answers and num_replies > 0:
                     flush_comment_batch()
                     total_replies += num_replies
@@ -133,6 +147,7 @@ def load_all_articles(dr, max_attempts: int = 200, scroll_pause: float = 2.0):
     attempt = 0
     try:
         while attempt < max_attempts:
+            heartbeat()
             dr.execute_script("window.scrollTo(0, document.body.scrollHeight);")
             time.sleep(scroll_pause)
             current_count = len(get_all_comments(dr))
@@ -149,12 +164,39 @@ def load_all_articles(dr, max_attempts: int = 200, scroll_pause: float = 2.0):
         return previous_count
 
 
+def get_comment_ids(dr) -> Tuple[List[str], List[List[str]]]:
+    """
+    Identifiants (hash_md5) des commentaires de premier niveau, dans l'ordre de la page, et
+    de leurs réponses (présentes dans le DOM), lus en un seul appel JavaScript.
+    """
+    try:
+        rows = dr.execute_script(JS_TEXT + """
+            const ids = c => [text(c, '.sc-12787c8d-8.jjVQBd'), text(c, '.sc-12787c8d-11.jrZiNw')];
+            return Array.from(document.querySelectorAll('.sc-12787c8d-3.hxavaW'))
+                .map(c => [ids(c), Array.from(c.querySelectorAll('.sc-12787c8d-3.beRDi')).map(ids)]);
+        """)
+    except Exception:
+        return [], []
+    return ([hash_md5(pseudo + contenu) for (pseudo, contenu), _ in rows],
+            [[hash_md5(pseudo + contenu) for pseudo, contenu in reponses] for _, reponses in rows])
+
+
 def scrap_comments(driver, art_id, art_comments_url):
     driver.get(art_comments_url)
     load_all_articles(driver)
-    pdf_path, pdf_hash = sauvegarder_page_pdf(driver, "lematin-" + art_id + '.pdf')
+    empreinte, nb_commentaires = comments_fingerprint(*get_comment_ids(driver))
+    if is_unchanged(art_id, empreinte, nb_commentaires):
+        log.info(f"    ↺ Fil inchangé ({nb_commentaires} commentaires), capture ignorée")
+        return None, None
+    pdf_path, pdf_hash = sauvegarder_page(driver, "lematin-" + art_id)
     total_com, total_rep, com_with_rep = process_comments(driver, art_id)
+    # DOM final (réponses dépliées) : base de la ré-extraction hors ligne
+    archive_page(driver, "commentaires", "lematin.ch/", art_id)
     # Flush après chaque article avec commentaires
     flush_comment_batch()
-    print(f"    → {total_com} commentaires, {total_rep} réponses")
+    # Bail repris entre-temps : l'empreinte ne doit pas faire ignorer le fil au nouveau détenteur
+    heartbeat(force=True)
+    save_fingerprint(art_id, empreinte, nb_commentaires)
+    log.info(f"    → {total_com} commentaires, {total_rep} réponses",
+             extra={"art_id": art_id, "nb_commentaires": total_com, "nb_reponses": total_rep})
     return pdf_path, pdf_hash
\ No newline at end of file
@@ -1,7 +1,16 @@
-from dbConfig import get_connection, close_connection
+import sys
+
+from scraper.dbConfig import get_connection, close_connection
+from db_manager.migrations import migrate
 from le20minutes.minutes_main import start_scraping as start_scraping_minutes
 from lematin.matin_main import start_scraping as start_scraping_matin
 from le24heures.heures_main import start_scraping as start_scraping_heures
+from scraper.cdp_pool import start_scraping_cdp
+from scraper.revisit import run_revisit_daemon
+from scraper import profiling, warc
+from scraper.crawl_log import configure_logging, stop_logging
+from scraper.spool import replay_spool, close_spool
+from scraper.work_queue import start_scraping_queue
 
 def init_database():
     """Initialise la base de données SQLite"""
@@ -9,13 +18,9 @@ def init_database():
     try:
         conn = get_connection()
         cursor = conn.cursor()
-        # Lire et exécuter le schéma SQL
-        with open('db_schema.sql', 'r', encoding='utf-8') as f:
-            sql_script = f.read()
-            # SQLite supporte executescript !
-            cursor.executescript(sql_script)
-        conn.commit()
-        print("✓ Tables et index créés avec succès\n")
+        # Schéma complet (base neuve) ou migrations manquantes (base existante)
+        version = migrate(conn)
+        print(f"✓ Schéma à jour (version {version})\n")
         # Afficher les statistiques existantes
         cursor.execute("SELECT COUNT(*) FROM UNIL_Article")
         nb_articles = cursor.fetchone()[0]
@@ -31,16 +36,37 @@ def init_database():
         return False
 
 if __name__ == '__main__':
-    # sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
-    # sys.stdout = open('logs.txt', 'w')
+    # Journalisation : console (sauf --quiet) + logs/crawl-<date>-<pid>.jsonl
+    configure_logging(console="--quiet" not in sys.argv)
     # Initialiser la base de données
     if not init_database():
         print("❌ Impossible de démarrer le scraping")
         exit(1)
     try:
-        start_scraping_minutes()
-        start_scraping_matin()
-        start_scraping_heures()
+        # Recharger en base ce qui n'a pas pu y être écrit lors des exécutions précédentes
+        replay_spool()
+        # Archivage WARC des réponses brutes et du DOM (ré-extraction hors ligne : scraper/reextract.py)
+        warc.ARCHIVE_WARC = "--warc" in sys.argv
+        # Profilage mémoire / ressources (rapport de croissance en fin d'exécution)
+        if "--profile" in sys.argv:
+            profiling.enable()
+        if "--replay" in sys.argv:
+            # Rejeu du spool uniquement
+            pass
+        elif "--revisit" in sys.argv:
+            # Mode démon : re-visite continue des fils de commentaires actifs
+            run_revisit_daemon()
+        elif "--cdp" in sys.argv:
+            # Mode CDP : plusieurs onglets par processus Chrome, pilotés sans Selenium
+            start_scraping_cdp()
+        elif "--queue" in sys.argv:
+            # Mode file partagée : lancer autant de processus que souhaité sur la même base
+            # (--worker-only : ne pas re-lister les catégories, seulement consommer la file)
+            start_scraping_queue(lister="--worker-only" not in sys.argv)
+        else:
+            start_scraping_minutes()
+            start_scraping_matin()
+            start_scraping_heures()
     except KeyboardInterrupt:
         print("\n\n⚠️ Interruption utilisateur détectée")
     except Exception as e:
@@ -50,6 +76,11 @@ if __name__ == '__main__':
     finally:
         # ✅ CRITIQUE : Flush tous les batchs restants
         print("\n💾 Sauvegarde des données restantes...")
+        close_spool()
+        warc.close_warc()
+        if profiling.PROFILING:
+            profiling.leak_report(profiling.RUN_ID)
         # Fermer proprement la connexion
         close_connection()
-        print("\n✅ Programme terminé proprement")
\ No newline at end of file
+        print("\n✅ Programme terminé proprement")
+        stop_logging()
\ No newline at end of file
@@ -0,0 +1,31 @@
+import json
+from datetime import datetime
+
+from scraper.dbConfig import get_connection, synchronized
+from scraper.crawl_log import get_logger
+
+log = get_logger(__name__)
+
+
+@synchronized
+def record_metric(met_type, site=None, valeur=None, **details):
+    """
+    Enregistre une métrique de crawl dans UNIL_Crawl_Metrique.
+
+    Args:
+        met_type: Type de métrique (ex: "blocage_driver")
+        site: Journal concerné (art_nom_journal)
+        valeur: Valeur numérique principale
+        **details: Informations complémentaires, stockées en JSON
+    """
+    conn = get_connection()
+    try:
+        conn.execute("""
+                     INSERT INTO UNIL_Crawl_Metrique (met_type, met_site, met_valeur, met_details, met_date)
+                     VALUES (?, ?, ?, ?, ?)
+                     """, (met_type, site, valeur, json.dumps(details, ensure_ascii=False) if details else None,
+                           str(datetime.now())))
+        conn.commit()
+    except Exception as e:
+        log.warning(f"  ⚠️ Erreur enregistrement métrique {met_type}: {e}")
+        conn.rollback()
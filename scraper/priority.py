@@ -0,0 +1,141 @@
+import heapq
+import itertools
+import math
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from queue import Empty, PriorityQueue
+from time import time
+
+from selenium.webdriver.common.by import By
+
+from scraper.utils import normalize_date
+
+# ✅ FRONTIÈRE PRIORISÉE : les articles les plus prometteurs (section commentaires ouverte,
+# récents) sont traités en premier, les pages sans commentaires en dernier.
+PRIORITY_WEIGHTS = {
+    "commentaires_actifs": 100.0,  # Sonde de la section commentaires (+ si ouverte, - si fermée)
+    "recence": 50.0,               # Bonus maximal pour un article publié à l'instant
+}
+RECENCY_HALF_LIFE_HOURS = 24       # Le bonus de récence est divisé par 2 toutes les N heures
+
+SITE_WEIGHTS = {
+    "20min.ch/fr": 1.0,
+    "24heures.ch": 1.0,
+    "lematin.ch/": 1.0,
+}
+
+PROBE_COMMENTS = True   # Sonder la section commentaires (requête HTTP, sans navigateur)
+PROBE_WORKERS = 8
+
+
+class PriorityFrontier(PriorityQueue):
+    """
+    File à priorité avec l'interface de queue.Queue : put/get manipulent directement
+    les dictionnaires d'articles, triés par article["priorite"] décroissante
+    (ordre du DOM conservé à priorité égale).
+
+    Les articles relancés (article["disponible_apres"] dans le futur) attendent dans un
+    second tas trié par échéance : get() ne rend que des articles disponibles et, s'il ne
+    reste que des articles en backoff, attend la prochaine échéance au lieu de les faire
+    tourner (ils ne passent donc jamais devant un article déjà disponible).
+    """
+
+    def _init(self, maxsize):
+        super()._init(maxsize)
+        self._counter = itertools.count()
+        self._delayed = []
+
+    def _qsize(self):
+        return len(self.queue) + len(self._delayed)
+
+    def _put(self, article):
+        if article.get("disponible_apres", 0) > time():
+            heapq.heappush(self._delayed, (article["disponible_apres"], next(self._counter), article))
+        else:
+            heapq.heappush(self.queue, (-article.get("priorite", 0), next(self._counter), article))
+
+    def _promote(self):
+        """Fait passer les articles dont le backoff est écoulé dans la file à priorité"""
+        now = time()
+        while self._delayed and self._delayed[0][0] <= now:
+            article = heapq.heappop(self._delayed)[2]
+            heapq.heappush(self.queue, (-article.get("priorite", 0), next(self._counter), article))
+
+    def get(self, block=True, timeout=None):
+        """
+        Comme queue.Queue.get, mais seuls les articles disponibles sont rendus. Le délai
+        `timeout` ne s'applique qu'à une file vide : des articles en backoff sont attendus.
+        """
+        deadline = None if timeout is None else time() + timeout
+        with self.not_empty:
+            while True:
+                self._promote()
+                if self.queue:
+                    article = heapq.heappop(self.queue)[2]
+                    self.not_full.notify()
+                    return article
+                if not block:
+                    raise Empty
+                if self._delayed:
+                    # Réveil à la prochaine échéance, ou plus tôt si un article est ajouté
+                    self.not_empty.wait(self._delayed[0][0] - time())
+                    continue
+                remaining = None if deadline is None else deadline - time()
+                if remaining is not None and remaining <= 0:
+                    raise Empty
+                self.not_empty.wait(remaining)
+
+
+def teaser_date(elem):
+    """Extrait du teaser de la page catégorie la date de publication (None si absente)"""
+    try:
+        return normalize_date(elem.find_element(By.CSS_SELECTOR, "time[datetime]").get_attribute("datetime"))
+    except Exception:
+        return None
+
+
+def score_article(site, has_comments=None, art_date=None):
+    """
+    Calcule la priorité d'un article à partir des signaux disponibles (None = inconnu).
+
+    Le poids du site ne multiplie que les signaux positifs : augmenter le poids d'un site
+    avance ses articles prometteurs sans repousser davantage ses articles sans commentaires.
+    """
+    bonus = 0.0
+    penalty = 0.0
+    if has_comments is not None:
+        if has_comments:
+            bonus += PRIORITY_WEIGHTS["commentaires_actifs"]
+        else:
+            penalty += PRIORITY_WEIGHTS["commentaires_actifs"]
+    if art_date:
+        try:
+            age_hours = max((datetime.now() - datetime.strptime(art_date, "%Y-%m-%d %H:%M:%S")).total_seconds() / 3600, 0)
+            bonus += PRIORITY_WEIGHTS["recence"] * math.pow(0.5, age_hours / RECENCY_HALF_LIFE_HOURS)
+        except ValueError:
+            pass
+    return bonus * SITE_WEIGHTS.get(site, 1.0) - penalty
+
+
+def build_frontier(site, candidates, probe=None):
+    """
+    Construit la frontière priorisée d'une catégorie.
+
+    Args:
+        site: Clé du site (art_nom_journal)
+        candidates: Liste de dicts {"title", "url", "art_date"}
+        probe: Fonction url -> bool sondant la section commentaires (None si indisponible)
+
+    Returns:
+        PriorityFrontier
+    """
+    probes = [None] * len(candidates)
+    if probe is not None and PROBE_COMMENTS and candidates:
+        with ThreadPoolExecutor(max_workers=PROBE_WORKERS) as executor:
+            probes = list(executor.map(lambda c: probe(c["url"]), candidates))
+
+    frontier = PriorityFrontier()
+    for candidate, has_comments in zip(candidates, probes):
+        candidate["priorite"] = score_article(site, has_comments, candidate.get("art_date"))
+        frontier.put(candidate)
+    return frontier
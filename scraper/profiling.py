@@ -0,0 +1,256 @@
+import itertools
+import json
+import os
+import sys
+import threading
+import tracemalloc
+from datetime import datetime
+
+from scraper.crawl_log import get_logger
+from scraper.dbConfig import get_read_connection, close_connection
+from scraper.metrics import record_metric
+
+log = get_logger(__name__)
+
+# ✅ PROFILAGE DES LONGS CRAWLS (main.py --profile) : tous les PROFILE_EVERY articles,
+# échantillonne le tas Python (tracemalloc), la mémoire (RSS) et les fichiers ouverts
+# de Chrome, et les enregistre dans UNIL_Crawl_Metrique. leak_report() calcule ensuite
+# la tendance de croissance par article et en déduit un seuil de recyclage du driver.
+# Chaque échantillon porte l'identifiant de l'exécution (RUN_ID) : les compteurs repartent
+# de zéro à chaque lancement, les exécutions ne sont donc jamais mélangées.
+PROFILING = False
+RUN_ID = None
+PROFILE_EVERY = 10            # Échantillon tous les N articles
+TRACEMALLOC_TOP = 10          # Nombre d'allocateurs retenus par échantillon
+TRACEMALLOC_FRAMES = 1
+
+# Croissance (par 100 articles) au-delà de laquelle une fuite est signalée
+LEAK_THRESHOLDS = {
+    "profil_tas_python": 5.0,          # Mo
+    "profil_chrome_rss": 50.0,         # Mo
+    "profil_chrome_fichiers": 20.0,    # descripteurs
+    "profil_python_fichiers": 5.0,     # descripteurs
+}
+CHROME_RSS_BUDGET_MB = 1500   # Mémoire Chrome tolérée avant recyclage du driver
+
+_profilers = {}
+_profilers_lock = threading.Lock()
+_sessions = itertools.count(1)  # Numéro de session Chrome, unique dans l'exécution
+
+
+def enable():
+    """Active le profilage (à appeler avant le démarrage du crawl)"""
+    global PROFILING, RUN_ID
+    PROFILING = True
+    RUN_ID = f"{datetime.now().strftime('%Y%m%d%H%M%S')}-{os.getpid()}"
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(TRACEMALLOC_FRAMES)
+    log.info(f"🔬 Profilage activé (échantillon tous les {PROFILE_EVERY} articles)")
+
+
+def _process_tree(pid):
+    """PID d'un processus et de tous ses descendants (psutil si disponible, sinon /proc)"""
+    try:
+        import psutil
+        try:
+            parent = psutil.Process(pid)
+            return [pid] + [child.pid for child in parent.children(recursive=True)]
+        except psutil.NoSuchProcess:
+            return []
+    except ImportError:
+        pass
+
+    pids, pending = [], [pid]
+    while pending:
+        current = pending.pop()
+        if not os.path.exists(f"/proc/{current}"):
+            continue
+        pids.append(current)
+        try:
+            for task in os.listdir(f"/proc/{current}/task"):
+                with open(f"/proc/{current}/task/{task}/children") as f:
+                    pending.extend(int(child) for child in f.read().split())
+        except OSError:
+            pass
+    return pids
+
+
+def _rss_mb(pid):
+    try:
+        import psutil
+        return psutil.Process(pid).memory_info().rss / 1024 ** 2
+    except ImportError:
+        pass
+    except Exception:
+        return 0.0
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return 0.0
+
+
+def _open_files(pid):
+    try:
+        return len(os.listdir(f"/proc/{pid}/fd"))
+    except OSError:
+        pass
+    try:
+        import psutil
+        return psutil.Process(pid).num_fds()
+    except Exception:
+        return 0
+
+
+class CrawlProfiler:
+    """Échantillonneur de ressources d'un site (un driver à la fois)"""
+
+    def __init__(self, site, every=PROFILE_EVERY):
+        self.site = site
+        self.every = every
+        self.articles = 0           # Articles traités depuis le début du crawl (tous threads du site)
+        self._lock = threading.Lock()
+
+    def tick(self, driver, categorie=None):
+        """Compte un article traité ; échantillonne tous les `every` articles"""
+        with self._lock:
+            # Session et compteur portés par le driver : un driver recréé (recyclage) ouvre une
+            # nouvelle session, même s'il réutilise l'adresse mémoire (id()) de l'ancien
+            if getattr(driver, "_profil_session", None) is None:
+                driver._profil_session = next(_sessions)
+                driver._profil_articles = 0
+            driver._profil_articles += 1
+            self.articles += 1
+            articles = self.articles
+        if articles % self.every == 0:
+            self.sample(driver, categorie, articles)
+
+    def sample(self, driver, categorie=None, articles=None):
+        details = {"run": RUN_ID, "articles": articles or self.articles,
+                   "session": driver._profil_session, "articles_session": driver._profil_articles,
+                   "categorie": categorie}
+
+        # Tas Python : volume total et principaux allocateurs
+        current, peak = tracemalloc.get_traced_memory()
+        top = [{"ligne": str(stat.traceback), "ko": round(stat.size / 1024, 1), "blocs": stat.count}
+               for stat in tracemalloc.take_snapshot().statistics("lineno")[:TRACEMALLOC_TOP]]
+        record_metric("profil_tas_python", self.site, current / 1024 ** 2, pic_mo=peak / 1024 ** 2,
+                      top=top, **details)
+        record_metric("profil_python_fichiers", self.site, _open_files(os.getpid()), **details)
+
+        # Chrome : chromedriver et tous ses processus enfants
+        process = getattr(getattr(driver, "service", None), "process", None)
+        if process is not None:
+            pids = _process_tree(process.pid)
+            rss = sum(_rss_mb(pid) for pid in pids)
+            record_metric("profil_chrome_rss", self.site, rss, processus=len(pids), **details)
+            record_metric("profil_chrome_fichiers", self.site, sum(_open_files(pid) for pid in pids), **details)
+            log.info(f"  🔬 Profil ({details['articles']} articles) : tas Python {current / 1024 ** 2:.1f} Mo, "
+                     f"Chrome {rss:.0f} Mo sur {len(pids)} processus")
+
+
+def profile_tick(driver, site, categorie=None):
+    """À appeler après chaque article traité (sans effet si le profilage est désactivé)"""
+    if not PROFILING:
+        return
+    with _profilers_lock:
+        if site not in _profilers:
+            _profilers[site] = CrawlProfiler(site)
+    _profilers[site].tick(driver, categorie)
+
+
+def _slope(points):
+    """Pente des moindres carrés de y en fonction de x"""
+    n = len(points)
+    if n < 2:
+        return None
+    mean_x = sum(x for x, _ in points) / n
+    mean_y = sum(y for _, y in points) / n
+    var_x = sum((x - mean_x) ** 2 for x, _ in points)
+    if var_x == 0:
+        return None
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / var_x
+
+
+def _centered(groups):
+    """Points centrés par groupe (exécution ou session) : seule la pente intra-groupe compte"""
+    points = []
+    for group_points in groups.values():
+        mean_x = sum(x for x, _ in group_points) / len(group_points)
+        mean_y = sum(y for _, y in group_points) / len(group_points)
+        points += [(x - mean_x, y - mean_y) for x, y in group_points]
+    return points
+
+
+def leak_report(run=None, since=None):
+    """
+    Rapport de tendance : croissance de chaque ressource par 100 articles, fuites suspectées
+    et seuil de recyclage du driver suggéré.
+
+    Args:
+        run: Identifiant d'exécution (RUN_ID), None pour toutes les exécutions
+        since: Date minimale des échantillons (format SQL), None pour tout l'historique
+
+    Returns:
+        dict {(type, site): croissance par 100 articles}
+    """
+    conn = get_read_connection()
+    rows = conn.execute("""
+                        SELECT met_type, met_site, met_valeur, met_details
+                        FROM UNIL_Crawl_Metrique
+                        WHERE met_type LIKE 'profil_%'
+                          AND (?1 IS NULL OR met_date >= ?1)
+                          AND (?2 IS NULL OR json_extract(met_details, '$.run') = ?2)
+                        ORDER BY met_id
+                        """, (since, run)).fetchall()
+
+    series = {}
+    for met_type, site, valeur, details in rows:
+        details = json.loads(details or "{}")
+        series.setdefault((met_type, site), []).append((details, valeur))
+
+    log.info("\n" + "=" * 60)
+    log.info("🔬 RAPPORT DE CROISSANCE DES RESSOURCES")
+    log.info("=" * 60)
+    trends = {}
+    for (met_type, site), samples in sorted(series.items()):
+        groups = {}
+        if met_type.startswith("profil_chrome"):
+            # Chrome repart de zéro à chaque recyclage : pente intra-session, sessions centrées
+            for details, valeur in samples:
+                groups.setdefault((details.get("run"), details.get("session")), []).append(
+                    (details.get("articles_session", 0), valeur))
+        else:
+            # Les compteurs d'articles repartent de zéro à chaque exécution : exécutions centrées
+            for details, valeur in samples:
+                groups.setdefault(details.get("run"), []).append((details.get("articles", 0), valeur))
+        points = _centered(groups)
+
+        slope = _slope(points)
+        if slope is None:
+            continue
+        growth = slope * 100
+        trends[(met_type, site)] = growth
+        leak = growth > LEAK_THRESHOLDS.get(met_type, float("inf"))
+        (log.warning if leak else log.info)(
+            f"  {'⚠️ FUITE' if leak else '✓'} {site} {met_type} : {growth:+.1f} / 100 articles "
+            f"({len(samples)} échantillons)",
+            extra={"site": site, "metrique": met_type, "croissance": round(growth, 1)})
+
+        if met_type == "profil_chrome_rss" and slope > 0:
+            baseline = min(v for _, v in samples)
+            recycle = int((CHROME_RSS_BUDGET_MB - baseline) / slope)
+            log.info(f"      → Recyclage du driver suggéré tous les {max(recycle, 1)} articles "
+                     f"(budget {CHROME_RSS_BUDGET_MB} Mo)")
+    return trends
+
+
+if __name__ == "__main__":
+    # Usage : python -m scraper.profiling [run_id] (sans argument : toutes les exécutions)
+    try:
+        leak_report(sys.argv[1] if len(sys.argv) > 1 else None)
+    finally:
+        close_connection()
@@ -0,0 +1,252 @@
+import glob
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from urllib.parse import urljoin
+
+from selenium.common.exceptions import NoSuchElementException
+
+from scraper.dbConfig import get_connection, close_connection
+from scraper.crawl_log import configure_logging, get_logger
+from scraper.le20minutes import minutes_article, minutes_comments
+from scraper.le24heures import heures_article, heures_comments
+from scraper.lematin import matin_article, matin_comments
+from scraper.utils import normalize_date
+from scraper.warc import WARC_DIR, read_warc
+
+log = get_logger(__name__)
+
+# ✅ RÉ-EXTRACTION HORS LIGNE : les parseurs des sites (get_title, process_comments...)
+# sont rejoués sur le DOM archivé dans les fichiers WARC, sans navigateur, dans un pool
+# de processus. Utile quand un site change ses classes CSS : on corrige le sélecteur
+# puis on régénère UNIL_Article / UNIL_Commentaire sans re-crawler.
+SITES = {
+    "20min.ch/fr": (minutes_article, minutes_comments),
+    "24heures.ch": (heures_article, heures_comments),
+    "lematin.ch/": (matin_article, matin_comments),
+}
+
+REEXTRACT_WORKERS = os.cpu_count() or 4
+
+_collected_comments = []
+
+
+def _load_html(html):
+    try:
+        import lxml.html
+    except ImportError:
+        raise ImportError("La ré-extraction nécessite lxml et cssselect (pip install lxml cssselect)")
+    root = lxml.html.fromstring(html)
+    # Le texte des scripts et styles n'est pas du texte visible
+    lxml.html.etree.strip_elements(root, "script", "style", "noscript", with_tail=False)
+    return root
+
+
+def _find(node, by, value):
+    if by == "xpath":
+        return [n for n in node.xpath(value) if hasattr(n, "tag")]
+    if by == "css selector":
+        return node.cssselect(value)
+    if by == "class name":
+        return node.cssselect("." + value)
+    if by == "tag name":
+        return list(node.iterdescendants(value))
+    if by == "id":
+        return node.xpath(".//*[@id=$v]", v=value)
+    if by == "name":
+        return node.xpath(".//*[@name=$v]", v=value)
+    raise ValueError(f"Stratégie de recherche non prise en charge : {by}")
+
+
+class StaticElement:
+    """Façade WebElement en lecture seule sur un élément lxml"""
+
+    def __init__(self, driver, node):
+        self._driver = driver
+        self._node = node
+
+    def find_element(self, by, value):
+        return self._driver._first(self._node, by, value)
+
+    def find_elements(self, by, value):
+        return [StaticElement(self._driver, n) for n in _find(self._node, by, value)]
+
+    @property
+    def text(self):
+        lines = (" ".join(line.split()) for line in self._node.text_content().splitlines())
+        return "\n".join(line for line in lines if line)
+
+    def get_attribute(self, name):
+        value = self._node.get(name)
+        if value is not None and name in ("href", "src"):
+            return urljoin(self._driver.current_url, value)
+        return value
+
+    def is_displayed(self):
+        style = (self._node.get("style") or "").replace(" ", "")
+        return self._node.get("hidden") is None and "display:none" not in style
+
+    def is_enabled(self):
+        return self._node.get("disabled") is None
+
+    def click(self):
+        pass  # DOM figé : les réponses ont été dépliées avant l'archivage
+
+
+class StaticDriver:
+    """Façade WebDriver en lecture seule sur un DOM archivé"""
+
+    def __init__(self, html, url):
+        self._root = _load_html(html)
+        self.current_url = url
+
+    def _first(self, node, by, value):
+        found = _find(node, by, value)
+        if not found:
+            raise NoSuchElementException(f"Aucun élément pour {by}={value}")
+        return StaticElement(self, found[0])
+
+    def find_element(self, by, value):
+        return self._first(self._root, by, value)
+
+    def find_elements(self, by, value):
+        return [StaticElement(self, n) for n in _find(self._root, by, value)]
+
+    def execute_script(self, script, *args):
+        return None
+
+    def get(self, url):
+        pass
+
+    def refresh(self):
+        pass
+
+
+def _collect_comment(art_id, com_id, com_author, com_content, com_ref_id=None):
+    _collected_comments.append((com_id, com_author, com_content, art_id, com_ref_id))
+
+
+def _no_pause(seconds):
+    """Les pauses prévues pour le navigateur sont inutiles sur un DOM figé"""
+
+
+def _init_worker():
+    """Initialise un processus de ré-extraction : les parseurs collectent au lieu d'écrire en base"""
+    # Le thread d'écriture des logs du parent n'existe pas dans le processus fils
+    configure_logging(log_file=False)
+    for _, comments_mod in SITES.values():
+        comments_mod.save_comment = _collect_comment
+        comments_mod.flush_comment_batch = lambda: None
+
+
+def _warc_date_to_sql(value):
+    try:
+        return datetime.strptime(value, "%Y-%m-%dT%H:%M:%SZ").strftime("%Y-%m-%d %H:%M:%S")
+    except (TypeError, ValueError):
+        return None
+
+
+def reextract_file(path):
+    """
+    Ré-extrait les articles et commentaires d'un fichier WARC (exécuté dans un processus du pool).
+
+    Returns:
+        Tuple (lignes UNIL_Article, lignes UNIL_Commentaire, nombre d'erreurs)
+    """
+    # Dernier DOM archivé par (site, article, type de page)
+    pages = {}
+    for headers, block in read_warc(path):
+        if headers.get("WARC-Type") != "resource" or "WARC-Scraper-Page" not in headers:
+            continue
+        key = (headers["WARC-Scraper-Site"], headers["WARC-Scraper-Article"], headers["WARC-Scraper-Page"])
+        pages[key] = (headers, block)
+
+    articles, errors = [], 0
+    del _collected_comments[:]
+    for (site, art_id, kind), (headers, block) in pages.items():
+        if site not in SITES:
+            continue
+        article_mod, comments_mod = SITES[site]
+        try:
+            dr = StaticDriver(block.decode("utf-8"), headers.get("WARC-Target-URI"))
+            if kind == "article":
+                try:
+                    art_date = article_mod.get_date(dr)
+                except Exception:
+                    art_date = None
+                has_comments = (site, art_id, "commentaires") in pages
+                articles.append((art_id, article_mod.get_title(dr), dr.current_url,
+                                 headers.get("WARC-Scraper-Categorie"), normalize_date(art_date),
+                                 article_mod.get_description(dr), 1 if has_comments else 0, site,
+                                 _warc_date_to_sql(headers.get("WARC-Date"))))
+            elif kind == "commentaires":
+                comments_mod.process_comments(dr, art_id, pause=_no_pause)
+        except Exception as e:
+            errors += 1
+            log.warning(f"  ⚠️ {site} {art_id} ({kind}) : {e}", extra={"site": site, "art_id": art_id})
+
+    return articles, list(_collected_comments), errors
+
+
+def save_reextracted(articles, comments):
+    """Met à jour les articles (sans toucher aux captures) et ajoute les commentaires manquants"""
+    conn = get_connection()
+    try:
+        conn.executemany("""
+                         INSERT INTO UNIL_Article
+                         (art_id, art_titre, art_url, art_categorie, art_date, art_description,
+                          art_commentaires_actifs, art_nom_journal, art_date_recolte)
+                         VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                         ON CONFLICT(art_id) DO UPDATE SET
+                             art_titre               = excluded.art_titre,
+                             art_date                = COALESCE(excluded.art_date, art_date),
+                             art_description         = excluded.art_description,
+                             art_commentaires_actifs = MAX(excluded.art_commentaires_actifs, art_commentaires_actifs)
+                         """, articles)
+        conn.executemany("""
+                         INSERT
+                         OR IGNORE INTO UNIL_Commentaire
+            (com_id, com_auteur, com_contenu, com_art_id, com_commentaire_parent)
+            VALUES (?, ?, ?, ?, ?)
+                         """, comments)
+        conn.commit()
+    except Exception as e:
+        log.error(f"  ❌ Erreur écriture de la ré-extraction : {e}")
+        conn.rollback()
+        raise
+
+
+def reextract_all(paths=None, workers=REEXTRACT_WORKERS, dry_run=False):
+    """Ré-extrait tous les fichiers WARC (ou ceux donnés) en parallèle"""
+    paths = paths or sorted(glob.glob(os.path.join(WARC_DIR, "*.warc.gz")))
+    log.info(f"🗄️ Ré-extraction de {len(paths)} fichier(s) WARC avec {workers} processus")
+    total_articles, total_comments, total_errors = 0, 0, 0
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+        futures = {executor.submit(reextract_file, path): path for path in paths}
+        for future in as_completed(futures):
+            try:
+                articles, comments, errors = future.result()
+            except Exception as e:
+                log.error(f"  ❌ {futures[future]} : {e}")
+                continue
+            if not dry_run:
+                save_reextracted(articles, comments)
+            total_articles += len(articles)
+            total_comments += len(comments)
+            total_errors += errors
+            log.info(f"  ✓ {os.path.basename(futures[future])} : {len(articles)} article(s), "
+                     f"{len(comments)} commentaire(s)")
+
+    log.info(f"\n📊 Ré-extraction : {total_articles} article(s), {total_comments} commentaire(s), "
+             f"{total_errors} erreur(s){' (simulation)' if dry_run else ''}")
+
+
+if __name__ == "__main__":
+    # Usage : python -m scraper.reextract [--dry-run] [fichier.warc.gz ...]
+    args = [a for a in sys.argv[1:] if a != "--dry-run"]
+    try:
+        reextract_all(args or None, dry_run="--dry-run" in sys.argv)
+    finally:
+        close_connection()
@@ -0,0 +1,118 @@
+import gzip
+import hashlib
+import os
+import sys
+import tempfile
+
+from selenium import webdriver
+
+from scraper.dbConfig import get_read_connection, close_connection
+from scraper.utils import get_driver_requirements, sauvegarder_page_pdf
+
+# ✅ RENDU PDF DIFFÉRÉ : convertit hors ligne les captures MHTML / DOM (CAPTURE_FORMAT)
+# en PDF, uniquement pour les articles qui en ont besoin. La capture d'origine reste
+# la pièce de référence (art_nom_pdf / art_hash_pdf) ; le PDF n'en est qu'un rendu,
+# dont le hash est consigné à côté de lui (<nom>.pdf.sha256, format de sha256sum).
+CAPTURE_DIR = "./pdf/"
+
+
+def nom_pdf(nom_capture):
+    """Nom du PDF rendu à partir d'une capture (20min-123.mhtml -> 20min-123.pdf)"""
+    for extension in (".html.gz", ".mhtml"):
+        if nom_capture.endswith(extension):
+            return nom_capture[:-len(extension)] + ".pdf"
+    return nom_capture + ".pdf"
+
+
+def captures_a_rendre(art_ids=None):
+    """Articles dont la capture n'est pas un PDF et dont le PDF n'a pas encore été rendu"""
+    conn = get_read_connection()
+    rows = conn.execute("""
+                        SELECT art_id, art_nom_pdf, art_hash_pdf
+                        FROM UNIL_Article
+                        WHERE art_nom_pdf IS NOT NULL
+                          AND art_nom_pdf NOT LIKE '%.pdf'
+                        """).fetchall()
+    result = []
+    for art_id, nom, hash_capture in rows:
+        if art_ids and art_id not in art_ids:
+            continue
+        if os.path.exists(CAPTURE_DIR + nom_pdf(nom)):
+            continue
+        result.append((art_id, nom, hash_capture))
+    return result
+
+
+def rendre_pdf(driver, nom_capture, hash_capture):
+    """
+    Rend une capture MHTML ou DOM en PDF.
+
+    Returns:
+        Tuple (nom du PDF, hash SHA-256 du PDF) ou (None, None) si la capture est absente ou altérée
+    """
+    chemin = os.path.abspath(CAPTURE_DIR + nom_capture)
+    try:
+        with open(chemin, "rb") as f:
+            data = f.read()
+    except FileNotFoundError:
+        print(f"  ❌ Capture introuvable : {chemin}")
+        return None, None
+
+    # La capture doit être celle enregistrée lors de la récolte
+    if hash_capture and hashlib.sha256(data).hexdigest() != hash_capture:
+        print(f"  ❌ Hash de la capture différent de art_hash_pdf : {nom_capture}")
+        return None, None
+
+    temp_path = None
+    try:
+        if nom_capture.endswith(".html.gz"):
+            with tempfile.NamedTemporaryFile("wb", suffix=".html", delete=False) as f:
+                f.write(gzip.decompress(data))
+                temp_path = f.name
+            driver.get("file://" + temp_path)
+        else:
+            driver.get("file://" + chemin)
+        return sauvegarder_page_pdf(driver, nom_pdf(nom_capture))
+    finally:
+        if temp_path:
+            os.remove(temp_path)
+
+
+def enregistrer_hash_pdf(pdf, hash_pdf):
+    """Écrit le hash du PDF rendu dans <pdf>.sha256 (vérifiable avec `sha256sum -c`)"""
+    with open(CAPTURE_DIR + pdf + ".sha256", "w") as f:
+        f.write(f"{hash_pdf}  {pdf}\n")
+
+
+def render_pending(art_ids=None):
+    """Rend en PDF toutes les captures en attente (ou seulement celles des articles donnés)"""
+    captures = captures_a_rendre(art_ids)
+    print(f"🖨️ {len(captures)} capture(s) à rendre en PDF")
+    if not captures:
+        return 0
+
+    options, service = get_driver_requirements()
+    driver = webdriver.Chrome(options=options)
+    driver.set_page_load_timeout(90)
+    rendered = 0
+    try:
+        for art_id, nom, hash_capture in captures:
+            try:
+                pdf, hash_pdf = rendre_pdf(driver, nom, hash_capture)
+                if pdf:
+                    enregistrer_hash_pdf(pdf, hash_pdf)
+                    rendered += 1
+            except Exception as e:
+                print(f"  ❌ Erreur rendu {art_id} : {e}")
+    finally:
+        driver.quit()
+    print(f"✓ {rendered} PDF rendu(s)")
+    return rendered
+
+
+if __name__ == "__main__":
+    # Usage : python -m scraper.render_pdf [art_id ...]
+    try:
+        render_pending(set(sys.argv[1:]) or None)
+    finally:
+        close_connection()
@@ -0,0 +1,125 @@
+import traceback
+from datetime import datetime
+from time import sleep, time
+
+import requests
+from selenium.common.exceptions import (
+    InvalidSessionIdException,
+    NoSuchElementException,
+    TimeoutException,
+    WebDriverException
+)
+
+from scraper.dbConfig import get_connection, synchronized
+from scraper.crawl_log import get_logger
+from scraper.lease import LeaseLostError
+
+log = get_logger(__name__)
+
+# ✅ NOUVELLES TENTATIVES ET FILE DES ÉCHECS (dead letter)
+MAX_TENTATIVES = 4             # Tentatives maximales par article (erreurs transitoires et baux de la file)
+BACKOFF_BASE = 30              # Délai (s) avant la 1re nouvelle tentative, doublé à chaque échec
+BACKOFF_MAX = 15 * 60          # Délai maximal (s) entre deux tentatives
+RETRY_PRIORITY_PENALTY = 1000  # Un article relancé passe après les articles jamais tentés
+DUE_POLL_INTERVAL = 1          # Attente (s) avant de remettre en file un article pas encore disponible
+
+TRANSIENT = "transitoire"
+PERMANENT = "permanent"
+
+
+def classify_failure(exc):
+    """
+    Classe une erreur de scraping.
+
+    Returns:
+        str: TRANSIENT (timeout, session perdue, réseau) ou PERMANENT (sélecteur absent, page inattendue)
+    """
+    if isinstance(exc, NoSuchElementException):
+        return PERMANENT
+    if isinstance(exc, (TimeoutException, InvalidSessionIdException, WebDriverException,
+                        requests.RequestException, ConnectionError)):
+        return TRANSIENT
+    return PERMANENT
+
+
+def _page_url(driver):
+    try:
+        return driver.current_url
+    except Exception:
+        return None
+
+
+@synchronized
+def dead_letter(article, exc, kind, page_url, site, categorie):
+    """Enregistre un article abandonné dans UNIL_Echec pour inspection"""
+    art_id = article.get("art_id") or article.get("url", "").strip().split("-")[-1]
+    conn = get_connection()
+    try:
+        conn.execute("""
+                     INSERT INTO UNIL_Echec
+                     (ech_art_id, ech_url, ech_page_url, ech_site, ech_categorie, ech_type,
+                      ech_exception, ech_message, ech_trace, ech_tentatives, ech_date)
+                     VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                     """, (art_id, article.get("url"), page_url, site, categorie, kind,
+                           type(exc).__name__, str(exc)[:2000],
+                           "".join(traceback.format_exception(type(exc), exc, exc.__traceback__))[-4000:],
+                           article.get("tentatives", 1), str(datetime.now())))
+        conn.commit()
+    except Exception as e:
+        log.error(f"  ❌ Erreur enregistrement de l'échec: {e}")
+        conn.rollback()
+
+
+def handle_failure(article_queue, article, exc, driver, site, categorie):
+    """
+    Relance un article en échec transitoire (backoff exponentiel, basse priorité)
+    ou l'enregistre dans la file des échecs.
+
+    Returns:
+        str: "retry" si l'article a été remis en file, "perdu" si son bail a été repris
+             par un autre processus, "dead" sinon
+    """
+    if isinstance(exc, LeaseLostError):
+        # L'article appartient désormais à un autre processus : ni nouvelle tentative ni échec
+        article_queue.abandon()
+        log.warning(f"  ⚠️ {exc} : article laissé à son nouveau détenteur")
+        return "perdu"
+    kind = classify_failure(exc)
+    tentatives = article.get("tentatives", 1)
+
+    if kind == TRANSIENT and tentatives < MAX_TENTATIVES:
+        delay = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** (tentatives - 1))
+        retry = dict(article)
+        retry["tentatives"] = tentatives + 1
+        retry["delai"] = delay
+        retry["disponible_apres"] = time() + delay
+        retry["priorite"] = article.get("priorite", 0) - RETRY_PRIORITY_PENALTY
+        article_queue.put(retry)
+        log.info(f"  ↻ Échec {kind}, nouvelle tentative {tentatives + 1}/{MAX_TENTATIVES} dans {delay}s")
+        return "retry"
+
+    dead_letter(article, exc, kind, _page_url(driver), site, categorie)
+    if hasattr(article_queue, "fail"):
+        # File partagée : l'article ne doit pas être marqué comme traité
+        article_queue.fail()
+    log.info(f"  ✗ Échec {kind} après {tentatives} tentative(s), article enregistré dans UNIL_Echec")
+    return "dead"
+
+
+def is_due(article_queue, article):
+    """
+    Vérifie qu'un article relancé a atteint son délai de backoff.
+
+    PriorityFrontier et la file partagée ne rendent que des articles disponibles ; pour une
+    autre file, l'article est remis en file après une courte attente (pas de boucle active)
+    et False est retourné, ou on attend la fin du délai s'il était le dernier.
+    """
+    remaining = article.get("disponible_apres", 0) - time()
+    if remaining <= 0:
+        return True
+    if not article_queue.empty():
+        sleep(min(remaining, DUE_POLL_INTERVAL))
+        article_queue.put(article)
+        return False
+    sleep(remaining)
+    return True
@@ -0,0 +1,257 @@
+from collections import deque
+from datetime import datetime, timedelta
+from time import sleep, time
+
+from scraper.dbConfig import get_connection, get_read_connection, close_connection, synchronized
+from scraper.le20minutes import minutes_article, minutes_category, minutes_comments
+from scraper.le24heures import heures_article, heures_category, heures_comments
+from scraper.lematin import matin_article, matin_category, matin_comments
+from scraper.crawl_log import get_logger
+
+log = get_logger(__name__)
+
+# ✅ Modules par journal (valeur de art_nom_journal)
+SITES = {
+    "20min.ch/fr": (minutes_article, minutes_category, minutes_comments),
+    "24heures.ch": (heures_article, heures_category, heures_comments),
+    "lematin.ch/": (matin_article, matin_category, matin_comments),
+}
+
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Paramètres de planification
+MAX_SESSIONS_PER_HOUR = 30     # Plafond de sessions navigateur par heure
+MAX_AGE_HOURS = 7 * 24         # Au-delà, le fil n'est plus re-visité
+MIN_INTERVAL_HOURS = 0.5       # Intervalle minimal entre deux visites d'un même fil
+MAX_INTERVAL_HOURS = 24.0      # Intervalle maximal entre deux visites d'un même fil
+TARGET_NEW_COMMENTS = 10       # Nombre de nouveaux commentaires visé par visite
+AGE_FACTOR = 0.25              # Sans croissance observée : intervalle = âge * facteur
+GROWTH_SMOOTHING = 0.5         # Lissage exponentiel du taux de croissance
+RECYCLE_EVERY = 20             # Recréation du driver toutes les N visites
+IDLE_SLEEP = 60                # Attente (s) quand aucun fil n'est dû
+
+
+def _parse_date(value):
+    if not value:
+        return None
+    try:
+        return datetime.strptime(str(value)[:19], DATE_FORMAT)
+    except ValueError:
+        return None
+
+
+def _count_comments(art_id):
+    conn = get_read_connection()
+    return conn.execute("SELECT COUNT(*) FROM UNIL_Commentaire WHERE com_art_id = ?", (art_id,)).fetchone()[0]
+
+
+def compute_next_interval(age_hours, growth):
+    """
+    Calcule l'intervalle (en heures) avant la prochaine visite d'un fil.
+
+    Args:
+        age_hours: Âge de l'article en heures
+        growth: Taux de croissance observé (commentaires / heure) ou None
+
+    Returns:
+        float: Intervalle en heures
+    """
+    # Un fil jeune est re-visité vite, un fil ancien de plus en plus rarement
+    interval = max(MIN_INTERVAL_HOURS, age_hours * AGE_FACTOR)
+    # Un fil actif est re-visité dès qu'il a dû accumuler TARGET_NEW_COMMENTS nouveaux commentaires
+    if growth:
+        interval = min(interval, TARGET_NEW_COMMENTS / growth)
+    return min(MAX_INTERVAL_HOURS, max(MIN_INTERVAL_HOURS, interval))
+
+
+@synchronized
+def enqueue_new_threads():
+    """Ajoute au planning les articles à commentaires actifs encore jamais planifiés"""
+    conn = get_connection()
+    now = datetime.now()
+    limite = (now - timedelta(hours=MAX_AGE_HOURS)).strftime(DATE_FORMAT)
+    journaux = list(SITES)
+    rows = conn.execute(f"""
+                        SELECT a.art_id,
+                               COALESCE(a.art_date, a.art_date_recolte),
+                               (SELECT COUNT(*) FROM UNIL_Commentaire c WHERE c.com_art_id = a.art_id)
+                        FROM UNIL_Article a
+                                 LEFT JOIN UNIL_Revisite r ON r.rev_art_id = a.art_id
+                        WHERE a.art_commentaires_actifs = 1
+                          AND r.rev_art_id IS NULL
+                          AND a.art_nom_journal IN ({", ".join("?" * len(journaux))})
+                          AND COALESCE(a.art_date, a.art_date_recolte) >= ?
+                        """, (*journaux, limite)).fetchall()
+    if not rows:
+        return
+
+    planning = []
+    for art_id, art_date, nb_comments in rows:
+        published = _parse_date(art_date) or now
+        interval = compute_next_interval((now - published).total_seconds() / 3600, None)
+        planning.append((art_id, nb_comments, now.strftime(DATE_FORMAT),
+                         (now + timedelta(hours=interval)).strftime(DATE_FORMAT)))
+
+    try:
+        conn.executemany("""
+                         INSERT
+                         OR IGNORE INTO UNIL_Revisite
+            (rev_art_id, rev_nb_commentaires, rev_nb_visites, rev_derniere_visite, rev_prochaine_visite)
+            VALUES (?, ?, 0, ?, ?)
+                         """, planning)
+        conn.commit()
+        log.info(f"  ✓ {len(planning)} fil(s) ajouté(s) au planning de re-visite")
+    except Exception as e:
+        log.error(f"  ❌ Erreur planification des re-visites: {e}")
+        conn.rollback()
+
+
+def next_due_article():
+    """
+    Retourne le fil dû dont on attend le plus de nouveaux commentaires, ou None.
+    """
+    conn = get_read_connection()
+    now = datetime.now().strftime(DATE_FORMAT)
+    row = conn.execute("""
+                       SELECT a.art_id, a.art_url, a.art_categorie, a.art_nom_journal,
+                              COALESCE(a.art_date, a.art_date_recolte),
+                              r.rev_nb_commentaires, r.rev_croissance, r.rev_nb_visites, r.rev_derniere_visite
+                       FROM UNIL_Revisite r
+                                INNER JOIN UNIL_Article a ON a.art_id = r.rev_art_id
+                       WHERE r.rev_prochaine_visite IS NOT NULL
+                         AND r.rev_prochaine_visite <= ?
+                       ORDER BY COALESCE(r.rev_croissance, 0)
+                                    * (julianday(?) - julianday(r.rev_derniere_visite)) DESC,
+                                r.rev_prochaine_visite ASC
+                       LIMIT 1
+                       """, (now, now)).fetchone()
+    if row is None:
+        return None
+    keys = ("art_id", "url", "category", "journal", "date", "nb_comments", "growth", "visits", "last_visit")
+    return dict(zip(keys, row))
+
+
+@synchronized
+def update_schedule(article, nb_comments, success=True):
+    """Met à jour le taux de croissance et la date de prochaine visite d'un fil"""
+    now = datetime.now()
+    last_visit = _parse_date(article["last_visit"]) or now
+    elapsed_hours = max((now - last_visit).total_seconds() / 3600, 1e-3)
+
+    growth = article["growth"]
+    if success:
+        observed = max(nb_comments - (article["nb_comments"] or 0), 0) / elapsed_hours
+        growth = observed if growth is None else GROWTH_SMOOTHING * observed + (1 - GROWTH_SMOOTHING) * growth
+
+    published = _parse_date(article["date"]) or now
+    age_hours = (now - published).total_seconds() / 3600
+
+    if age_hours > MAX_AGE_HOURS:
+        next_visit = None  # Fil trop ancien : plus de re-visite
+    else:
+        interval = compute_next_interval(age_hours, growth)
+        if not success:
+            # Échec : on réessaie plus tard sans toucher au taux observé
+            interval = min(MAX_INTERVAL_HOURS, interval * 2)
+        next_visit = (now + timedelta(hours=interval)).strftime(DATE_FORMAT)
+
+    conn = get_connection()
+    try:
+        conn.execute("""
+                     UPDATE UNIL_Revisite
+                     SET rev_nb_commentaires  = ?,
+                         rev_croissance       = ?,
+                         rev_nb_visites       = rev_nb_visites + 1,
+                         rev_derniere_visite  = ?,
+                         rev_prochaine_visite = ?
+                     WHERE rev_art_id = ?
+                     """, (nb_comments, growth, now.strftime(DATE_FORMAT) if success else article["last_visit"],
+                           next_visit, article["art_id"]))
+        conn.commit()
+    except Exception as e:
+        log.error(f"  ❌ Erreur mise à jour du planning: {e}")
+        conn.rollback()
+
+    return growth, next_visit
+
+
+class SessionBudget:
+    """Plafonne le nombre de sessions navigateur sur une fenêtre glissante d'une heure"""
+
+    def __init__(self, max_per_hour=MAX_SESSIONS_PER_HOUR):
+        self.max_per_hour = max_per_hour
+        self.sessions = deque()
+
+    def wait(self):
+        """Bloque jusqu'à ce qu'une nouvelle session soit autorisée, puis la comptabilise"""
+        while True:
+            now = time()
+            while self.sessions and now - self.sessions[0] >= 3600:
+                self.sessions.popleft()
+            if len(self.sessions) < self.max_per_hour:
+                self.sessions.append(now)
+                return
+            delay = 3600 - (now - self.sessions[0])
+            log.info(f"⏳ Plafond de {self.max_per_hour} sessions/heure atteint, attente {int(delay)}s")
+            sleep(delay)
+
+
+def run_revisit_daemon(max_sessions_per_hour=MAX_SESSIONS_PER_HOUR):
+    """
+    Mode démon : re-visite en continu les fils de commentaires actifs
+    selon un planning adaptatif (croissance observée et âge du fil).
+    """
+    log.info("\n" + "=" * 60)
+    log.info("🔁 MODE RE-VISITE DES COMMENTAIRES")
+    log.info("=" * 60)
+
+    budget = SessionBudget(max_sessions_per_hour)
+    drivers = {}
+    visits = {}
+
+    try:
+        while True:
+            enqueue_new_threads()
+            article = next_due_article()
+            if article is None:
+                sleep(IDLE_SLEEP)
+                continue
+
+            article_mod, category_mod, comments_mod = SITES[article["journal"]]
+
+            key = (article["journal"], article["category"])
+            if key not in drivers or visits.get(key, 0) >= RECYCLE_EVERY:
+                if key in drivers:
+                    try:
+                        drivers[key].quit()
+                    except Exception:
+                        pass
+                drivers[key] = category_mod.recreate_driver(article["category"])
+                visits[key] = 0
+
+            budget.wait()
+            visits[key] += 1
+            log.info(f"🔁 Re-visite : {article['url']}")
+
+            try:
+                article_mod.scrap_article(drivers[key], article["url"], article["category"])
+                article_mod.flush_article_batch()
+                comments_mod.flush_comment_batch()
+                nb_comments = _count_comments(article["art_id"])
+                growth, next_visit = update_schedule(article, nb_comments)
+                log.info(f"  → {nb_comments - (article['nb_comments'] or 0)} nouveau(x) commentaire(s), "
+                      f"{growth:.2f}/h, prochaine visite : {next_visit or 'aucune'}")
+            except Exception as e:
+                log.error(f"  ❌ Erreur re-visite : {e}")
+                update_schedule(article, article["nb_comments"] or 0, success=False)
+                visits[key] = RECYCLE_EVERY  # Forcer la recréation du driver
+    finally:
+        for driver in drivers.values():
+            try:
+                driver.quit()
+            except Exception:
+                pass
+        for article_mod, _, comments_mod in SITES.values():
+            article_mod.flush_article_batch()
+            comments_mod.flush_comment_batch()
+        close_connection()
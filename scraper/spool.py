@@ -0,0 +1,227 @@
+import glob
+import json
+import os
+import socket
+import threading
+from datetime import datetime
+
+from scraper.dbConfig import get_connection
+from scraper.crawl_log import get_logger
+
+log = get_logger(__name__)
+
+# ✅ SPOOL DISQUE : chaque enregistrement collecté est d'abord ajouté à un fichier
+# en ajout seul, avant toute écriture SQLite. Un échec de flush ne perd plus rien :
+# replay_spool() recharge le spool dans la base de façon idempotente.
+SPOOL_DIR = "spool"
+FSYNC_EVERY = 50          # fsync au plus tard tous les N enregistrements
+REPLAY_COMMIT_EVERY = 1000
+
+_lock = threading.Lock()
+_file = None
+_path = None
+_pending = 0
+
+_REPLAY_SQL = {
+    "article": """INSERT OR IGNORE INTO UNIL_Article
+        (art_id, art_titre, art_url, art_categorie, art_date, art_description, art_commentaires_actifs, art_nom_journal, art_date_recolte)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+    "commentaire": """INSERT OR IGNORE INTO UNIL_Commentaire
+        (com_id, com_auteur, com_contenu, com_art_id, com_commentaire_parent)
+        VALUES (?, ?, ?, ?, ?)""",
+    # Ordre des paramètres : (art_id, art_nom_pdf, art_hash_pdf)
+    "pdf": """UPDATE UNIL_Article SET art_nom_pdf = ?2, art_hash_pdf = ?3 WHERE art_id = ?1""",
+}
+
+
+def _open_segment():
+    """Ouvre le segment de spool du processus courant (un fichier par processus)"""
+    global _file, _path
+    if _file is None:
+        os.makedirs(SPOOL_DIR, exist_ok=True)
+        name = f"{socket.gethostname()}-{os.getpid()}-{datetime.now().strftime('%Y%m%d%H%M%S')}.open.jsonl"
+        _path = os.path.join(SPOOL_DIR, name)
+        _file = open(_path, "ab")
+    return _file
+
+
+def append(kind, row):
+    """Ajoute un enregistrement ("article", "commentaire" ou "pdf") au spool"""
+    global _pending
+    line = json.dumps({"type": kind, "row": list(row)}, ensure_ascii=False) + "\n"
+    with _lock:
+        _open_segment().write(line.encode("utf-8"))
+        _pending += 1
+        if _pending >= FSYNC_EVERY:
+            _sync_locked()
+
+
+def _sync_locked():
+    global _pending
+    if _file is not None and _pending:
+        _file.flush()
+        os.fsync(_file.fileno())
+        _pending = 0
+
+
+def sync():
+    """Force l'écriture sur disque des enregistrements en attente (à appeler avant chaque flush SQLite)"""
+    with _lock:
+        _sync_locked()
+
+
+def close_spool():
+    """Ferme le segment courant : il devient rejouable puis supprimable par replay_spool()"""
+    global _file, _path
+    with _lock:
+        if _file is None:
+            return
+        _sync_locked()
+        _file.close()
+        os.replace(_path, _path.replace(".open.jsonl", ".jsonl"))
+        offset_path = _path + ".offset"
+        if os.path.exists(offset_path):
+            os.replace(offset_path, _path.replace(".open.jsonl", ".jsonl") + ".offset")
+        _file = None
+        _path = None
+
+
+def _read_offset(path):
+    try:
+        with open(path + ".offset", "r") as f:
+            return int(f.read().strip() or 0)
+    except (FileNotFoundError, ValueError):
+        return 0
+
+
+def _write_offset(path, offset):
+    with open(path + ".offset", "w") as f:
+        f.write(str(offset))
+
+
+def replay_segment(conn, path):
+    """
+    Rejoue un segment à partir du dernier point de reprise.
+
+    Returns:
+        int: Nombre d'enregistrements rejoués
+    """
+    offset = _read_offset(path)
+    replayed = 0
+    with open(path, "rb") as f:
+        f.seek(offset)
+        for raw in f:
+            if not raw.endswith(b"\n"):
+                break  # Ligne incomplète (écriture interrompue) : ignorée
+            record = json.loads(raw.decode("utf-8"))
+            conn.execute(_REPLAY_SQL[record["type"]], record["row"])
+            offset += len(raw)
+            replayed += 1
+            if replayed % REPLAY_COMMIT_EVERY == 0:
+                conn.commit()
+                _write_offset(path, offset)
+    conn.commit()
+    _write_offset(path, offset)
+    return replayed
+
+
+def _pid_alive(pid):
+    """Le processus `pid` de cette machine existe-t-il encore ?"""
+    if os.name == "nt":
+        # os.kill(pid, 0) terminerait le processus sous Windows
+        import ctypes
+        handle = ctypes.windll.kernel32.OpenProcess(0x1000, False, pid)  # PROCESS_QUERY_LIMITED_INFORMATION
+        if not handle:
+            return False
+        ctypes.windll.kernel32.CloseHandle(handle)
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _parse_segment(path):
+    """
+    Décompose le nom d'un segment <machine>-<pid>-<AAAAmmjjHHMMSS>[.open].jsonl.
+
+    Returns:
+        tuple (machine, pid, horodatage) ou None si le nom ne suit pas ce format
+    """
+    name = os.path.basename(path)
+    name = name[:-len(".open.jsonl")] if name.endswith(".open.jsonl") else name[:-len(".jsonl")]
+    try:
+        host, pid, stamp = name.rsplit("-", 2)
+        return host, int(pid), datetime.strptime(stamp, "%Y%m%d%H%M%S")
+    except ValueError:
+        return None
+
+
+def _segment_order(path):
+    """Clé de tri : horodatage d'ouverture du segment (date de modification à défaut), puis nom"""
+    parsed = _parse_segment(path)
+    opened = parsed[2] if parsed else datetime.fromtimestamp(os.path.getmtime(path))
+    return opened, os.path.basename(path)
+
+
+def _is_orphan(path):
+    """
+    Segment ouvert dont le processus propriétaire a disparu (plantage) : plus personne n'y écrira.
+
+    Seuls les segments de cette machine peuvent être jugés : SPOOL_DIR est partagé en mode
+    multi-machines et le PID d'une autre machine ne dit rien ici. Un segment de notre propre PID
+    (qui n'est pas le segment courant) vient d'un processus précédent auquel ce PID a été réattribué.
+    """
+    parsed = _parse_segment(path)
+    if parsed is None:
+        return False
+    host, pid, _ = parsed
+    if host != socket.gethostname():
+        return False
+    if pid == os.getpid():
+        return True
+    return not _pid_alive(pid)
+
+
+def replay_spool():
+    """
+    Recharge tous les segments du spool dans SQLite (idempotent : INSERT OR IGNORE / UPDATE).
+    Les segments fermés, ou ouverts par un processus disparu, sont supprimés une fois rejoués.
+    """
+    with _lock:
+        own = _path
+    # Ordre chronologique d'ouverture des segments (le nom commence par la machine, pas par la date)
+    segments = sorted(glob.glob(os.path.join(SPOOL_DIR, "*.jsonl")), key=_segment_order)
+    if not segments:
+        return 0
+
+    conn = get_connection()
+    total = 0
+    for path in segments:
+        if path == own:
+            continue
+        # Vérifié avant le rejeu : un processus vivant pourrait encore ajouter des lignes
+        orphan = path.endswith(".open.jsonl") and _is_orphan(path)
+        try:
+            replayed = replay_segment(conn, path)
+        except Exception as e:
+            log.error(f"  ❌ Erreur rejeu du spool {path}: {e}")
+            conn.rollback()
+            continue
+        total += replayed
+        if path.endswith(".open.jsonl"):
+            if not orphan:
+                continue  # Segment d'un processus en cours : repris plus tard à son point de reprise
+            if _read_offset(path) < os.path.getsize(path):
+                log.warning(f"  ⚠️ Spool {path} : dernière ligne incomplète (écriture interrompue) ignorée")
+            log.info(f"  🧹 Segment orphelin {os.path.basename(path)} rejoué puis supprimé")
+        os.remove(path)
+        if os.path.exists(path + ".offset"):
+            os.remove(path + ".offset")
+
+    if total:
+        log.info(f"✓ Spool : {total} enregistrement(s) rejoué(s) en base")
+    return total
@@ -1,5 +1,6 @@
 import base64
 import datetime
+import gzip
 import hashlib
 import os
 import pickle
@@ -13,6 +14,21 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.wait import WebDriverWait
 
+from scraper import warc
+from scraper.crawl_log import get_logger
+
+log = get_logger(__name__)
+
+# ✅ FORMAT DES CAPTURES DE PAGE (art_nom_pdf / art_hash_pdf)
+#   "pdf"   : Page.printToPDF (lent, fichiers lourds)
+#   "mhtml" : Page.captureSnapshot, page complète en une archive MHTML
+#   "dom"   : DOM rendu + CSS en ligne, compressé en gzip (.html.gz)
+# Les captures "mhtml" et "dom" peuvent être converties en PDF plus tard par render_pdf.py.
+CAPTURE_FORMAT = "pdf"
+
+USER_AGENT = ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+              "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
+
 
 def normalize_date(art_date):
     """Normalise une date ISO en format SQL"""
@@ -47,13 +63,13 @@ def get_driver_requirements() -> Tuple[Options, Service]:
     options.add_argument("--no-sandbox")
     options.add_argument("--disable-dev-shm-usage")
     options.add_argument("--window-size=1920,1080")
-    options.add_argument(
-        "user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-        "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-    )
+    options.add_argument(f"user-agent={USER_AGENT}")
     options.add_argument("--disable-blink-features=AutomationControlled")
     options.add_experimental_option("excludeSwitches", ["enable-automation"])
     options.add_experimental_option('useAutomationExtension', False)
+    if warc.ARCHIVE_WARC:
+        # Journal réseau nécessaire pour archiver les réponses brutes
+        options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
 
     service = Service("/usr/bin/chromedriver")
 
@@ -137,8 +153,8 @@ def sauvegarder_page_pdf(driver, chemin_fichier):
     with open("./pdf/" + chemin_fichier, 'wb') as f:
         f.write(pdf_data)
 
-    print(f"\tPDF sauvegardé : {chemin_fichier}")
-    print(f"\tHash SHA-256 : {hash_sha256}")
+    log.info(f"\tPDF sauvegardé : {chemin_fichier}")
+    log.info(f"\tHash SHA-256 : {hash_sha256}", extra={"fichier": chemin_fichier, "hash": hash_sha256})
 
     return chemin_fichier, hash_sha256
 
@@ -156,7 +172,7 @@ def sauvegarder_page_avec_modal_pdf(driver, chemin_fichier, modal_element):
     hauteur_totale = driver.execute_script("return arguments[0].scrollHeight;", modal_element)
     scroll_actuel = driver.execute_script("return arguments[0].scrollTop;", modal_element)
 
-    print(f"\tHauteur visible du modal: {hauteur_visible}px, Hauteur totale: {hauteur_totale}px")
+    log.info(f"\tHauteur visible du modal: {hauteur_visible}px, Hauteur totale: {hauteur_totale}px")
 
     screenshots = []
     scroll_position = 0
@@ -199,9 +215,81 @@ def sauvegarder_page_avec_modal_pdf(driver, chemin_fichier, modal_element):
         combined.save(img_bytes, format='PDF')
         hash_sha256 = hashlib.sha256(img_bytes.getvalue()).hexdigest()
 
-        print(f"\tPDF sauvegardé : {chemin_fichier}")
-        print(f"\tHash SHA-256 : {hash_sha256}")
+        log.info(f"\tPDF sauvegardé : {chemin_fichier}")
+        log.info(f"\tHash SHA-256 : {hash_sha256}", extra={"fichier": chemin_fichier, "hash": hash_sha256})
 
         return chemin_fichier, hash_sha256
 
-    return None, None
\ No newline at end of file
+    return None, None
+
+
+# Capture autonome du DOM : feuilles de style en ligne, scripts retirés, <base> vers l'URL d'origine
+_DOM_CAPTURE_JS = """
+const css = [];
+for (const sheet of document.styleSheets) {
+    try {
+        css.push(Array.from(sheet.cssRules).map(r => r.cssText).join("\\n"));
+    } catch (e) {
+        if (sheet.href) css.push('@import url("' + sheet.href + '");');
+    }
+}
+const clone = document.documentElement.cloneNode(true);
+clone.querySelectorAll("script, noscript, link[rel=stylesheet], style").forEach(n => n.remove());
+const head = clone.querySelector("head") || clone;
+const base = document.createElement("base");
+base.href = document.baseURI;
+head.prepend(base);
+const style = document.createElement("style");
+style.textContent = css.join("\\n");
+head.appendChild(style);
+return "<!DOCTYPE html>\\n" + clone.outerHTML;
+"""
+
+
+def _ecrire_capture(chemin_fichier, data):
+    """Écrit une capture dans ./pdf/ et retourne son hash SHA-256"""
+    hash_sha256 = hashlib.sha256(data).hexdigest()
+    with open("./pdf/" + chemin_fichier, 'wb') as f:
+        f.write(data)
+    log.info(f"\tCapture sauvegardée : {chemin_fichier}")
+    log.info(f"\tHash SHA-256 : {hash_sha256}", extra={"fichier": chemin_fichier, "hash": hash_sha256})
+    return chemin_fichier, hash_sha256
+
+
+def sauvegarder_page_mhtml(driver, chemin_fichier):
+    """
+    Sauvegarde la page actuelle en MHTML (Page.captureSnapshot) et retourne le hash
+    """
+    result = driver.execute_cdp_cmd("Page.captureSnapshot", {"format": "mhtml"})
+    return _ecrire_capture(chemin_fichier, result['data'].encode('utf-8'))
+
+
+def sauvegarder_page_dom(driver, chemin_fichier):
+    """
+    Sauvegarde le DOM rendu et ses CSS en une page HTML autonome compressée (gzip) et retourne le hash
+    """
+    html = driver.execute_script(_DOM_CAPTURE_JS)
+    # mtime=0 : deux captures identiques ont le même hash
+    return _ecrire_capture(chemin_fichier, gzip.compress(html.encode('utf-8'), mtime=0))
+
+
+def sauvegarder_page(driver, nom_base, modal_element=None):
+    """
+    Sauvegarde la page actuelle au format CAPTURE_FORMAT.
+
+    Args:
+        driver: Driver Selenium (ou façade CDP)
+        nom_base: Nom du fichier sans extension (ex: "20min-123456")
+        modal_element: Modal à capturer en entier (format "pdf" uniquement : MHTML et DOM contiennent déjà tout)
+
+    Returns:
+        Tuple (nom du fichier, hash SHA-256)
+    """
+    os.makedirs("./pdf", exist_ok=True)
+    if CAPTURE_FORMAT == "mhtml":
+        return sauvegarder_page_mhtml(driver, nom_base + ".mhtml")
+    if CAPTURE_FORMAT == "dom":
+        return sauvegarder_page_dom(driver, nom_base + ".html.gz")
+    if modal_element is not None:
+        return sauvegarder_page_avec_modal_pdf(driver, nom_base + ".pdf", modal_element)
+    return sauvegarder_page_pdf(driver, nom_base + ".pdf")
@@ -0,0 +1,189 @@
+import base64
+import gzip
+import hashlib
+import json
+import os
+import socket
+import threading
+import uuid
+from datetime import datetime, timezone
+
+from scraper.crawl_log import get_logger
+
+log = get_logger(__name__)
+
+# ✅ ARCHIVE WARC : les réponses HTTP brutes (pages HTML, JSON des commentaires) et le DOM
+# rendu de chaque page visitée sont archivés au format WARC (un membre gzip par
+# enregistrement). reextract.py peut ensuite régénérer les lignes de la base hors ligne.
+ARCHIVE_WARC = False          # Activé par main.py --warc (avant la création des drivers)
+WARC_DIR = "warc"
+WARC_MAX_BYTES = 1024 ** 3    # Nouveau fichier au-delà de 1 Go
+ARCHIVED_TYPES = {"Document", "XHR", "Fetch"}  # Types de ressources CDP archivés
+
+# En-têtes qui ne décrivent plus le corps renvoyé par Network.getResponseBody (déjà décodé)
+_DROPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding"}
+
+_lock = threading.Lock()
+_writer = None
+
+
+def _warc_date():
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _digest(data):
+    return "sha256:" + base64.b32encode(hashlib.sha256(data).digest()).decode("ascii")
+
+
+class WarcWriter:
+    """Écriture d'enregistrements WARC/1.1, un membre gzip par enregistrement"""
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, "ab")
+        if self.file.tell() == 0:
+            info = f"software: scraper\r\nhostname: {socket.gethostname()}\r\nformat: WARC File Format 1.1\r\n"
+            self.write_record("warcinfo", None, info.encode("utf-8"), "application/warc-fields")
+
+    def write_record(self, warc_type, target_uri, block, content_type, extra_headers=None):
+        headers = [
+            ("WARC-Type", warc_type),
+            ("WARC-Record-ID", f"<urn:uuid:{uuid.uuid4()}>"),
+            ("WARC-Date", _warc_date()),
+        ]
+        if target_uri:
+            headers.append(("WARC-Target-URI", target_uri))
+        headers += [
+            ("Content-Type", content_type),
+            ("WARC-Block-Digest", _digest(block)),
+            ("Content-Length", str(len(block))),
+        ]
+        headers += list((extra_headers or {}).items())
+        head = "WARC/1.1\r\n" + "".join(f"{k}: {v}\r\n" for k, v in headers) + "\r\n"
+        self.file.write(gzip.compress(head.encode("utf-8") + block + b"\r\n\r\n"))
+
+    def write_response(self, url, status, status_text, headers, body, extra_headers=None):
+        """Réponse HTTP brute (statut, en-têtes, corps)"""
+        http_headers = "".join(f"{k}: {v}\r\n" for k, v in headers.items() if k.lower() not in _DROPPED_HEADERS)
+        http_head = f"HTTP/1.1 {status} {status_text}\r\n{http_headers}Content-Length: {len(body)}\r\n\r\n"
+        extra = dict(extra_headers or {})
+        extra["WARC-Payload-Digest"] = _digest(body)
+        self.write_record("response", url, http_head.encode("utf-8") + body,
+                          "application/http;msgtype=response", extra)
+
+    def write_resource(self, url, content_type, body, extra_headers=None):
+        """Ressource produite par le crawler (DOM rendu d'une page)"""
+        self.write_record("resource", url, body, content_type, extra_headers)
+
+    def flush(self):
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def close(self):
+        self.flush()
+        self.file.close()
+
+
+def _get_writer():
+    """Fichier WARC du processus courant (rotation au-delà de WARC_MAX_BYTES)"""
+    global _writer
+    if _writer is not None and _writer.file.tell() >= WARC_MAX_BYTES:
+        _writer.close()
+        _writer = None
+    if _writer is None:
+        os.makedirs(WARC_DIR, exist_ok=True)
+        name = f"{socket.gethostname()}-{os.getpid()}-{datetime.now().strftime('%Y%m%d%H%M%S%f')}.warc.gz"
+        _writer = WarcWriter(os.path.join(WARC_DIR, name))
+    return _writer
+
+
+def _archive_responses(driver, writer, extra):
+    """Archive les réponses réseau enregistrées par le journal de performance depuis le dernier appel"""
+    try:
+        entries = driver.get_log("performance")
+    except Exception:
+        return 0  # Journal de performance indisponible (façade CDP, option absente)
+
+    archived = 0
+    for entry in entries:
+        message = json.loads(entry["message"])["message"]
+        if message.get("method") != "Network.responseReceived":
+            continue
+        params = message["params"]
+        response = params["response"]
+        if params.get("type") not in ARCHIVED_TYPES or not response["url"].startswith("http"):
+            continue
+        try:
+            result = driver.execute_cdp_cmd("Network.getResponseBody", {"requestId": params["requestId"]})
+        except Exception:
+            continue  # Corps déjà libéré par Chrome (page quittée)
+        body = base64.b64decode(result["body"]) if result.get("base64Encoded") else result["body"].encode("utf-8")
+        writer.write_response(response["url"], response["status"], response.get("statusText", ""),
+                              response.get("headers", {}), body, extra)
+        archived += 1
+    return archived
+
+
+def archive_page(driver, kind, site, art_id, categorie=None):
+    """
+    Archive les réponses brutes reçues et le DOM rendu de la page courante (si ARCHIVE_WARC).
+
+    Args:
+        driver: Driver Selenium (journal de performance activé par get_driver_requirements)
+        kind: "article" ou "commentaires"
+        site: Journal (art_nom_journal)
+        art_id: Identifiant de l'article
+        categorie: Catégorie de l'article
+    """
+    if not ARCHIVE_WARC:
+        return
+    extra = {"WARC-Scraper-Page": kind, "WARC-Scraper-Site": site, "WARC-Scraper-Article": art_id}
+    if categorie:
+        extra["WARC-Scraper-Categorie"] = categorie
+    try:
+        html = driver.execute_script("return document.documentElement.outerHTML;")
+        url = driver.current_url
+        with _lock:
+            writer = _get_writer()
+            responses = _archive_responses(driver, writer, extra)
+            writer.write_resource(url, "text/html; charset=utf-8", html.encode("utf-8"), extra)
+            writer.flush()
+        log.info(f"\t🗄️ WARC : {responses} réponse(s) + DOM {kind} archivés")
+    except Exception as e:
+        log.warning(f"  ⚠️ Erreur archivage WARC : {e}")
+
+
+def close_warc():
+    global _writer
+    with _lock:
+        if _writer is not None:
+            _writer.close()
+            _writer = None
+
+
+def read_warc(path):
+    """
+    Parcourt les enregistrements d'un fichier WARC (gzip multi-membres).
+
+    Yields:
+        Tuple (dict des en-têtes, bloc en octets)
+    """
+    with gzip.open(path, "rb") as f:
+        while True:
+            line = f.readline()
+            if not line:
+                return
+            if not line.strip():
+                continue
+            if not line.startswith(b"WARC/"):
+                raise ValueError(f"Enregistrement WARC invalide dans {path}")
+            headers = {}
+            while True:
+                line = f.readline().rstrip(b"\r\n")
+                if not line:
+                    break
+                key, _, value = line.decode("utf-8").partition(":")
+                headers[key.strip()] = value.strip()
+            block = f.read(int(headers["Content-Length"]))
+            f.read(4)  # \r\n\r\n
+            yield headers, block
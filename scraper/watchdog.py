@@ -0,0 +1,148 @@
+import os
+import signal
+import threading
+from time import time
+
+from selenium.common.exceptions import TimeoutException
+
+from scraper.metrics import record_metric
+from scraper.crawl_log import get_logger
+
+log = get_logger(__name__)
+
+# ✅ WATCHDOG : chaque commande WebDriver (get, execute_script, clic, CDP...) reçoit
+# une échéance. Au-delà, le processus chromedriver et ses Chrome sont tués : l'appel
+# bloqué échoue aussitôt et le worker recrée un driver propre.
+COMMAND_DEADLINES = {
+    "get": 100,                # > set_page_load_timeout(90)
+    "refresh": 100,
+    "executeCdpCommand": 120,  # Page.printToPDF peut être long sur les pages lourdes
+    "w3cExecuteScript": 60,
+    "w3cExecuteScriptAsync": 60,
+    "screenshot": 60,
+}
+DEFAULT_DEADLINE = 45          # Clics, recherches d'éléments, cookies...
+CHECK_INTERVAL = 1.0
+
+
+class DriverHangError(TimeoutException):
+    """Commande WebDriver bloquée au-delà de son échéance (driver tué par le watchdog)"""
+
+
+def _kill_process_tree(pid):
+    """Tue un processus et tous ses descendants (psutil si disponible, sinon le seul processus)"""
+    try:
+        import psutil
+    except ImportError:
+        psutil = None
+
+    if psutil is not None:
+        try:
+            parent = psutil.Process(pid)
+            procs = parent.children(recursive=True) + [parent]
+        except psutil.NoSuchProcess:
+            return
+        for proc in procs:
+            try:
+                proc.kill()
+            except psutil.NoSuchProcess:
+                pass
+        psutil.wait_procs(procs, timeout=5)
+        return
+
+    try:
+        os.kill(pid, signal.SIGKILL if hasattr(signal, "SIGKILL") else signal.SIGTERM)
+    except OSError:
+        pass
+
+
+class DriverWatchdog(threading.Thread):
+    """Thread de surveillance d'un driver : tue le navigateur si une commande dépasse son échéance"""
+
+    def __init__(self, driver, site=None):
+        super().__init__(daemon=True, name=f"watchdog-{site}")
+        self.driver = driver
+        self.site = site
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._command = None
+        self._started_at = None
+        self._deadline = None
+        self.killed = None  # (commande, durée) de la commande ayant provoqué le kill
+
+    def begin(self, command):
+        with self._lock:
+            self._command = command
+            self._started_at = time()
+            self._deadline = self._started_at + COMMAND_DEADLINES.get(command, DEFAULT_DEADLINE)
+
+    def end(self):
+        with self._lock:
+            self._command = None
+            self._deadline = None
+
+    def stop(self):
+        self._stop_event.set()
+
+    def run(self):
+        while not self._stop_event.wait(CHECK_INTERVAL):
+            with self._lock:
+                if self._deadline is None or time() < self._deadline:
+                    continue
+                command, elapsed = self._command, time() - self._started_at
+                self._deadline = None
+            self.killed = (command, elapsed)
+            log.info(f"  ⏱️ Commande '{command}' bloquée depuis {elapsed:.0f}s, arrêt du navigateur")
+            process = getattr(getattr(self.driver, "service", None), "process", None)
+            if process is not None:
+                _kill_process_tree(process.pid)
+            return
+
+
+def attach_watchdog(driver, site=None):
+    """
+    Place toutes les commandes d'un driver sous la surveillance d'un watchdog.
+
+    Les commandes des WebElement passent aussi par driver.execute et sont donc couvertes.
+    Une commande tuée lève DriverHangError (sous-classe de TimeoutException) dans le
+    thread appelant, après enregistrement du blocage dans UNIL_Crawl_Metrique.
+
+    Returns:
+        Le driver (modifié en place)
+    """
+    watchdog = DriverWatchdog(driver, site)
+    execute = driver.execute
+    quit_driver = driver.quit
+
+    def guarded_execute(driver_command, params=None):
+        if watchdog.killed:
+            raise DriverHangError(f"Driver tué par le watchdog (commande '{watchdog.killed[0]}')")
+        watchdog.begin(driver_command)
+        try:
+            return execute(driver_command, params)
+        except Exception as e:
+            if watchdog.killed:
+                command, elapsed = watchdog.killed
+                record_metric("blocage_driver", site, elapsed, commande=command,
+                              echeance=COMMAND_DEADLINES.get(command, DEFAULT_DEADLINE))
+                raise DriverHangError(f"Commande '{command}' bloquée {elapsed:.0f}s, driver tué") from e
+            raise
+        finally:
+            watchdog.end()
+
+    def guarded_quit():
+        watchdog.stop()
+        if watchdog.killed:
+            # Le navigateur est déjà mort : on libère seulement le service chromedriver
+            try:
+                driver.service.stop()
+            except Exception:
+                pass
+            return
+        quit_driver()
+
+    driver.execute = guarded_execute
+    driver.quit = guarded_quit
+    driver.watchdog = watchdog
+    watchdog.start()
+    return driver
@@ -0,0 +1,298 @@
+import os
+import socket
+import sqlite3
+from datetime import datetime, timedelta
+from queue import Empty
+from time import sleep, time
+
+from scraper import dbConfig, lease
+from scraper.le20minutes import minutes_category, minutes_main
+from scraper.le24heures import heures_category, heures_main
+from scraper.lematin import matin_category, matin_main
+from scraper.crawl_log import get_logger
+from scraper.retry import MAX_TENTATIVES  # Baux et nouvelles tentatives partagent la même limite
+
+log = get_logger(__name__)
+
+# ✅ Sites pris en charge par la file de travail (clé = art_nom_journal)
+SITES = {
+    "20min.ch/fr": (minutes_main.URLS, minutes_category),
+    "24heures.ch": (heures_main.URLS, heures_category),
+    "lematin.ch/": (matin_main.URLS, matin_category),
+}
+
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+LEASE_SECONDS = 15 * 60   # Durée d'un bail : au-delà, l'article est repris par un autre processus
+POLL_INTERVAL = 0.2       # Intervalle (s) entre deux tentatives de bail dans get()
+
+
+def _now(offset_seconds=0):
+    return (datetime.now() + timedelta(seconds=offset_seconds)).strftime(DATE_FORMAT)
+
+
+def worker_id():
+    """Identifiant unique du processus courant (hôte + PID)"""
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class WorkQueue:
+    """
+    File de travail SQLite partagée, avec bail / acquittement / nouvelle tentative.
+
+    Expose la même interface que queue.Queue (get, put, task_done, qsize, empty)
+    pour être consommée directement par les worker_thread des sites.
+    Plusieurs processus (ou machines partageant le fichier .db) peuvent la consommer :
+    chaque article n'est attribué qu'à un seul bail actif à la fois.
+    """
+
+    def __init__(self, site, categorie, db_path=None, lease_seconds=LEASE_SECONDS):
+        self.site = site
+        self.categorie = categorie
+        self.lease_seconds = lease_seconds
+        self.owner = worker_id()
+        self.current = None
+        # Connexion dédiée : les transactions de bail ne se mélangent pas aux batchs des scrapers
+        self.conn = sqlite3.connect(db_path or dbConfig.DB_PATH, timeout=30, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.execute("PRAGMA busy_timeout = 30000")
+
+    def enqueue(self, url, art_id, title=None, priorite=0):
+        """Ajoute un article à la file (ignoré s'il y est déjà, quel que soit son état)"""
+        cursor = self.conn.execute("""
+                                   INSERT
+                                   OR IGNORE INTO UNIL_File_Travail
+            (fq_art_id, fq_url, fq_titre, fq_site, fq_categorie, fq_etat, fq_priorite, fq_date_maj)
+            VALUES (?, ?, ?, ?, ?, 'attente', ?, ?)
+                                   """, (art_id, url, title, self.site, self.categorie, priorite, _now()))
+        return cursor.rowcount > 0
+
+    def lease(self):
+        """
+        Prend atomiquement un bail sur le prochain article disponible.
+
+        Returns:
+            dict de l'article ({"title", "url", "art_id", "tentatives"}) ou None
+        """
+        now = _now()
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Les baux expirés au-delà du nombre maximal de tentatives passent en échec
+            self.conn.execute("""
+                              UPDATE UNIL_File_Travail
+                              SET fq_etat = 'echec', fq_date_maj = ?
+                              WHERE fq_etat = 'bail'
+                                AND fq_bail_expire <= ?
+                                AND fq_tentatives >= ?
+                              """, (now, now, MAX_TENTATIVES))
+            row = self.conn.execute("""
+                                    SELECT fq_art_id, fq_url, fq_titre, fq_tentatives, fq_priorite
+                                    FROM UNIL_File_Travail
+                                    WHERE fq_site = ?
+                                      AND fq_categorie = ?
+                                      AND fq_tentatives < ?
+                                      AND ((fq_etat = 'attente'
+                                                AND (fq_disponible_apres IS NULL OR fq_disponible_apres <= ?))
+                                           OR (fq_etat = 'bail' AND fq_bail_expire <= ?))
+                                    ORDER BY fq_priorite DESC, fq_date_maj ASC
+                                    LIMIT 1
+                                    """, (self.site, self.categorie, MAX_TENTATIVES, now, now)).fetchone()
+            if row is None:
+                self.conn.execute("COMMIT")
+                return None
+            self.conn.execute("""
+                              UPDATE UNIL_File_Travail
+                              SET fq_etat         = 'bail',
+                                  fq_proprietaire = ?,
+                                  fq_bail_expire  = ?,
+                                  fq_tentatives   = fq_tentatives + 1,
+                                  fq_date_maj     = ?
+                              WHERE fq_art_id = ?
+                              """, (self.owner, _now(self.lease_seconds), now, row[0]))
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        return {"title": row[2], "url": row[1], "art_id": row[0], "tentatives": row[3] + 1, "priorite": row[4]}
+
+    def renew(self, art_id):
+        """
+        Prolonge le bail d'un article en cours de traitement (appelé via lease.heartbeat()
+        entre deux lots de défilement).
+
+        Returns:
+            bool: False si le bail n'appartient plus à ce processus (repris ou passé en échec)
+        """
+        cursor = self.conn.execute("""
+                                   UPDATE UNIL_File_Travail
+                                   SET fq_bail_expire = ?, fq_date_maj = ?
+                                   WHERE fq_art_id = ?
+                                     AND fq_etat = 'bail'
+                                     AND fq_proprietaire = ?
+                                   """, (_now(self.lease_seconds), _now(), art_id, self.owner))
+        return cursor.rowcount > 0
+
+    def ack(self, art_id):
+        """
+        Marque un article comme traité, seulement si le bail nous appartient toujours.
+
+        La vérification et l'écriture se font dans la même transaction : un bail repris par
+        un autre processus entre-temps n'est jamais acquitté à sa place.
+        """
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = self.conn.execute("""
+                                    SELECT fq_etat, fq_proprietaire
+                                    FROM UNIL_File_Travail
+                                    WHERE fq_art_id = ?
+                                    """, (art_id,)).fetchone()
+            owned = row is not None and row[0] == "bail" and row[1] == self.owner
+            if owned:
+                self.conn.execute("""
+                                  UPDATE UNIL_File_Travail
+                                  SET fq_etat = 'fait', fq_bail_expire = NULL, fq_date_maj = ?
+                                  WHERE fq_art_id = ?
+                                  """, (_now(), art_id))
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        if not owned:
+            etat = f"{row[0]}, {row[1]}" if row else "absent"
+            log.warning(f"  ⚠️ Bail perdu pour {art_id} ({etat}) : article non acquitté")
+        return owned
+
+    def nack(self, art_id, delay=0, priorite=None):
+        """Rend un article à la file pour une nouvelle tentative après `delay` secondes"""
+        cursor = self.conn.execute("""
+                                   UPDATE UNIL_File_Travail
+                                   SET fq_etat             = 'attente',
+                                       fq_proprietaire     = NULL,
+                                       fq_bail_expire      = NULL,
+                                       fq_disponible_apres = ?,
+                                       fq_priorite         = COALESCE(?, fq_priorite),
+                                       fq_date_maj         = ?
+                                   WHERE fq_art_id = ?
+                                     AND fq_etat = 'bail'
+                                     AND fq_proprietaire = ?
+                                   """, (_now(delay), priorite, _now(), art_id, self.owner))
+        return cursor.rowcount > 0
+
+    def fail(self):
+        """Marque l'article en cours comme abandonné (il ne sera plus attribué)"""
+        if self.current is None:
+            return
+        self.conn.execute("""
+                          UPDATE UNIL_File_Travail
+                          SET fq_etat = 'echec', fq_bail_expire = NULL, fq_date_maj = ?
+                          WHERE fq_art_id = ?
+                            AND fq_proprietaire = ?
+                          """, (_now(), self.current["art_id"], self.owner))
+        self.abandon()
+
+    def abandon(self):
+        """Oublie l'article en cours sans toucher à la file (bail perdu au profit d'un autre processus)"""
+        self.current = None
+        lease.release()
+
+    def next_available_in(self):
+        """Secondes avant qu'un article relancé de cette catégorie redevienne disponible (None si aucun)"""
+        row = self.conn.execute("""
+                                SELECT MIN(fq_disponible_apres)
+                                FROM UNIL_File_Travail
+                                WHERE fq_site = ?
+                                  AND fq_categorie = ?
+                                  AND fq_etat = 'attente'
+                                  AND fq_tentatives < ?
+                                """, (self.site, self.categorie, MAX_TENTATIVES)).fetchone()
+        if row[0] is None:
+            return None
+        delay = (datetime.strptime(row[0], DATE_FORMAT) - datetime.now()).total_seconds()
+        return max(delay, POLL_INTERVAL)
+
+    # Interface queue.Queue
+
+    def get(self, block=True, timeout=None):
+        deadline = None if timeout is None else time() + timeout
+        while True:
+            article = self.lease()
+            if article is not None:
+                self.current = article
+                lease.hold(self)
+                return article
+            if not block:
+                raise Empty
+            if deadline is not None and time() >= deadline:
+                # Des articles relancés attendent la fin de leur backoff : on les attend
+                delay = self.next_available_in()
+                if delay is None:
+                    raise Empty
+                sleep(min(delay, 60))
+                continue
+            sleep(POLL_INTERVAL)
+
+    def put(self, article):
+        """Ajoute un article, ou le rend à la file s'il s'agit de l'article en cours de bail"""
+        if self.current is not None and article.get("art_id") == self.current["art_id"]:
+            self.nack(article["art_id"], article.get("delai", 0), article.get("priorite"))
+            self.abandon()
+        else:
+            self.enqueue(article["url"], article["art_id"], article.get("title"), article.get("priorite", 0))
+
+    def task_done(self):
+        if self.current is not None:
+            self.ack(self.current["art_id"])
+            self.abandon()
+
+    def qsize(self):
+        return self.conn.execute("""
+                                 SELECT COUNT(*)
+                                 FROM UNIL_File_Travail
+                                 WHERE fq_site = ?
+                                   AND fq_categorie = ?
+                                   AND fq_etat = 'attente'
+                                 """, (self.site, self.categorie)).fetchone()[0]
+
+    def empty(self):
+        return self.qsize() == 0
+
+    def close(self):
+        self.conn.close()
+
+
+def scrap_categories_queue(site, URLS, category_mod, lister=True):
+    """
+    Alimente la file partagée avec les catégories d'un site puis consomme les articles.
+
+    Args:
+        site: Clé du site (art_nom_journal)
+        URLS: Catégories du site {categorie: url}
+        category_mod: Module *_category du site (scrape_articles_from_category, worker_thread)
+        lister: False pour un processus qui ne fait que consommer la file
+    """
+    for category, url in URLS.items():
+        work_queue = WorkQueue(site, category)
+        try:
+            if lister:
+                res_articles = category_mod.scrape_articles_from_category(url, category)
+                added = 0
+                while res_articles and not res_articles.empty():
+                    article = res_articles.get()
+                    article["art_id"] = category_mod.get_id(article["url"])
+                    added += work_queue.enqueue(article["url"], article["art_id"], article.get("title"),
+                                                article.get("priorite", 0))
+                log.info(f"→ {added} nouvel(s) article(s) ajouté(s) à la file partagée ({category})")
+
+            if work_queue.qsize() > 0:
+                category_mod.worker_thread(work_queue, category)
+            else:
+                log.warning(f"⚠️ File vide pour {category}\n")
+        finally:
+            work_queue.close()
+
+
+def start_scraping_queue(lister=True):
+    """Mode file partagée : plusieurs processus main.py peuvent tourner en parallèle"""
+    log.info(f"\n🔗 Mode file de travail partagée (processus {worker_id()})")
+    for site, (URLS, category_mod) in SITES.items():
+        scrap_categories_queue(site, URLS, category_mod, lister)